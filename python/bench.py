@@ -0,0 +1,252 @@
+import gc
+import random
+import time
+from array import array
+
+try:
+	import tracemalloc
+except ImportError:
+	tracemalloc = None
+
+import common as com
+import flow_algs as fa
+import graph as g
+import graph_algs as ga
+import heap as h
+
+# wall time of one call to fn. Garbage from earlier runs is collected
+# first, and the result is freed only after the clock stops.
+def timed(label, fn, *args):
+	gc.collect()
+	start = time.time()
+	result = fn(*args)
+	print(label + ": " + ("%.3f" % (time.time() - start)) + "s")
+	return result
+
+# the node-and-dict tree heap that heap.Heap replaced, kept as the
+# baseline for heap_bench. It is the old code, except that __cmp__
+# calls go through compare() so that it also runs on Python 3. Its
+# nodes are today's common.Node; the old old-style Node class made it
+# several times slower again under Python 2.
+def compare(a, b):
+	return (a > b) - (a < b)
+
+class TreeHeap:
+
+	def __init__(self, minheap=True):
+		self.root = None
+		self.heap_type = -1 if minheap else 1
+		self.cts = {}
+
+	def __swap__(self, node1, node2):
+		node1.value, node2.value = node2.value, node1.value
+
+	def __sink__(self, node, left_child=True):
+		if(node.is_leaf()):
+			temp = node.value
+			if(not node.is_root()):
+				if(left_child): node.parent.left(None)
+				else: node.parent.right(None)
+			else:
+				self.root = None
+			del self.cts[node]
+			return temp
+		self.cts[node] -= 1
+		if(node.rchild == None):
+			self.__swap__(node, node.lchild)
+			return self.__sink__(node.lchild)
+		elif(node.lchild == None):
+			self.__swap__(node, node.rchild)
+			return self.__sink__(node.rchild, False)
+		elif(compare(node.lchild.value, node.rchild.value) == self.heap_type):
+			self.__swap__(node, node.lchild)
+			return self.__sink__(node.lchild)
+		else:
+			self.__swap__(node, node.rchild)
+			return self.__sink__(node.rchild, False)
+
+	def __bubble__(self, node):
+		if(node.parent == None): return
+		if(compare(node.value, node.parent.value) == self.heap_type):
+			self.__swap__(node, node.parent)
+			self.__bubble__(node.parent)
+
+	def __findleaf__(self, value, node):
+		self.cts[node] += 1
+		if(node.lchild and node.rchild):
+			if(self.cts[node.lchild] < self.cts[node.rchild]):
+				self.__findleaf__(value, node.lchild)
+			else:
+				self.__findleaf__(value, node.rchild)
+		else:
+			newnode = com.Node(value)
+			self.cts[newnode] = 1
+			if(not node.lchild): node.left(newnode)
+			else: node.right(newnode)
+			newnode.parent = node
+			self.__bubble__(newnode)
+
+	def insert_all(self, values):
+		for value in values:
+			self.insert(value)
+
+	def insert(self, value):
+		if(self.root == None):
+			self.root = com.Node(value)
+			self.cts[self.root] = 1
+		else:
+			self.__findleaf__(value, self.root)
+
+	def pop(self):
+		if(self.empty()): return
+		return self.__sink__(self.root)
+
+	def empty(self):
+		return self.root == None
+
+	def __mergeheap__(self, root):
+		self.insert(root.value)
+		if(root.lchild != None): self.__mergeheap__(root.lchild)
+		if(root.rchild != None): self.__mergeheap__(root.rchild)
+
+	def merge(self, heap2):
+		if(heap2.empty()): return
+		self.__mergeheap__(heap2.root)
+
+# insert n values one at a time, then pop them all
+def heap_bench_1(values, make=h.MinHeap):
+	heap = make()
+	for v in values:
+		heap.insert(v)
+	while(not heap.empty()):
+		heap.pop()
+
+# bulk insert, merge, then drain
+def heap_bench_2(values, make=h.MinHeap):
+	half = len(values) // 2
+	heap1, heap2 = make(), make()
+	heap1.insert_all(values[:half])
+	heap2.insert_all(values[half:])
+	heap1.merge(heap2)
+	while(not heap1.empty()):
+		heap1.pop()
+
+def heap_bench(n=100000):
+	values = [random.randint(0, n) for i in range(n)]
+	print("------ heap (n="+str(n)+") ------")
+	timed("insert + pop", heap_bench_1, values)
+	timed("insert_all + merge + pop", heap_bench_2, values)
+	timed("tree heap: insert + pop", heap_bench_1, values, TreeHeap)
+	timed("tree heap: insert_all + merge + pop", heap_bench_2, values, TreeHeap)
+
+# bytes held by whatever fn builds and returns, measured with tracemalloc
+def traced(label, fn, *args):
+	tracemalloc.start()
+	held = fn(*args)
+	size = tracemalloc.get_traced_memory()[0]
+	tracemalloc.stop()
+	print(label + ": " + str(size // 1024) + " KiB")
+	return held
+
+def build_edges(cls, pairs):
+	return [cls(v1, v2, False, wt) for v1, v2, wt in pairs]
+
+def build_store(pairs):
+	store = com.EdgeStore()
+	for v1, v2, wt in pairs:
+		store.add(v1, v2, False, wt)
+	return store
+
+def build_graph(attrs, pairs):
+	graph = g.Graph(attrs)
+	for v1, v2, wt in pairs:
+		graph.connect(v1, v2, wt)
+	return graph
+
+def build_from_edges(attrs, edges):
+	graph = g.Graph(attrs)
+	for e in edges:
+		graph.add_edge(e)
+	return graph
+
+def build_slotted_graph(attrs, pairs):
+	graph = g.Graph(attrs)
+	for v1, v2, wt in pairs:
+		graph.add_edge(com.SlottedEdge(v1, v2, False, wt))
+	return graph
+
+def memory_bench(n=10000, m=100000):
+	if(tracemalloc == None):
+		print("memory bench needs tracemalloc (Python 3)")
+		return
+
+	pairs = [(random.randrange(n), random.randrange(n), random.randint(1, 100)) \
+			 for i in range(m)]
+	print("------ memory (m="+str(m)+" edges) ------")
+	traced("Edge objects", build_edges, com.Edge, pairs)
+	traced("SlottedEdge objects", build_edges, com.SlottedEdge, pairs)
+	traced("EdgeStore", build_store, pairs)
+	traced("Graph", build_graph, {'weighted' : True}, pairs)
+	traced("Graph (SlottedEdge)", build_slotted_graph, {'weighted' : True}, pairs)
+
+# single-source shortest paths on a random weighted CSR graph,
+# once per heap backend
+def shortest_path_bench(n=20000, m=100000):
+	src = [random.randrange(n) for i in range(m)]
+	dst = [random.randrange(n) for i in range(m)]
+	wts = g.value_array(random.randint(1, 100) for i in range(m))
+	graph = g.CSRGraph.from_arrays(range(n), src, dst, wts, None,
+								   {'directed' : True, 'weighted' : True})
+	print("------ dijkstra (n="+str(n)+", m="+str(m)+") ------")
+	for heap in ['binary', 'pairing', 'radix']:
+		timed(heap, ga.Dijkstra, graph, 0, None, heap)
+
+# Prim and Kruskal on the same random weighted graphs, several
+# components each
+def mst_bench(n=2000, m=10000):
+	graph = g.Graph({'weighted' : True})
+	for v in range(n):
+		graph.add_vertex(v)
+	for i in range(m):
+		graph.connect(random.randrange(n), random.randrange(n), random.randint(1, 100))
+	print("------ mst (n="+str(n)+", m="+str(m)+") ------")
+	timed("prim", ga.PrimMST, graph)
+	timed("kruskal", ga.KruskalMST, graph)
+	timed("boruvka", ga.BoruvkaMST, graph)
+
+
+def build_bench(n=20000, m=100000):
+	pairs = [(random.randrange(n), random.randrange(n), random.randint(1, 100)) for i in range(m)]
+	print("------ graph construction (n="+str(n)+", m="+str(m)+") ------")
+	timed("connect", build_graph, {'weighted' : True}, pairs)
+	timed("from_edges", g.Graph.from_edges, pairs, {'weighted' : True})
+	edges = [com.Edge(v1, v2, False, wt) for v1, v2, wt in pairs]
+	timed("add_edge", build_from_edges, {'weighted' : True}, edges)
+	timed("from_edges (Edges)", g.Graph.from_edges, edges, {'weighted' : True})
+
+
+def flow_bench(n=20000, m=200000):
+	src = [random.randrange(n) for i in range(m)]
+	dst = [random.randrange(n) for i in range(m)]
+	caps = array('l', [random.randint(1, 100) for i in range(m)])
+	attrs = {'directed' : True, 'weighted' : False, 'capacious' : True}
+	graph = g.CSRGraph.from_arrays(list(range(n)), src, dst, None, caps, attrs)
+	print("------ max flow (n="+str(n)+", m="+str(m)+") ------")
+	timed("flow network", fa.FlowNetwork, graph)
+	net = fa.FlowNetwork(graph)
+	timed("dinic", fa.Dinic, net, 0, 1)
+	timed("push-relabel", fa.PushRelabel, net, 0, 1)
+
+
+def main():
+	random.seed(1)
+	heap_bench()
+	memory_bench()
+	shortest_path_bench()
+	mst_bench()
+	build_bench()
+	flow_bench()
+
+
+if __name__ == "__main__":
+	main()
@@ -1,18 +1,20 @@
 
+import numbers
+from array import array
+from collections import OrderedDict
+
 ############################
 # DATA STRUCTURE: Edge
 # ~ General edge class with numerous attributes capable of fitting almost any graph 
 # ~ algorithm. If smaller edges are desired, such as an undirected unweighted edge, 
 # ~ a set() can simply be used.
+#
+# ~ NOTE: EdgeBase holds the behaviour shared by Edge, SlottedEdge and
+# ~ EdgeView. It declares no storage of its own, so the subclasses decide
+# ~ whether attributes live in a __dict__, in __slots__, or in an EdgeStore.
 ############################
-class Edge:
-
-	def __init__(self, v1, v2, directed=False, weight=None, capacity=None):
-		self.v1 = v1
-		self.v2 = v2
-		self.dir = directed
-		self.wt = weight
-		self.cap = capacity
+class EdgeBase(object):
+	__slots__ = ()
 
 	# modifier methods
 	def set_weight(self, wt): self.wt = wt
@@ -37,7 +39,7 @@ class Edge:
 		return self.v1 if self.v2 == pt else self.v2
 
 	def equals(self, e):
-		if(isinstance(e, self.__class__)):
+		if(isinstance(e, EdgeBase)):
 			if(e.wt == self.wt):
 				if(not self.dir):
 					return set(e.endpoints()) == set(self.endpoints()) 
@@ -46,9 +48,17 @@ class Edge:
 		else:
 			return False
 
+	# edges order by weight. Python 2 uses __cmp__; Python 3 only
+	# looks at the rich comparisons, which heaps and sorts need.
 	def __cmp__(self, other):
 		return self.wt.__cmp__(other.wt)
 
+	def __lt__(self, other):
+		return self.wt < other.wt
+
+	def __gt__(self, other):
+		return self.wt > other.wt
+
 	def __eq__(self, other):
 		return self.equals(other)
 
@@ -65,18 +75,174 @@ class Edge:
 	def __repr__(self):
 		return self.__str__()
 
+class Edge(EdgeBase):
+
+	def __init__(self, v1, v2, directed=False, weight=None, capacity=None):
+		self.v1 = v1
+		self.v2 = v2
+		self.dir = directed
+		self.wt = weight
+		self.cap = capacity
+
+############################
+# DATA STRUCTURE: SlottedEdge
+# ~ An Edge without a per-instance __dict__. Its attributes are fixed,
+# ~ which makes each instance several times smaller than an Edge.
+############################
+class SlottedEdge(EdgeBase):
+	__slots__ = ('v1', 'v2', 'dir', 'wt', 'cap')
+
+	def __init__(self, v1, v2, directed=False, weight=None, capacity=None):
+		self.v1 = v1
+		self.v2 = v2
+		self.dir = directed
+		self.wt = weight
+		self.cap = capacity
+
+############################
+# DATA STRUCTURE: EdgeStore
+# ~ Holds many edges as parallel typed arrays instead of objects: endpoint
+# ~ ids (into a table of vertex labels), weights, capacities, and a flags
+# ~ byte recording whether each edge is directed, weighted and capacious.
+# ~ Edges are addressed by the integer id returned from add(), and
+# ~ view(id) hands out a lightweight EdgeView on demand.
+#
+# ~ NOTE: Weights and capacities are stored as ints until a non-int
+# ~ value is added, at which point that array is promoted to floats.
+# ~ A flag per edge records which values were floats, so ints stored
+# ~ before or after the promotion still read back as ints. Removed edges are only flagged, never reused, so views handed out
+# ~ before a removal keep reading the values they were created for.
+############################
+class EdgeStore(object):
+	DIRECTED, WEIGHTED, CAPACIOUS, REMOVED = 1, 2, 4, 8
+	FLOAT_WEIGHT, FLOAT_CAPACITY = 16, 32
+
+	def __init__(self):
+		self.labels = []
+		self.index = {}
+		self.src = array('i')
+		self.dst = array('i')
+		self.wts = array('l')
+		self.caps = array('l')
+		self.flags = array('b')
+		self.removed = 0
+
+	def vertex_id(self, v):
+		i = self.index.get(v)
+		if(i == None):
+			i = self.index[v] = len(self.labels)
+			self.labels.append(v)
+		return i
+
+	def __store__(self, name, e, value, float_flag):
+		arr = getattr(self, name)
+		exact = value == None or isinstance(value, numbers.Integral)
+		self.__flag__(e, float_flag, not exact)
+		if(value == None):
+			value = 0
+		elif(arr.typecode == 'l' and not exact):
+			arr = array('d', arr)
+			setattr(self, name, arr)
+		arr[e] = value
+
+	def __load__(self, arr, e, float_flag):
+		value = arr[e]
+		return value if self.flags[e] & float_flag else int(value)
+
+	def __flag__(self, e, flag, on):
+		self.flags[e] = (self.flags[e] | flag) if on else (self.flags[e] & ~flag)
+
+	def add(self, v1, v2, directed=False, weight=None, capacity=None):
+		e = len(self.flags)
+		self.src.append(self.vertex_id(v1))
+		self.dst.append(self.vertex_id(v2))
+		self.wts.append(0)
+		self.caps.append(0)
+		self.flags.append(0)
+		self.set_directed(e, directed)
+		self.set_weight(e, weight)
+		self.set_capacity(e, capacity)
+		return e
+
+	def add_edge(self, edge):
+		return self.add(edge.v1, edge.v2, edge.dir, edge.wt, edge.cap)
+
+	def remove(self, e):
+		if(self.flags[e] & EdgeStore.REMOVED): return
+		self.__flag__(e, EdgeStore.REMOVED, True)
+		self.removed += 1
+
+	def view(self, e):
+		return EdgeView(self, e)
+
+	# field accessors
+	def v1(self, e): return self.labels[self.src[e]]
+	def v2(self, e): return self.labels[self.dst[e]]
+	def directed(self, e): return bool(self.flags[e] & EdgeStore.DIRECTED)
+	def removed_edge(self, e): return bool(self.flags[e] & EdgeStore.REMOVED)
+
+	def weight(self, e):
+		if(not self.flags[e] & EdgeStore.WEIGHTED): return None
+		return self.__load__(self.wts, e, EdgeStore.FLOAT_WEIGHT)
+
+	def capacity(self, e):
+		if(not self.flags[e] & EdgeStore.CAPACIOUS): return None
+		return self.__load__(self.caps, e, EdgeStore.FLOAT_CAPACITY)
+
+	# field modifiers
+	def set_v1(self, e, v): self.src[e] = self.vertex_id(v)
+	def set_v2(self, e, v): self.dst[e] = self.vertex_id(v)
+	def set_directed(self, e, directed): self.__flag__(e, EdgeStore.DIRECTED, directed)
+
+	def set_weight(self, e, wt):
+		self.__flag__(e, EdgeStore.WEIGHTED, wt != None)
+		self.__store__('wts', e, wt, EdgeStore.FLOAT_WEIGHT)
+
+	def set_capacity(self, e, cap):
+		self.__flag__(e, EdgeStore.CAPACIOUS, cap != None)
+		self.__store__('caps', e, cap, EdgeStore.FLOAT_CAPACITY)
+
+	def __len__(self):
+		return len(self.flags) - self.removed
+
+	def __iter__(self):
+		for e in range(len(self.flags)):
+			if(not self.flags[e] & EdgeStore.REMOVED):
+				yield EdgeView(self, e)
+
+############################
+# DATA STRUCTURE: EdgeView
+# ~ A two-slot handle (store, id) onto one edge of an EdgeStore. It
+# ~ behaves like an Edge; reads and writes go straight to the store.
+############################
+class EdgeView(EdgeBase):
+	__slots__ = ('store', 'id')
+
+	def __init__(self, store, e):
+		self.store = store
+		self.id = e
+
+	v1 = property(lambda self: self.store.v1(self.id),
+				  lambda self, v: self.store.set_v1(self.id, v))
+	v2 = property(lambda self: self.store.v2(self.id),
+				  lambda self, v: self.store.set_v2(self.id, v))
+	dir = property(lambda self: self.store.directed(self.id),
+				   lambda self, d: self.store.set_directed(self.id, d))
+	wt = property(lambda self: self.store.weight(self.id),
+				  lambda self, wt: self.store.set_weight(self.id, wt))
+	cap = property(lambda self: self.store.capacity(self.id),
+				   lambda self, cap: self.store.set_capacity(self.id, cap))
+
 ############################
 # DATA STRUCTURE: Node
 # ~ General node class with numerous attributes capable of fitting almost any tree
 # ~ algorithm. Holds two children, a value, and a single parent.
+#
+# ~ NOTE: As with edges, NodeBase holds the shared behaviour and
+# ~ SlottedNode is the variant without a per-instance __dict__.
 ############################
-class Node:
-
-	def __init__(self, value=None):
-		self.parent = None
-		self.lchild = None
-		self.rchild = None
-		self.value = value
+class NodeBase(object):
+	__slots__ = ()
 
 	def set_parent(self, new_parent):
 		self.parent = new_parent
@@ -114,4 +280,91 @@ class Node:
 	def __repr__(self):
 		return self.__str__()
 
+class Node(NodeBase):
+
+	def __init__(self, value=None):
+		self.parent = None
+		self.lchild = None
+		self.rchild = None
+		self.value = value
+
+class SlottedNode(NodeBase):
+	__slots__ = ('parent', 'lchild', 'rchild', 'value')
+
+	def __init__(self, value=None):
+		self.parent = None
+		self.lchild = None
+		self.rchild = None
+		self.value = value
+
+############################
+# DATA STRUCTURE: Result Cache
+# ~ A least-recently-used cache of computed results for one versioned
+# ~ owner (a Graph). get(key, version, compute) returns the result
+# ~ stored under key, or calls compute() and stores what it returns.
+# ~ All results are dropped as soon as the owner's version differs
+# ~ from the one they were computed at. At most max_size results are
+# ~ kept (0 disables caching), and keys that cannot be hashed are
+# ~ always computed.
+#
+# IMPLEMENTATION:
+# ~ An OrderedDict in least- to most-recently-used order: a hit moves
+# ~ its entry to the end, and evictions pop from the front.
+#
+# RUNNING TIME:
+# ~ Get: O(1) plus compute() on a miss
+############################
+class ResultCache(object):
+
+	def __init__(self, max_size=32):
+		self.max_size = max_size
+		self.entries = OrderedDict()
+		self.version = None
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+		self.invalidations = 0
+
+	def get(self, key, version, compute):
+		if(version != self.version):
+			if(self.entries): self.invalidations += 1
+			self.entries.clear()
+			self.version = version
+
+		try:
+			value = self.entries.pop(key)
+		except KeyError:
+			value = None
+		except TypeError:
+			self.misses += 1
+			return compute()
+		else:
+			self.hits += 1
+			self.entries[key] = value
+			return value
+
+		self.misses += 1
+		value = compute()
+		if(self.max_size > 0):
+			self.entries[key] = value
+			while(len(self.entries) > self.max_size):
+				self.entries.popitem(last=False)
+				self.evictions += 1
+		return value
+
+	def resize(self, max_size):
+		self.max_size = max_size
+		while(len(self.entries) > max(max_size, 0)):
+			self.entries.popitem(last=False)
+			self.evictions += 1
+
+	def clear(self):
+		self.entries.clear()
+
+	def stats(self):
+		return {'hits' : self.hits, 'misses' : self.misses, 'evictions' : self.evictions,
+				'invalidations' : self.invalidations, 'size' : len(self.entries),
+				'max_size' : self.max_size}
 
+	def __len__(self):
+		return len(self.entries)
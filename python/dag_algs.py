@@ -0,0 +1,360 @@
+from array import array
+from collections import deque
+from multiprocessing import Pool, cpu_count
+from multiprocessing.pool import ThreadPool
+from graph import Graph, adjacency_arrays, slot_weights
+from graph_algs import CycleCount
+
+############################
+# ALGORITHM: Topological Sort
+# ~ Takes a directed acyclic Graph (or CSRGraph / view) as input, and
+# ~ orders its vertices so that every edge points forward: for each
+# ~ edge v1->v2, v1 comes before v2. order() is the sorted list of
+# ~ vertices. An undirected graph, or one with a directed cycle,
+# ~ raises ValueError (the message names a cycle).
+#
+# ~ method='kahn' repeatedly takes a vertex with no remaining incoming
+# ~ edges; method='dfs' lists vertices in reverse DFS postorder.
+#
+# IMPLEMENTATION:
+# ~ Both run on the graph's adjacency arrays. Kahn's algorithm keeps an
+# ~ in-degree count per vertex and a queue of vertices whose count has
+# ~ dropped to 0. The DFS version is iterative, with a slot pointer per
+# ~ stacked vertex, and sees a cycle as an edge back into the stack.
+#
+# RUNNING TIME:
+# ~ O(V+E)
+############################
+class TopologicalSort:
+
+	def __init__(self, graph, method='kahn'):
+		if(not graph.is_directed()):
+			raise ValueError("a topological order needs a directed graph")
+		self.labels, self.offsets, self.targets = adjacency_arrays(graph)
+		self.ids = self.__kahn__() if method == 'kahn' else self.__dfs__()
+		if(self.ids == None):
+			raise ValueError("graph has a cycle: "+str(CycleCount(graph).directed_cycle()))
+		self.position = array('l', [0]) * len(self.labels)
+		for i, v in enumerate(self.ids): self.position[v] = i
+
+	def order(self):
+		labels = self.labels
+		return [labels[v] for v in self.ids]
+
+	def __kahn__(self):
+		offsets, targets = self.offsets, self.targets
+		n = len(self.labels)
+		indegree = array('l', [0]) * n
+		for t in targets: indegree[t] += 1
+
+		ids = array('l')
+		queue = deque(v for v in range(n) if indegree[v] == 0)
+		while(queue):
+			v = queue.popleft()
+			ids.append(v)
+			for s in range(offsets[v], offsets[v + 1]):
+				t = targets[s]
+				indegree[t] -= 1
+				if(indegree[t] == 0): queue.append(t)
+		return ids if len(ids) == n else None
+
+	def __dfs__(self):
+		offsets, targets = self.offsets, self.targets
+		n = len(self.labels)
+		color = bytearray(n)
+		post = array('l')
+		for root in range(n):
+			if(color[root]): continue
+			color[root] = 1
+			stack, slots = [root], [offsets[root]]
+			while(stack):
+				v, s = stack[-1], slots[-1]
+				if(s == offsets[v + 1]):
+					color[v] = 2
+					post.append(v)
+					stack.pop()
+					slots.pop()
+					continue
+				slots[-1] = s + 1
+				t = targets[s]
+				if(color[t] == 1): return None
+				if(color[t] == 0):
+					color[t] = 1
+					stack.append(t)
+					slots.append(offsets[t])
+		post.reverse()
+		return post
+
+############################
+# ALGORITHM: Longest Path in a DAG
+# ~ Takes a directed acyclic Graph and finds the heaviest path in it
+# ~ (unweighted edges count as weight 1, so that is the path with the
+# ~ most edges). With a source, only paths starting there are counted.
+# ~ length() and path() give the longest path overall; distance(v)
+# ~ and path_to(v) the longest path ending at v (None if the source
+# ~ cannot reach v). Negative weights are allowed.
+#
+# IMPLEMENTATION:
+# ~ Relax every edge once, taking vertices in topological order, and
+# ~ keep the larger distance and its predecessor.
+#
+# RUNNING TIME:
+# ~ O(V+E)
+############################
+class LongestPath:
+
+	def __init__(self, graph, source=None, method='kahn'):
+		self.topo = TopologicalSort(graph, method)
+		self.labels, self.offsets, self.targets = self.topo.labels, self.topo.offsets, self.topo.targets
+		self.wts = slot_weights(graph, self.labels, self.offsets, self.targets)
+		self.index = dict((v, i) for i, v in enumerate(self.labels))
+		self.source = source
+
+		n = len(self.labels)
+		self.dist = array(self.wts.typecode, [0]) * n
+		self.pred = array('l', [-1]) * n
+		self.reached = bytearray(n) if source != None else bytearray([1]) * n
+		self.algorithm()
+
+	def algorithm(self):
+		offsets, targets, wts = self.offsets, self.targets, self.wts
+		dist, pred, reached = self.dist, self.pred, self.reached
+		if(self.source != None): reached[self.index[self.source]] = 1
+		for v in self.topo.ids:
+			if(not reached[v]): continue
+			for s in range(offsets[v], offsets[v + 1]):
+				t, d = targets[s], dist[v] + wts[s]
+				if(not reached[t] or d > dist[t]):
+					dist[t], pred[t], reached[t] = d, v, 1
+
+	def distance(self, v):
+		i = self.index[v]
+		return self.dist[i] if self.reached[i] else None
+
+	def path_to(self, v):
+		i = self.index[v]
+		if(not self.reached[i]): return None
+		path = []
+		while(i != -1):
+			path.append(self.labels[i])
+			i = self.pred[i]
+		path.reverse()
+		return path
+
+	def length(self):
+		end = self.__end__()
+		return None if end == -1 else self.dist[end]
+
+	def path(self):
+		end = self.__end__()
+		return None if end == -1 else self.path_to(self.labels[end])
+
+	def __end__(self):
+		end = -1
+		for v in range(len(self.labels)):
+			if(self.reached[v] and (end == -1 or self.dist[v] > self.dist[end])): end = v
+		return end
+
+############################
+# ALGORITHM: Critical Path
+# ~ Takes a directed acyclic Graph of jobs, where an edge v1->v2 means
+# ~ v1 must finish before v2 starts, and each vertex's data holds its
+# ~ duration under 'key' (a missing duration counts as 1). Finds the
+# ~ earliest and latest start of every job that keeps the whole
+# ~ schedule as short as possible (makespan()), and the slack between
+# ~ them. Jobs with no slack form the critical path (path()): delaying
+# ~ any of them delays everything.
+#
+# IMPLEMENTATION:
+# ~ A forward pass in topological order gives earliest starts, and a
+# ~ backward pass in reverse order gives latest starts. The critical
+# ~ path follows zero-slack jobs that start exactly when the previous
+# ~ one finishes.
+#
+# RUNNING TIME:
+# ~ O(V+E)
+############################
+class CriticalPath:
+
+	def __init__(self, graph, key='duration', method='kahn'):
+		self.topo = TopologicalSort(graph, method)
+		self.labels, self.offsets, self.targets = self.topo.labels, self.topo.offsets, self.topo.targets
+		self.index = dict((v, i) for i, v in enumerate(self.labels))
+		durations = [graph.data.get(v, {}).get(key, 1) for v in self.labels]
+		self.duration = array('l' if all(isinstance(d, int) for d in durations) else 'd', durations)
+		self.algorithm()
+
+	def algorithm(self):
+		offsets, targets, duration = self.offsets, self.targets, self.duration
+		ids, n = self.topo.ids, len(self.labels)
+		early = array(duration.typecode, [0]) * n
+		for v in ids:
+			finish = early[v] + duration[v]
+			for s in range(offsets[v], offsets[v + 1]):
+				if(finish > early[targets[s]]): early[targets[s]] = finish
+
+		self.span = max([early[v] + duration[v] for v in range(n)] or [0])
+		late = array(duration.typecode, [0]) * n
+		for i in range(n - 1, -1, -1):
+			v = ids[i]
+			finish = self.span
+			for s in range(offsets[v], offsets[v + 1]):
+				if(late[targets[s]] < finish): finish = late[targets[s]]
+			late[v] = finish - duration[v]
+		self.early, self.late = early, late
+
+	def makespan(self):
+		return self.span
+
+	def earliest_start(self, v):
+		return self.early[self.index[v]]
+
+	def latest_start(self, v):
+		return self.late[self.index[v]]
+
+	def slack(self, v):
+		i = self.index[v]
+		return self.late[i] - self.early[i]
+
+	def path(self):
+		offsets, targets, early, late, duration = \
+			self.offsets, self.targets, self.early, self.late, self.duration
+		v = next((v for v in self.topo.ids if early[v] == 0 and late[v] == 0), -1)
+		path = []
+		while(v != -1):
+			path.append(self.labels[v])
+			finish, nxt = early[v] + duration[v], -1
+			for s in range(offsets[v], offsets[v + 1]):
+				t = targets[s]
+				if(early[t] == late[t] and early[t] == finish):
+					nxt = t
+					break
+			v = nxt
+		return path
+
+############################
+# ALGORITHM: Transitive Reduction
+# ~ Takes a directed acyclic Graph and finds the fewest edges with the
+# ~ same reachability: an edge v1->v2 is redundant if v2 can also be
+# ~ reached from v1 through some other path. reduced() is a new Graph
+# ~ with the same vertices (and data) and only the edges that are
+# ~ needed, and redundant() lists the edges that were left out.
+#
+# IMPLEMENTATION:
+# ~ Vertices are numbered by topological position, and the set of
+# ~ vertices each one reaches is a bitset (a Python int), built in
+# ~ reverse topological order as the union of its successors' sets.
+# ~ The successors of v are then visited in topological order: if one
+# ~ is already reached through an earlier successor, its edge is
+# ~ redundant; otherwise everything it reaches is added.
+#
+# RUNNING TIME:
+# ~ O(VE/w) for w-bit words, O(V^2) bits of memory
+############################
+class TransitiveReduction:
+
+	def __init__(self, graph, method='kahn'):
+		self.graph = graph
+		self.topo = TopologicalSort(graph, method)
+		self.labels = self.topo.labels
+		self.keep = []
+		self.drop = []
+		self.algorithm()
+
+	def algorithm(self):
+		offsets, targets, position = self.topo.offsets, self.topo.targets, self.topo.position
+		ids, labels, g = self.topo.ids, self.labels, self.graph
+		reach = [0] * len(labels)
+		for i in range(len(ids) - 1, -1, -1):
+			v = ids[i]
+			succ = sorted(position[targets[s]] for s in range(offsets[v], offsets[v + 1]))
+			covered = 0
+			for p in succ:
+				edge = g.edge(labels[v], labels[ids[p]])
+				if((covered >> p) & 1):
+					self.drop.append(edge)
+				else:
+					self.keep.append(edge)
+					covered |= reach[p] | (1 << p)
+			reach[i] = covered
+
+	def reduced(self):
+		g = Graph(self.graph.attrs)
+		for v in self.labels:
+			g.add_vertex(v, dict(self.graph.data.get(v, {})))
+		g.add_edges_bulk(self.keep)
+		return g
+
+	def redundant(self):
+		return self.drop
+
+############################
+# ALGORITHM: Level Scheduler
+# ~ Takes a directed acyclic Graph of tasks, where an edge v1->v2 means
+# ~ v1 must run before v2, and splits it into levels: level 0 holds the
+# ~ tasks with no dependencies, and each later level the tasks whose
+# ~ dependencies all sit in earlier levels. Tasks in one level are
+# ~ independent of each other. levels() yields the levels in order,
+# ~ as lists of vertices.
+#
+# ~ run(callback) calls callback(v) for every task, level by level, on
+# ~ a pool of 'processes' workers (pool='thread' for a thread pool,
+# ~ 'process' for a process pool, whose callback must be picklable,
+# ~ i.e. a module-level function; processes=1 runs in this thread).
+# ~ A level only starts once the whole previous level has finished,
+# ~ and the first exception raised by a callback stops the run. It
+# ~ returns a dict from each vertex to its callback's result.
+#
+# IMPLEMENTATION:
+# ~ A vertex's level is the length of the longest path ending at it,
+# ~ found in one pass over the topological order. Each level is handed
+# ~ to the pool's map(), which waits for all of it.
+#
+# RUNNING TIME:
+# ~ Levels: O(V+E)
+############################
+class LevelScheduler:
+
+	def __init__(self, graph, method='kahn'):
+		self.topo = TopologicalSort(graph, method)
+		self.labels = self.topo.labels
+		self.index = dict((v, i) for i, v in enumerate(self.labels))
+		self.level = array('l', [0]) * len(self.labels)
+		self.batches = []
+		self.algorithm()
+
+	def algorithm(self):
+		offsets, targets, level = self.topo.offsets, self.topo.targets, self.level
+		for v in self.topo.ids:
+			for s in range(offsets[v], offsets[v + 1]):
+				if(level[targets[s]] < level[v] + 1): level[targets[s]] = level[v] + 1
+		for v in self.topo.ids:
+			while(len(self.batches) <= level[v]): self.batches.append([])
+			self.batches[level[v]].append(self.labels[v])
+
+	def levels(self):
+		for batch in self.batches:
+			yield list(batch)
+
+	def num_levels(self):
+		return len(self.batches)
+
+	def level_of(self, v):
+		return self.level[self.index[v]]
+
+	def run(self, callback, pool='thread', processes=None):
+		results = {}
+		processes = processes or cpu_count()
+		if(processes == 1):
+			for batch in self.batches:
+				for v in batch: results[v] = callback(v)
+			return results
+
+		workers = ThreadPool(processes) if pool == 'thread' else Pool(processes)
+		try:
+			for batch in self.batches:
+				for v, result in zip(batch, workers.map(callback, batch)):
+					results[v] = result
+		finally:
+			workers.terminate()
+		return results
@@ -0,0 +1,371 @@
+from array import array
+from collections import deque
+from graph import CSRGraph
+
+############################
+# DATA STRUCTURE: Flow Network
+# ~ The residual graph of a capacious Graph (or CSRGraph), which the
+# ~ max-flow algorithms below work on instead of the graph's own Edge
+# ~ objects, so computing a flow never changes the graph. Every edge
+# ~ becomes a pair of opposite arcs: a directed edge of capacity c
+# ~ gives arcs of capacity c and 0, and an undirected edge gives two
+# ~ arcs of capacity c (flow may go either way). Every edge needs a
+# ~ non-negative capacity (ValueError otherwise).
+#
+# ~ A FlowNetwork can be built once and handed to several max-flow
+# ~ runs in place of the graph; each run keeps its own residual
+# ~ capacities.
+#
+# IMPLEMENTATION:
+# ~ Arcs are stored CSR style, sorted by tail, so the arcs out of
+# ~ vertex v are offsets[v]..offsets[v+1]-1. heads[a] is the head of
+# ~ arc a, caps[a] its capacity, and revs[a] the arc opposite to it.
+# ~ edge_arc[k] is the arc that carries the k-th edge from v1 to v2.
+#
+# RUNNING TIME:
+# ~ Build: O(V+E)
+############################
+class FlowNetwork:
+	def __init__(self, graph):
+		if(isinstance(graph, CSRGraph)):
+			self.labels, self.edges = graph.labels, graph.E
+			src, dst, caps = graph.src, graph.dst, graph.caps
+			if(caps == None): caps = [None] * len(src)
+			caps = [None if c != c else c for c in caps]
+		else:
+			self.labels, self.edges = list(graph.V()), list(graph.E)
+			index = dict((v, i) for i, v in enumerate(self.labels))
+			src = [index[e.v1] for e in self.edges]
+			dst = [index[e.v2] for e in self.edges]
+			caps = [e.cap for e in self.edges]
+		for k, c in enumerate(caps):
+			if(c == None or c < 0):
+				raise ValueError("edge needs a non-negative capacity: "+str(self.edges[k]))
+
+		self.index = dict((v, i) for i, v in enumerate(self.labels))
+		self.directed = graph.attrs['directed']
+		self.typecode = 'l' if all(isinstance(c, int) for c in caps) else 'd'
+		n, m = len(self.labels), len(caps)
+
+		# arc 2k runs along edge k and arc 2k+1 against it; a counting
+		# sort by tail gives each arc its slot.
+		counts = array('l', [0]) * (n + 1)
+		for k in range(m):
+			counts[src[k] + 1] += 1
+			counts[dst[k] + 1] += 1
+		for i in range(n): counts[i + 1] += counts[i]
+		self.offsets = array('l', counts)
+
+		slot = array('l', [0]) * (2 * m)
+		for k in range(m):
+			slot[2 * k] = counts[src[k]]
+			counts[src[k]] += 1
+			slot[2 * k + 1] = counts[dst[k]]
+			counts[dst[k]] += 1
+
+		self.heads = array('l', [0]) * (2 * m)
+		self.revs = array('l', [0]) * (2 * m)
+		self.caps = array(self.typecode, [0]) * (2 * m)
+		for k in range(m):
+			a, b = slot[2 * k], slot[2 * k + 1]
+			self.heads[a], self.heads[b] = dst[k], src[k]
+			self.revs[a], self.revs[b] = b, a
+			self.caps[a] = caps[k]
+			self.caps[b] = 0 if self.directed else caps[k]
+		self.edge_arc = array('l', [slot[2 * k] for k in range(m)])
+
+	# a fresh residual capacity per arc (a copy of caps)
+	def residual(self):
+		return array(self.typecode, self.caps)
+
+############################
+# ALGORITHM: Maximum Flow (shared results)
+# ~ Base class for the max-flow algorithms below. Each takes a
+# ~ capacious Graph (or a FlowNetwork), a source and a sink, and
+# ~ computes a maximum flow from the source to the sink.
+#
+# ~ value() is the value of the flow. flows() pairs every edge with
+# ~ the flow it carries from v1 to v2 (negative when an undirected
+# ~ edge carries it from v2 to v1). min_cut() splits the vertices into
+# ~ the side the source can still reach in the residual graph and the
+# ~ rest, and cut_edges() are the edges across it, whose capacities
+# ~ add up to value().
+############################
+class MaxFlow:
+	def __init__(self, graph, source, target):
+		self.net = graph if isinstance(graph, FlowNetwork) else FlowNetwork(graph)
+		if(source == target): raise ValueError("source and sink must differ")
+		self.source, self.target = source, target
+		self.s, self.t = self.net.index[source], self.net.index[target]
+		self.res = self.net.residual()
+		self.flow = 0
+		self.side = None
+
+	def value(self):
+		return self.flow
+
+	def flows(self):
+		net, res = self.net, self.res
+		return [(net.edges[k], net.caps[a] - res[a]) for k, a in enumerate(net.edge_arc)]
+
+	def min_cut(self):
+		side = self.__source_side__()
+		labels = self.net.labels
+		return [labels[v] for v in range(len(labels)) if side[v]], \
+			   [labels[v] for v in range(len(labels)) if not side[v]]
+
+	def cut_edges(self):
+		side, net = self.__source_side__(), self.net
+		heads, revs = net.heads, net.revs
+		cut = []
+		for k, a in enumerate(net.edge_arc):
+			u, v = heads[revs[a]], heads[a]
+			if((side[u] and not side[v]) or (not net.directed and side[v] and not side[u])):
+				cut.append(net.edges[k])
+		return cut
+
+	# marks the vertices reachable from the source through arcs with
+	# residual capacity left.
+	def __source_side__(self):
+		if(self.side != None): return self.side
+		offsets, heads, res = self.net.offsets, self.net.heads, self.res
+		side = bytearray(len(self.net.labels))
+		side[self.s] = 1
+		queue = deque([self.s])
+		while(queue):
+			v = queue.popleft()
+			for a in range(offsets[v], offsets[v + 1]):
+				u = heads[a]
+				if(res[a] > 0 and not side[u]):
+					side[u] = 1
+					queue.append(u)
+		self.side = side
+		return side
+
+############################
+# ALGORITHM: Dinic's Maximum Flow
+# ~ Takes a capacious Graph (or FlowNetwork), a source and a sink, and
+# ~ computes a maximum flow in phases. Each phase labels vertices with
+# ~ their BFS distance from the source in the residual graph, then
+# ~ sends a blocking flow along arcs that go exactly one level down.
+#
+# IMPLEMENTATION:
+# ~ The blocking flow is found with an iterative DFS that keeps a
+# ~ current-arc pointer per vertex, so no arc is looked at twice in a
+# ~ phase. After an augmentation the search backs up only to the
+# ~ first saturated arc, and a dead-end vertex is dropped from the
+# ~ level graph.
+#
+# RUNNING TIME:
+# ~ O(V^2 E), O(E sqrt(V)) on unit-capacity graphs
+############################
+class Dinic(MaxFlow):
+	def __init__(self, graph, source, target):
+		MaxFlow.__init__(self, graph, source, target)
+		self.phases = 0
+		self.algorithm()
+
+	def algorithm(self):
+		n = len(self.net.labels)
+		level = array('l', [-1]) * n
+		while(self.__levels__(level)):
+			self.phases += 1
+			self.flow += self.__blocking_flow__(level, array('l', self.net.offsets))
+
+	def num_phases(self):
+		return self.phases
+
+	def __levels__(self, level):
+		offsets, heads, res = self.net.offsets, self.net.heads, self.res
+		t = self.t
+		for v in range(len(level)): level[v] = -1
+		level[self.s] = 0
+		queue = deque([self.s])
+		while(queue):
+			v = queue.popleft()
+			if(v == t): break
+			lv = level[v] + 1
+			for a in range(offsets[v], offsets[v + 1]):
+				u = heads[a]
+				if(res[a] > 0 and level[u] < 0):
+					level[u] = lv
+					queue.append(u)
+		return level[t] >= 0
+
+	def __blocking_flow__(self, level, it):
+		offsets, heads, revs, res = self.net.offsets, self.net.heads, self.net.revs, self.res
+		s, t = self.s, self.t
+		total, path, v = 0, [], s
+		while(True):
+			if(v == t):
+				f = min(res[a] for a in path)
+				for a in path:
+					res[a] -= f
+					res[revs[a]] += f
+				total += f
+				k = 0
+				while(res[path[k]] > 0): k += 1
+				del path[k:]
+				v = heads[path[-1]] if path else s
+				continue
+
+			a, end, lv = it[v], offsets[v + 1], level[v] + 1
+			while(a < end and (res[a] <= 0 or level[heads[a]] != lv)): a += 1
+			it[v] = a
+			if(a < end):
+				path.append(a)
+				v = heads[a]
+			elif(v == s):
+				return total
+			else:
+				level[v] = -1
+				v = heads[revs[path.pop()]]
+
+############################
+# ALGORITHM: Push-Relabel Maximum Flow
+# ~ Takes a capacious Graph (or FlowNetwork), a source and a sink, and
+# ~ computes a maximum flow by saturating the source's arcs and then
+# ~ pushing excess flow downhill along a height labelling, raising
+# ~ (relabeling) a vertex whenever it has excess but no downhill arc.
+# ~ Excess that cannot reach the sink climbs above height V and flows
+# ~ back to the source, so the result is a proper flow, not a preflow.
+#
+# IMPLEMENTATION:
+# ~ Highest-label selection: active vertices sit in one bucket per
+# ~ height and the highest one is always discharged next. Two
+# ~ heuristics keep the heights close to the true residual distances:
+# ~ - gap: when no vertex is left at some height h < V, every vertex
+# ~   above h (and below V) is cut off from the sink, and is lifted
+# ~   straight to V+1.
+# ~ - global relabel: at the start and after every V relabels, all
+# ~   heights are reset to exact BFS distances to the sink (or V plus
+# ~   the distance to the source) in the residual graph.
+#
+# RUNNING TIME:
+# ~ O(V^2 sqrt(E))
+############################
+class PushRelabel(MaxFlow):
+	def __init__(self, graph, source, target):
+		MaxFlow.__init__(self, graph, source, target)
+		self.relabels = 0
+		self.global_relabels = 0
+		self.gaps = 0
+		self.algorithm()
+
+	def algorithm(self):
+		net, res = self.net, self.res
+		offsets, heads, revs = net.offsets, net.heads, net.revs
+		n, s, t = len(net.labels), self.s, self.t
+		self.excess = excess = array(net.typecode, [0]) * n
+		self.height = height = array('l', [0]) * n
+		self.active = active = bytearray(n)
+
+		for a in range(offsets[s], offsets[s + 1]):
+			c = res[a]
+			if(c > 0):
+				res[a] = 0
+				res[revs[a]] += c
+				excess[heads[a]] += c
+				excess[s] -= c
+
+		buckets, members, cur, top = self.__global_relabel__()
+		since_global = 0
+		while(top >= 0):
+			bucket = buckets[top]
+			if(not bucket):
+				top -= 1
+				continue
+			v = bucket.pop()
+			if(height[v] != top): continue
+			active[v] = 0
+
+			# discharge v
+			h, a, end = top, cur[v], offsets[v + 1]
+			while(excess[v] > 0):
+				if(a < end):
+					u = heads[a]
+					if(res[a] > 0 and height[u] == h - 1):
+						d = excess[v] if excess[v] < res[a] else res[a]
+						res[a] -= d
+						res[revs[a]] += d
+						excess[v] -= d
+						excess[u] += d
+						if(not active[u] and u != s and u != t):
+							active[u] = 1
+							buckets[h - 1].append(u)
+						if(excess[v] == 0): break
+					a += 1
+					continue
+
+				# relabel
+				self.relabels += 1
+				since_global += 1
+				gap = False
+				if(h < n):
+					members[h].discard(v)
+					if(not members[h]):
+						self.gaps += 1
+						for k in [k for k in members if k > h]:
+							for u in members.pop(k):
+								height[u] = n + 1
+								if(active[u]): buckets[n + 1].append(u)
+						del members[h]
+						gap, h = True, n + 1
+				if(not gap):
+					h = 2 * n
+					for b in range(offsets[v], end):
+						if(res[b] > 0 and height[heads[b]] + 1 < h):
+							h = height[heads[b]] + 1
+					if(h < n): members.setdefault(h, set()).add(v)
+				height[v] = h
+				if(h > top): top = h
+				a = offsets[v]
+				if(h >= 2 * n): break
+			cur[v] = a
+
+			if(excess[v] > 0 and not active[v]):
+				active[v] = 1
+				buckets[h].append(v)
+			if(h > top): top = h
+			if(since_global >= n):
+				buckets, members, cur, top = self.__global_relabel__()
+				since_global = 0
+		self.flow = excess[t]
+
+	def num_relabels(self):
+		return self.relabels
+
+	# resets every height to its exact residual distance to the sink
+	# (or V + the distance to the source, for vertices that can no
+	# longer reach the sink), and rebuilds the active buckets.
+	def __global_relabel__(self):
+		self.global_relabels += 1
+		net, res, height, excess, active = self.net, self.res, self.height, self.excess, self.active
+		offsets, heads, revs = net.offsets, net.heads, net.revs
+		n, s, t = len(net.labels), self.s, self.t
+
+		unseen = 2 * n
+		for v in range(n): height[v] = unseen
+		for root, base in ((t, 0), (s, n)):
+			height[root] = base
+			queue = deque([root])
+			while(queue):
+				v = queue.popleft()
+				hv = height[v] + 1
+				for a in range(offsets[v], offsets[v + 1]):
+					u = heads[a]
+					if(height[u] == unseen and res[revs[a]] > 0):
+						height[u] = hv
+						queue.append(u)
+
+		buckets = [[] for h in range(2 * n + 1)]
+		members, top = {}, -1
+		for v in range(n):
+			h = height[v]
+			if(h < n): members.setdefault(h, set()).add(v)
+			active[v] = 0
+			if(excess[v] > 0 and v != s and v != t):
+				active[v] = 1
+				buckets[h].append(v)
+				if(h > top): top = h
+		return buckets, members, array('l', offsets), top
@@ -1,34 +1,92 @@
+import ctypes
+import gc
+import mmap
 import random
-from common import Edge
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from common import Edge, EdgeBase, ResultCache
+
+try:
+	import cPickle as pickle
+except ImportError:
+	import pickle
 
 ############################
 # DATA STRUCTURE: Graph
 # ~ Constructor initializes an empty graph, to which edges and vertices
 # ~ can be added. Severl utility methods exist for obtaining such
 # ~ information as degree, neighbors, bipartiteness, and more.
-# ~ TODO: Implement initializer methods from common graph file types.
+# ~ Graphs can be read from and written to common graph file formats
+# ~ (edge lists, DIMACS, METIS, Matrix Market) with graph_io.py.
 #
 # RECOGNIZED ATTRIBUTES:
 # ~ 'weighted' : graph has weighted edges
 # ~ 'directed' : graph has directed edges
 # ~ 'capacious' : graph edges have capacity
+# ~ 'incoming' : directed graphs also keep an incoming adjacency map,
+# ~             making edges_into, in_degree and remove_vertex O(deg)
+# ~             and letting reverse() read it live
+#
+# ~ NOTE: reverse(), subgraph() and compliment() return read-only views
+# ~ (see GraphView below) rather than new Graphs. Call materialize() on
+# ~ a view to get a mutable copy.
+#
+# ATTRIBUTE INDEXES:
+# ~ index_attribute(key) declares a hash index on a vertex data key,
+# ~ mapping each value to the set of vertices holding it, so that
+# ~ lookup(key, value) is O(1). Indexes are kept up to date by
+# ~ add_vertex, remove_vertex and set_data; data changed in place
+# ~ through g.data is not seen until the index is rebuilt with
+# ~ index_attribute(key).
+#
+# LISTENERS:
+# ~ subscribe(callback) registers a callback(event, item) that is called
+# ~ after every change, with event one of 'add_vertex', 'remove_vertex'
+# ~ (item is the vertex), 'add_edge' or 'remove_edge' (item is the edge).
+# ~ Removing a vertex reports the removal of each of its edges first.
+#
+# RESULT CACHE:
+# ~ cached(algorithm, *args) runs algorithm(graph, *args) (any class
+# ~ or function from graph_algs.py) and keeps the result in an LRU
+# ~ ResultCache, keyed by the algorithm and its arguments, so asking
+# ~ again is O(1). Every change made through the graph's methods
+# ~ (adding or removing vertices and edges, set_data, set_directed,
+# ~ set_weighted, set_flowgraph) bumps 'version', which drops all
+# ~ cached results. Edges or data changed in place are not seen.
+# ~ cache.stats() reports hits, misses and evictions.
+#
+# BULK CONSTRUCTION:
+# ~ from_edges(edges, attrs) and add_edges_bulk(edges) add a whole batch
+# ~ of Edges or (v1, v2, wt, cap) tuples: new vertices in one batch,
+# ~ then one pass over the edges that skips duplicates with a dict
+# ~ lookup each, bumping the version once rather than per edge.
+# ~ add_edges_bulk returns counts of what was added and skipped.
 ############################
 class Graph:
 	def __init__(self, attrs={}):
-		self.E = []
+		self.E = EdgeIndex(self)
 		self.data = {}
 		self.adj = {}
+		self.radj = {}
+		self.indexes = {}
+		self.listeners = []
+		self.version = 0
+		self.cache = ResultCache()
 
 		defaults = {'weighted':False,
 					'directed':False,
-					'capacious':False }
-		self.attrs = dict(defaults.items() + attrs.items())
+					'capacious':False,
+					'incoming':False }
+		self.attrs = dict(defaults)
+		self.attrs.update(attrs)
 
 	def init_from_graph(self, g2):
 		self.data = dict(g2.data)
-		self.attrs = dict(self.attrs.items() + g2.attrs.items())
+		self.attrs.update(g2.attrs)
 		for v in g2.V():
-			self.add_vertex(v)
+			self.add_vertex(v, self.data.get(v))
 		for e in g2.E:
 			self.add_edge(e)
 
@@ -38,77 +96,237 @@ class Graph:
 		return new_graph
 
 	# graph modifier methods
+
+	# adds the vertices not yet in the graph in one batch, bumping the
+	# version once, and returns them.
 	def add_vertices(self, vtxs):
-		for v in vtxs: self.add_vertex(v)
+		adj, radj, data = self.adj, self.radj, self.data
+		incoming = self.tracks_incoming()
+		added = []
+		for v in vtxs:
+			if(v in adj): continue
+			adj[v] = {}
+			if(incoming): radj[v] = {}
+			data[v] = {'id' : v, 'name' : v}
+			added.append(v)
+		if(not added): return added
 
-	def add_vertex(self, v, data = {}):
-		if(v in self.V()): return
+		self.version += 1
+		for key in self.indexes:
+			for v in added: self.__index_vertex__(key, v)
+		if(self.listeners):
+			for v in added: self.__notify__('add_vertex', v)
+		return added
 
+	def add_vertex(self, v, data = None):
+		if(v in self.adj): return
+
+		# a fresh dict per vertex, rather than one shared default
+		if(data == None): data = {}
 		self.data[v] = data
 		if('id' not in self.data[v]): self.data[v]['id'] = v
 		if('name' not in self.data[v]): self.data[v]['name'] = v
 
 		self.adj[v] = {}
+		if(self.tracks_incoming()): self.radj[v] = {}
+		self.version += 1
+		for key in self.indexes:
+			self.__index_vertex__(key, v)
+		if(self.listeners): self.__notify__('add_vertex', v)
 
 	def add_edges(self, edges):
-		for edge in edges: 
-			self.add_edge(edge)
+		self.add_edges_bulk(edges)
+
+	@staticmethod
+	def from_edges(edges, attrs={}):
+		g = Graph(attrs)
+		g.add_edges_bulk(edges)
+		return g
+
+	# adds many edges at once. 'edges' holds Edges or (v1, v2),
+	# (v1, v2, wt) or (v1, v2, wt, cap) tuples, or is a NumPy array
+	# of such rows. All endpoints are added in one batch first, then
+	# one pass fills the adjacency, skipping edges already in the
+	# graph (or earlier in 'edges') just like add_edge, and the new
+	# edges are indexed and announced together. The cyclic garbage
+	# collector is paused meanwhile, since the batch allocates many
+	# containers but no cycles. Returns counts of the edges read,
+	# edges added, duplicates skipped and vertices added.
+	def add_edges_bulk(self, edges):
+		collecting = gc.isenabled()
+		gc.disable()
+		try:
+			return self.__add_edges_bulk__(edges)
+		finally:
+			if(collecting): gc.enable()
+
+	def __add_edges_bulk__(self, edges):
+		items = edges.tolist() if hasattr(edges, 'tolist') else list(edges)
+		try:
+			ends = [v for item in items for v in (item[0], item[1])]
+		except TypeError:
+			# Edges are not indexable
+			ends = [v for item in items for v in \
+					((item.v1, item.v2) if isinstance(item, EdgeBase) else (item[0], item[1]))]
+		added = self.add_vertices(ends)
+
+		adj, radj, directed = self.adj, self.radj, self.attrs['directed']
+		fresh = []
+		for item in items:
+			if(isinstance(item, EdgeBase)):
+				edge, v1, v2 = item, item.v1, item.v2
+			else:
+				edge, v1, v2 = None, item[0], item[1]
+			row = adj[v1]
+			if(v2 in row or (not directed and v1 in adj[v2])): continue
+			if(edge is None):
+				size = len(item)
+				edge = Edge(v1, v2, directed, item[2] if size > 2 else None,
+							item[3] if size > 3 else None)
+			row[v2] = edge
+			if(not directed): adj[v2][v1] = edge
+			fresh.append(edge)
+		if(self.tracks_incoming()):
+			for edge in fresh: radj[edge.v2][edge.v1] = edge
+
+		if(fresh):
+			self.E.extend(fresh)
+			self.version += 1
+			if(self.listeners):
+				for edge in fresh: self.__notify__('add_edge', edge)
+		return {'read' : len(items), 'edges' : len(fresh),
+				'duplicates' : len(items) - len(fresh), 'vertices' : len(added)}
 
 	def add_edge(self, edge):
 		# add endpoints if thet aren't already
 		# in the graph
 		self.add_vertices(edge.endpoints())
+		if(self.__duplicate__(edge.v1, edge.v2)): return
+		self.__link__(edge)
 
-		# duplicate detection
-		if(edge.v2 in self.adj[edge.v1] or \
-			 (not self.attrs['directed'] \
-			 	and edge.v1 in self.adj[edge.v2])): return
+	def connect(self, id1, id2, wt=None, cap=None):
+		self.add_edge(Edge(id1, id2, self.attrs['directed'], wt, cap))
 
-		if(self.attrs['directed']):
-			self.adj[edge.start()][edge.end()] = edge
-		else:
-			self.adj[edge.v1][edge.v2] = edge
+	def __duplicate__(self, v1, v2):
+		return v2 in self.adj[v1] or \
+			 (not self.attrs['directed'] and v1 in self.adj[v2])
+
+	# links one new, non-duplicate edge whose endpoints are already in
+	# the graph. Every single-edge add (add_edge, connect) ends here.
+	def __link__(self, edge):
+		self.adj[edge.v1][edge.v2] = edge
+		if(not self.attrs['directed']):
 			self.adj[edge.v2][edge.v1] = edge
+		elif(self.tracks_incoming()):
+			self.radj[edge.v2][edge.v1] = edge
 
-		self.E.append(edge)
-
-	def connect(self, id1, id2, wt=None, cap=None):
-		edge = Edge(id1, id2, self.attrs['directed'], wt, cap)
-		self.add_edge(edge)
+		self.E.add(edge)
+		self.version += 1
+		if(self.listeners): self.__notify__('add_edge', edge)
 
 	def disconnect(self, v1, v2):
 		if(v1 not in self.adj): return
 		if(v2 not in self.adj[v1]): return
 
-		self.E.remove(self.adj[v1][v2])
+		edge = self.adj[v1][v2]
+		self.E.discard(edge)
 		del self.adj[v1][v2]
 
-		if(not self.attrs['directed']):
+		if(self.tracks_incoming()):
+			del self.radj[v2][v1]
+		elif(not self.attrs['directed'] and v1 != v2):
 			del self.adj[v2][v1]
+		self.version += 1
+		if(self.listeners): self.__notify__('remove_edge', edge)
 
 	def remove_edge(self, edge):
-		if(edge not in self.E): return
+		if(edge.v1 not in self.adj): return
+		found = self.adj[edge.v1].get(edge.v2)
+		if(found is None or not found.equals(edge)): return
 		self.disconnect(edge.v1, edge.v2)
 
+	# only the vertex's own edges are visited, unless the graph
+	# is directed without an incoming map, in which case every
+	# vertex is checked for an edge into vtx.
 	def remove_vertex(self, vtx):
 		if(vtx not in self.adj): return
-		for n in self.adj:
-			if(vtx in self.adj[n]): 
-				self.E.remove(self.adj[n][vtx])
-				del self.adj[n][vtx]
-
-		if(vtx in self.adj):
-			keys = self.adj[vtx].keys()
-			for n in keys:
-				self.E.remove(self.adj[vtx][n])
-				del self.adj[vtx][n]
-			del self.adj[vtx]
+		for n in list(self.adj[vtx]):
+			self.disconnect(vtx, n)
+
+		if(self.tracks_incoming()):
+			for n in list(self.radj[vtx]):
+				self.disconnect(n, vtx)
+			del self.radj[vtx]
+		elif(self.attrs['directed']):
+			for n in [n for n in self.adj if vtx in self.adj[n]]:
+				self.disconnect(n, vtx)
+		del self.adj[vtx]
+
+		for key in self.indexes:
+			self.__unindex_vertex__(key, vtx)
+		del self.data[vtx]
+		self.version += 1
+		if(self.listeners): self.__notify__('remove_vertex', vtx)
+
+	# listener methods
+	def subscribe(self, callback):
+		self.listeners.append(callback)
+
+	def unsubscribe(self, callback):
+		if(callback in self.listeners): self.listeners.remove(callback)
+
+	def __notify__(self, event, item):
+		for callback in list(self.listeners):
+			callback(event, item)
+
+	# attribute index methods
+	def index_attribute(self, key):
+		self.indexes[key] = {}
+		for v in self.adj:
+			self.__index_vertex__(key, v)
+
+	def drop_index(self, key):
+		self.indexes.pop(key, None)
+
+	def has_index(self, key):
+		return key in self.indexes
+
+	# the vertices whose data holds key == value. Without an
+	# index on key, every vertex is checked.
+	def lookup(self, key, value):
+		if(key in self.indexes):
+			return list(self.indexes[key].get(value, ()))
+		return [v for v in self.adj if self.data[v].get(key) == value]
+
+	def set_data(self, v, key, value):
+		if(key in self.indexes): self.__unindex_vertex__(key, v)
+		self.data[v][key] = value
+		if(key in self.indexes): self.__index_vertex__(key, v)
+		self.version += 1
+
+	def __index_vertex__(self, key, v):
+		if(key not in self.data[v]): return
+		self.indexes[key].setdefault(self.data[v][key], set()).add(v)
+
+	def __unindex_vertex__(self, key, v):
+		if(key not in self.data[v]): return
+		index, value = self.indexes[key], self.data[v][key]
+		holders = index.get(value)
+		if(holders == None): return
+		holders.discard(v)
+		if(not holders): del index[value]
 
 	# utility methods
+	def has_vertex(self, v):
+		return v in self.adj
+
 	def connected(self, v1, v2): 
 		return (v2 in self.adj[v1]) \
 				or(v1 in self.adj[v2])
 
+	def edge(self, v1, v2):
+		return self.adj[v1].get(v2)
+
 	def neighbors(self, v): 
 		return self.adj[v].keys()
 
@@ -121,6 +339,8 @@ class Graph:
 	def edges_into(self, v):
 		if(not self.attrs['directed']): 
 			return self.edges(v)
+		if(self.tracks_incoming()):
+			return list(self.radj[v].values())
 
 		edges = [self.adj[vtx][v] for vtx in self.V() if v in self.adj[vtx]]
 		return edges
@@ -132,45 +352,34 @@ class Graph:
 		return self.degree(v)
 
 	def in_degree(self, v): 
+		if(self.tracks_incoming()):
+			return len(self.radj[v])
 		return len(self.edges_into(v))
 
 	def random_vertex(self): 
-		return random.choice(self.V())
+		return random.choice(list(self.adj))
 
 	def random_edge(self): 
-		return random.choice(self.E())
+		return random.choice(self.E)
 
 	def cut(self, vertices):
 		for v in vertices:
 			self.remove_vertex(v)
 
 	def compliment(self):
-		g = Graph()
-		for v1 in self.V():
-			for v2 in self.V():
-				if(v1 == v2): continue
-				g.add_vertices([v1, v2])
-				if(v1 not in self.adj or \
-					v2 not in self.adj[v1]):
-					g.connect(v1, v2)
-		return g
+		return ComplementView(self)
 
 	def reverse(self):
-		g = Graph({'directed' : True})
-		for v1 in self.V():
-			g.add_vertex(v1)
-			for v2 in self.adj[v1]:
-				g.connect(v2, v1)
-		return g
+		return ReversedView(self)
+
+	def freeze(self):
+		return CSRGraph.from_graph(self)
+
+	def save_snapshot(self, path):
+		self.freeze().save_snapshot(path)
 
 	def subgraph(self, vertices):
-		g = Graph()
-		for v1 in vertices:
-			if(v1 not in self.adj): continue
-			g.add_vertex(v1)
-			for v2 in self.adj[v1]:
-				g.add_edge(self.adj[v1][v2])
-		return g
+		return SubgraphView(self, vertices)
 
 	def equals(self, g2):
 		if(isinstance(g2, self.__class__)):
@@ -200,12 +409,36 @@ class Graph:
 	# attribute modifiers
 	def set_directed(self, directed): 
 		self.attrs['directed'] = directed
+		self.__index_incoming__()
+		self.version += 1
+
+	def set_incoming(self, incoming):
+		self.attrs['incoming'] = incoming
+		self.__index_incoming__()
+
+	def __index_incoming__(self):
+		self.radj = {}
+		if(not self.tracks_incoming()): return
+
+		for v in self.adj: self.radj[v] = {}
+		for v1 in self.adj:
+			for v2 in self.adj[v1]:
+				self.radj[v2][v1] = self.adj[v1][v2]
 
 	def set_flowgraph(self, capacious): 
 		self.attrs['capacious'] = capacious
+		self.version += 1
 
 	def set_weighted(self, weighted): 
 		self.attrs['weighted'] = weighted
+		self.version += 1
+
+	# algorithm(self, *args, **kwargs), or its result from the last
+	# time it was asked for with the same arguments if the graph has
+	# not changed since.
+	def cached(self, algorithm, *args, **kwargs):
+		key = (algorithm, args, tuple(sorted(kwargs.items())))
+		return self.cache.get(key, self.version, lambda: algorithm(self, *args, **kwargs))
 
 	# accessor methods
 	def V(self): 
@@ -224,4 +457,792 @@ class Graph:
 		return self.attrs['capacious']
 
 	def is_weighted(self): 
-		return self.attrs['weighted']
\ No newline at end of file
+		return self.attrs['weighted']
+
+	def tracks_incoming(self):
+		return self.attrs['directed'] and self.attrs['incoming']
+
+############################
+# DATA STRUCTURE: GraphView
+# ~ Base class for read-only views over a graph (a Graph, a CSRGraph or
+# ~ another view). A view copies no vertices or edges: it answers V,
+# ~ neighbors, edge, edges and degree queries by looking at the
+# ~ underlying graph, so later changes to that graph show through.
+# ~ Subclasses define V, has_vertex, neighbors, edge, edges_into,
+# ~ in_degree, all_edges and num_edges; everything else is derived here.
+# ~ Call materialize() to get an independent, mutable Graph.
+############################
+class GraphView:
+
+	def __init__(self, graph, attrs={}):
+		self.g = graph
+		self.data = graph.data
+		self.attrs = dict(graph.attrs)
+		self.attrs.update(attrs)
+		self.E = LazyEdges(self)
+
+	def edges(self, v):
+		return [self.edge(v, n) for n in self.neighbors(v)]
+
+	def edges_from(self, v):
+		return self.edges(v)
+
+	def degree(self, v):
+		return len(self.neighbors(v))
+
+	def out_degree(self, v):
+		return self.degree(v)
+
+	def connected(self, v1, v2):
+		return self.edge(v1, v2) is not None or self.edge(v2, v1) is not None
+
+	def random_vertex(self):
+		return random.choice(list(self.V()))
+
+	def random_edge(self):
+		return random.choice(list(self.E))
+
+	def reverse(self):
+		return ReversedView(self)
+
+	def subgraph(self, vertices):
+		return SubgraphView(self, vertices)
+
+	def compliment(self):
+		return ComplementView(self)
+
+	def materialize(self):
+		g = Graph(self.attrs)
+		for v in self.V():
+			g.add_vertex(v, self.data.get(v, {}))
+		g.add_edges(self.E)
+		return g
+
+	def __str__(self):
+		return str(self.E) if len(self.E) else str(list(self.V()))
+
+	def __repr__(self):
+		return self.__str__()
+
+	# accessor methods
+	def num_vertices(self):
+		return len(self.V())
+
+	def is_directed(self):
+		return self.attrs['directed']
+
+	def is_flowgraph(self):
+		return self.attrs['capacious']
+
+	def is_weighted(self):
+		return self.attrs['weighted']
+
+############################
+# DATA STRUCTURE: ReversedView
+# ~ The reverse of a graph, as a directed graph: every edge u->v of a
+# ~ directed graph appears as v->u, and every undirected edge appears
+# ~ in both directions. Reversed Edge objects are only built when an
+# ~ edge is asked for.
+#
+# IMPLEMENTATION:
+# ~ The neighbors of v in the reverse are v's in-neighbors. An
+# ~ undirected graph already has them in its adjacency, and a Graph
+# ~ with the 'incoming' attribute keeps them in radj, so both are read
+# ~ live. For any other directed graph, an in-neighbor map holding
+# ~ references to the existing edges is built once, up front; it does
+# ~ not follow edges added to the graph afterwards.
+############################
+class ReversedView(GraphView):
+
+	def __init__(self, graph):
+		GraphView.__init__(self, graph, {'directed' : True})
+		self.pred = None
+		if(not graph.is_directed()): return
+
+		if(isinstance(graph, Graph) and graph.tracks_incoming()):
+			self.pred = graph.radj
+			return
+
+		self.pred = dict((v, {}) for v in graph.V())
+		for v in graph.V():
+			for n in graph.neighbors(v):
+				self.pred[n][v] = graph.edge(v, n)
+
+	def __flip__(self, v1, v2, e):
+		return Edge(v1, v2, True, e.wt, e.cap)
+
+	def V(self):
+		return self.g.V()
+
+	def has_vertex(self, v):
+		return self.g.has_vertex(v)
+
+	def neighbors(self, v):
+		if(self.pred == None): return self.g.neighbors(v)
+		return list(self.pred[v].keys())
+
+	def edge(self, v1, v2):
+		if(self.pred == None):
+			e = self.g.edge(v1, v2)
+		else:
+			e = self.pred[v1].get(v2)
+		return None if e is None else self.__flip__(v1, v2, e)
+
+	def edges_into(self, v):
+		return [self.__flip__(e.other(v), v, e) for e in self.g.edges(v)]
+
+	def degree(self, v):
+		if(self.pred == None): return self.g.degree(v)
+		return len(self.pred[v])
+
+	def in_degree(self, v):
+		return self.g.degree(v)
+
+	def all_edges(self):
+		if(self.pred != None):
+			for e in self.g.E:
+				yield self.__flip__(e.v2, e.v1, e)
+			return
+
+		for v in self.V():
+			for n in self.g.neighbors(v):
+				yield self.edge(v, n)
+
+	def num_edges(self):
+		if(self.pred != None): return len(self.g.E)
+		return sum(self.g.degree(v) for v in self.V())
+
+	def reverse(self):
+		return self.g
+
+############################
+# DATA STRUCTURE: SubgraphView
+# ~ The subgraph induced by a set of vertices, or by every vertex for
+# ~ which a filter function returns True. Only edges with both endpoints
+# ~ kept are visible, and they are the graph's own Edge objects.
+############################
+class SubgraphView(GraphView):
+
+	def __init__(self, graph, vertices):
+		GraphView.__init__(self, graph)
+		if(callable(vertices)):
+			self.keep = vertices
+		else:
+			self.keep = set(vertices).__contains__
+
+	def V(self):
+		keep = self.keep
+		return [v for v in self.g.V() if keep(v)]
+
+	def has_vertex(self, v):
+		return self.g.has_vertex(v) and self.keep(v)
+
+	def neighbors(self, v):
+		keep = self.keep
+		return [n for n in self.g.neighbors(v) if keep(n)]
+
+	def edge(self, v1, v2):
+		if(not self.keep(v1) or not self.keep(v2)): return None
+		return self.g.edge(v1, v2)
+
+	def edges_into(self, v):
+		keep = self.keep
+		return [e for e in self.g.edges_into(v) if keep(e.other(v))]
+
+	def in_degree(self, v):
+		return len(self.edges_into(v))
+
+	def all_edges(self):
+		keep = self.keep
+		for e in self.g.E:
+			if(keep(e.v1) and keep(e.v2)): yield e
+
+	def num_edges(self):
+		return sum(1 for e in self.all_edges())
+
+############################
+# DATA STRUCTURE: ComplementView
+# ~ The undirected, unweighted complement of a graph: u and v (u != v)
+# ~ are adjacent exactly when the graph does not connect them in both
+# ~ directions. Edges are built on demand, since the complement of a
+# ~ sparse graph has O(V^2) of them.
+############################
+class ComplementView(GraphView):
+
+	def __init__(self, graph):
+		GraphView.__init__(self, graph, {'directed' : False,
+										 'weighted' : False,
+										 'capacious' : False})
+
+	def __absent__(self, v1, v2):
+		return self.g.edge(v1, v2) is None or self.g.edge(v2, v1) is None
+
+	def V(self):
+		return self.g.V()
+
+	def has_vertex(self, v):
+		return self.g.has_vertex(v)
+
+	def neighbors(self, v):
+		return [n for n in self.g.V() if n != v and self.__absent__(v, n)]
+
+	def edge(self, v1, v2):
+		if(v1 == v2 or not self.__absent__(v1, v2)): return None
+		return Edge(v1, v2)
+
+	def edges_into(self, v):
+		return self.edges(v)
+
+	def in_degree(self, v):
+		return self.degree(v)
+
+	def all_edges(self):
+		vtxs = list(self.V())
+		for i in range(len(vtxs)):
+			for j in range(i + 1, len(vtxs)):
+				if(self.__absent__(vtxs[i], vtxs[j])):
+					yield Edge(vtxs[i], vtxs[j])
+
+	# pairs connected in both directions are the only ones missing
+	# from the complement, so count those instead of the pairs.
+	def num_edges(self):
+		n = self.g.num_vertices()
+		linked = 0
+		for e in self.g.E:
+			if(e.v1 == e.v2): continue
+			if(not self.g.is_directed()):
+				linked += 2
+			elif(self.g.edge(e.v2, e.v1) is not None):
+				linked += 1
+		return n * (n - 1) // 2 - linked // 2
+
+############################
+# DATA STRUCTURE: LazyEdges
+# ~ The E attribute of a GraphView: an iterable over the view's edges
+# ~ that builds them one at a time instead of keeping a list.
+############################
+class LazyEdges:
+
+	def __init__(self, view):
+		self.view = view
+
+	def __len__(self):
+		return self.view.num_edges()
+
+	def __iter__(self):
+		return self.view.all_edges()
+
+	def __contains__(self, edge):
+		if(not self.view.has_vertex(edge.v1)): return False
+		return edge.equals(self.view.edge(edge.v1, edge.v2))
+
+	def __str__(self):
+		return str(list(self))
+
+	def __repr__(self):
+		return self.__str__()
+
+############################
+# DATA STRUCTURE: EdgeIndex
+# ~ The edge set of a Graph (Graph.E). It keeps insertion order like the
+# ~ list it replaces, but removing an edge is O(1): each edge's slot is
+# ~ found through a dictionary keyed by the edge's identity and blanked
+# ~ out, and the slot list is compacted once half of it is blank.
+# ~ Membership tests go through the graph's adjacency, so 'edge in g.E'
+# ~ is O(1) too and still uses Edge.equals.
+############################
+class EdgeIndex:
+
+	def __init__(self, graph):
+		self.g = graph
+		self.slots = []
+		self.pos = {}
+
+	def add(self, edge):
+		self.pos[id(edge)] = len(self.slots)
+		self.slots.append(edge)
+
+	def extend(self, edges):
+		start = len(self.slots)
+		self.pos.update(zip(map(id, edges), range(start, start + len(edges))))
+		self.slots.extend(edges)
+
+	def discard(self, edge):
+		i = self.pos.pop(id(edge), None)
+		if(i == None): return
+		self.slots[i] = None
+		if(len(self.pos) * 2 < len(self.slots)): self.__compact__()
+
+	def __compact__(self):
+		self.slots = [e for e in self.slots if e is not None]
+		self.pos = dict((id(e), i) for i, e in enumerate(self.slots))
+
+	def __len__(self):
+		return len(self.pos)
+
+	def __iter__(self):
+		for e in self.slots:
+			if(e is not None): yield e
+
+	def __getitem__(self, i):
+		if(len(self.pos) != len(self.slots)): self.__compact__()
+		return self.slots[i]
+
+	def __contains__(self, edge):
+		if(edge.v1 not in self.g.adj): return False
+		found = self.g.adj[edge.v1].get(edge.v2)
+		return found is not None and found.equals(edge)
+
+	def __str__(self):
+		return str(list(self))
+
+	def __repr__(self):
+		return self.__str__()
+
+# smallest array typecodes able to hold vertex/slot indices and values.
+def index_array(n, values=()):
+	return array('i' if n < 2**31 else 'l', values)
+
+def value_array(values):
+	values = list(values)
+	if(all(v == None for v in values)): return None
+	if(all(isinstance(v, int) for v in values)): return array('l', values)
+	return array('d', [float('nan') if v == None else v for v in values])
+
+def array_value(arr, i):
+	if(arr == None): return None
+	v = arr[i]
+	return None if v != v else v
+
+# (labels, offsets, targets) adjacency arrays of any graph: a CSRGraph's
+# own arrays, or arrays built in one O(V+E) pass over V() and neighbors().
+def adjacency_arrays(g):
+	if(isinstance(g, CSRGraph)): return g.labels, g.offsets, g.targets
+
+	labels = list(g.V())
+	index = dict((v, i) for i, v in enumerate(labels))
+	offsets, targets = array('l', [0]), index_array(len(labels))
+	for v in labels:
+		targets.extend([index[n] for n in g.neighbors(v)])
+		offsets.append(len(targets))
+	return labels, offsets, targets
+
+# per-slot edge weights lined up with adjacency_arrays(g), as an int or
+# float array. Unweighted edges count as weight 1.
+def slot_weights(g, labels, offsets, targets):
+	if(isinstance(g, CSRGraph)):
+		wts, slot_edge = g.wts, g.slot_edge
+		values = [array_value(wts, slot_edge[s]) for s in range(len(targets))] \
+				 if wts != None else []
+	else:
+		values = []
+		for v in range(len(labels)):
+			for s in range(offsets[v], offsets[v + 1]):
+				values.append(g.edge(labels[v], labels[targets[s]]).wt)
+	values = [1 if w == None else w for w in values]
+	if(not values): return array('l', [1]) * len(targets)
+	return value_array(values)
+
+# (labels, edges, src, dst, weights) with one array entry per edge of g,
+# lined up with the 'edges' sequence (g.E itself for a CSRGraph, a list
+# of g.E otherwise). Unweighted edges count as weight 1.
+def edge_arrays(g):
+	if(isinstance(g, CSRGraph)):
+		wts = g.wts
+		if(wts == None):
+			wts = array('l', [1]) * len(g.src)
+		elif(wts.typecode == 'd'):
+			wts = array('d', [1 if w != w else w for w in wts])
+		return g.labels, g.E, g.src, g.dst, wts
+
+	labels = list(g.V())
+	index = dict((v, i) for i, v in enumerate(labels))
+	edges = list(g.E)
+	n = len(labels)
+	src = index_array(n, [index[e.v1] for e in edges])
+	dst = index_array(n, [index[e.v2] for e in edges])
+	wts = value_array([1 if e.wt == None else e.wt for e in edges]) or array('l')
+	return labels, edges, src, dst, wts
+
+# the transposed (incoming) adjacency of a pair of CSR arrays. If per-slot
+# values are given, they are carried over and returned as a third array.
+def transpose_arrays(offsets, targets, values=None):
+	n = len(offsets) - 1
+	roffsets = array('l', [0]) * (n + 1)
+	for t in targets: roffsets[t + 1] += 1
+	for i in range(n): roffsets[i + 1] += roffsets[i]
+
+	fill = array('l', roffsets)
+	rtargets = index_array(n, [0]) * len(targets)
+	rvalues = None if values == None else array(values.typecode, values)
+	for v in range(n):
+		for s in range(offsets[v], offsets[v + 1]):
+			t = targets[s]
+			rtargets[fill[t]] = v
+			if(rvalues != None): rvalues[fill[t]] = values[s]
+			fill[t] += 1
+	if(values == None): return roffsets, rtargets
+	return roffsets, rtargets, rvalues
+
+############################
+# DATA STRUCTURE: CSRGraph
+# ~ A frozen, read-only graph in compressed sparse row form. Vertex
+# ~ labels are mapped to dense ints 0..V-1, and the adjacency of vertex
+# ~ i is the slice targets[offsets[i]:offsets[i+1]]. Edge endpoints,
+# ~ weights and capacities live in flat typed arrays, so no Edge object
+# ~ or dictionary is kept per edge. Edge objects are only built when
+# ~ asked for (edge(), edges(), E).
+#
+# ~ It answers the same read-only queries as Graph (V, neighbors, edge,
+# ~ edges, degree, E, data, attrs, ...), so the read-only algorithms in
+# ~ graph_algs.py run on it directly. Use Graph.freeze() to build one
+# ~ and thaw() to get back a mutable Graph.
+#
+# ~ save_snapshot(path) writes the graph to a binary snapshot file,
+# ~ and load_snapshot(path) maps one back in (see SNAPSHOTS below).
+#
+# IMPLEMENTATION:
+# ~ Each undirected edge fills a slot in the rows of both of its
+# ~ endpoints, and slot_edge maps a slot back to its edge id. Rows are
+# ~ built with two stable counting sorts so each row is sorted by
+# ~ target, which makes edge(v1, v2) a binary search.
+#
+# RUNNING TIME:
+# ~ Build: O(V+E)
+# ~ Neighbors / Edges: O(deg)
+# ~ Edge Lookup: O(lg(deg))
+############################
+class CSRGraph:
+
+	def __init__(self, labels, offsets, targets, slot_edge, src, dst,
+				 weights=None, capacities=None, attrs=None, data=None):
+		self.labels = labels
+		self.index = dict((v, i) for i, v in enumerate(labels))
+		self.offsets = offsets
+		self.targets = targets
+		self.slot_edge = slot_edge
+		self.src = src
+		self.dst = dst
+		self.wts = weights
+		self.caps = capacities
+		self.attrs = {'weighted':False,
+					  'directed':False,
+					  'capacious':False,
+					  'incoming':False }
+		self.attrs.update(attrs or {})
+		self.data = data if data != None else \
+			dict((v, {'id' : v, 'name' : v}) for v in labels)
+		self.E = CSREdges(self)
+		self.snapshot = None
+		self.version = 0
+		self.cache = ResultCache()
+
+	@staticmethod
+	def from_arrays(labels, src, dst, weights=None, capacities=None, attrs=None, data=None):
+		n, m = len(labels), len(src)
+		directed = (attrs or {}).get('directed', False)
+
+		# one slot per directed edge, two per undirected
+		# non-loop edge.
+		slot_src, slot_dst, slot_eid = [], [], []
+		for e in range(m):
+			slot_src.append(src[e]); slot_dst.append(dst[e]); slot_eid.append(e)
+			if(not directed and src[e] != dst[e]):
+				slot_src.append(dst[e]); slot_dst.append(src[e]); slot_eid.append(e)
+
+		# stable counting sort by target, then by source, so
+		# each row ends up sorted by target.
+		order = CSRGraph.__counting_sort__(slot_dst, range(len(slot_dst)), n)
+		order = CSRGraph.__counting_sort__(slot_src, order, n)
+
+		offsets = index_array(len(order), [0] * (n + 1))
+		for s in slot_src: offsets[s + 1] += 1
+		for i in range(n): offsets[i + 1] += offsets[i]
+
+		return CSRGraph(list(labels), offsets,
+						index_array(n, [slot_dst[s] for s in order]),
+						index_array(m, [slot_eid[s] for s in order]),
+						index_array(n, src), index_array(n, dst),
+						weights, capacities, attrs, data)
+
+	@staticmethod
+	def __counting_sort__(keys, order, n):
+		counts = [0] * (n + 1)
+		for s in order: counts[keys[s] + 1] += 1
+		for i in range(n): counts[i + 1] += counts[i]
+		ret = [0] * len(keys)
+		for s in order:
+			ret[counts[keys[s]]] = s
+			counts[keys[s]] += 1
+		return ret
+
+	@staticmethod
+	def from_graph(g):
+		labels = list(g.V())
+		index = dict((v, i) for i, v in enumerate(labels))
+		edges = list(g.E)
+		return CSRGraph.from_arrays(labels,
+									[index[e.v1] for e in edges],
+									[index[e.v2] for e in edges],
+									value_array(e.wt for e in edges),
+									value_array(e.cap for e in edges),
+									g.attrs, dict(g.data))
+
+	def save_snapshot(self, path):
+		data = self.data
+		if(all(data.get(v) == {'id' : v, 'name' : v} for v in self.labels)): data = None
+
+		names = ['offsets', 'targets', 'slot_edge', 'src', 'dst', 'wts', 'caps']
+		arrays = [(name, getattr(self, name)) for name in names \
+				  if getattr(self, name) is not None]
+		table, offset = [], 0
+		for name, values in arrays:
+			table.append((name, values.typecode, ctypes.sizeof(SNAPSHOT_TYPES[values.typecode]),
+						  offset, len(values)))
+			offset = snapshot_align(offset + len(values) * table[-1][2])
+
+		meta = pickle.dumps({'labels' : self.labels, 'attrs' : self.attrs,
+							 'data' : data, 'arrays' : table}, 2)
+		header = struct.pack(SNAPSHOT_HEADER, SNAPSHOT_MAGIC, SNAPSHOT_VERSION,
+							 sys.byteorder == 'little', len(meta))
+		with open(path, 'wb') as f:
+			f.write(header)
+			f.write(meta)
+			written = len(header) + len(meta)
+			base = snapshot_align(written)
+			for (name, values), entry in zip(arrays, table):
+				f.write(b'\0' * (base + entry[3] - written))
+				if(not isinstance(values, array)): values = array(values.typecode, values)
+				values.tofile(f)
+				written = base + entry[3] + len(values) * entry[2]
+
+	# as Graph.cached; a CSRGraph never changes, so results stay
+	# cached until they are evicted.
+	def cached(self, algorithm, *args, **kwargs):
+		key = (algorithm, args, tuple(sorted(kwargs.items())))
+		return self.cache.get(key, self.version, lambda: algorithm(self, *args, **kwargs))
+
+	def thaw(self):
+		g = Graph(self.attrs)
+		for v in self.labels:
+			g.add_vertex(v, self.data.get(v, {}))
+		g.add_edges(self.E)
+		return g
+
+	# integer-indexed accessors
+	def has_vertex(self, v):
+		return v in self.index
+
+	def vertex_id(self, v):
+		return self.index[v]
+
+	def label(self, i):
+		return self.labels[i]
+
+	def neighbor_ids(self, i):
+		return self.targets[self.offsets[i]:self.offsets[i + 1]]
+
+	def edge_at(self, e):
+		return Edge(self.labels[self.src[e]], self.labels[self.dst[e]],
+					self.attrs['directed'], array_value(self.wts, e),
+					array_value(self.caps, e))
+
+	# utility methods
+	def connected(self, v1, v2):
+		return self.edge(v1, v2) is not None or self.edge(v2, v1) is not None
+
+	def edge(self, v1, v2):
+		i, j = self.index[v1], self.index.get(v2)
+		if(j == None): return None
+		lo, hi = self.offsets[i], self.offsets[i + 1]
+		s = bisect_left(self.targets, j, lo, hi)
+		if(s == hi or self.targets[s] != j): return None
+		return self.edge_at(self.slot_edge[s])
+
+	def neighbors(self, v):
+		labels = self.labels
+		return [labels[t] for t in self.neighbor_ids(self.index[v])]
+
+	def edges(self, v):
+		i = self.index[v]
+		return [self.edge_at(self.slot_edge[s]) \
+				for s in range(self.offsets[i], self.offsets[i + 1])]
+
+	def edges_from(self, v):
+		return self.edges(v)
+
+	def edges_into(self, v):
+		if(not self.attrs['directed']):
+			return self.edges(v)
+
+		j = self.index[v]
+		return [self.edge_at(e) for e in range(len(self.dst)) if self.dst[e] == j]
+
+	def degree(self, v):
+		i = self.index[v]
+		return self.offsets[i + 1] - self.offsets[i]
+
+	def out_degree(self, v):
+		return self.degree(v)
+
+	def in_degree(self, v):
+		return len(self.edges_into(v))
+
+	def random_vertex(self):
+		return random.choice(self.labels)
+
+	def random_edge(self):
+		return self.edge_at(random.randrange(len(self.src)))
+
+	def reverse(self):
+		attrs = dict(self.attrs)
+		attrs['directed'] = True
+		if(self.attrs['directed']):
+			return CSRGraph.from_arrays(self.labels, self.dst, self.src,
+										self.wts, self.caps, attrs, self.data)
+
+		# an undirected edge becomes a pair of opposite directed
+		# edges (loops stay single).
+		keep = [e for e in range(len(self.src)) if self.src[e] != self.dst[e]]
+		src = list(self.dst) + [self.src[e] for e in keep]
+		dst = list(self.src) + [self.dst[e] for e in keep]
+		wts, caps = self.wts, self.caps
+		if(wts != None): wts = array(wts.typecode, list(wts) + [wts[e] for e in keep])
+		if(caps != None): caps = array(caps.typecode, list(caps) + [caps[e] for e in keep])
+		return CSRGraph.from_arrays(self.labels, src, dst, wts, caps, attrs, self.data)
+
+	def subgraph(self, vertices):
+		return SubgraphView(self, vertices)
+
+	def compliment(self):
+		return ComplementView(self)
+
+	def __str__(self):
+		return str(list(self.E)) if len(self.E) else str(self.V())
+
+	def __repr__(self):
+		return self.__str__()
+
+	# accessor methods
+	def V(self):
+		return self.labels
+
+	def num_vertices(self):
+		return len(self.labels)
+
+	def num_edges(self):
+		return len(self.src)
+
+	def is_directed(self):
+		return self.attrs['directed']
+
+	def is_flowgraph(self):
+		return self.attrs['capacious']
+
+	def is_weighted(self):
+		return self.attrs['weighted']
+
+############################
+# DATA STRUCTURE: CSREdges
+# ~ Read-only sequence view over the edges of a CSRGraph. Edge
+# ~ objects are built on demand while iterating or indexing.
+############################
+class CSREdges:
+
+	def __init__(self, g):
+		self.g = g
+
+	def __len__(self):
+		return len(self.g.src)
+
+	def __getitem__(self, e):
+		if(e < 0): e += len(self)
+		if(e < 0 or e >= len(self)): raise IndexError("edge index out of range")
+		return self.g.edge_at(e)
+
+	def __iter__(self):
+		for e in range(len(self.g.src)):
+			yield self.g.edge_at(e)
+
+	def __contains__(self, edge):
+		if(edge.v1 not in self.g.index): return False
+		return edge.equals(self.g.edge(edge.v1, edge.v2))
+
+	def __str__(self):
+		return str(list(self))
+
+	def __repr__(self):
+		return self.__str__()
+
+############################
+# UTILITY: Graph Snapshots
+# ~ A versioned binary file holding a CSRGraph: its vertex label table,
+# ~ CSR offsets and targets, edge endpoints, and weight and capacity
+# ~ arrays. load_snapshot(path) maps the file with mmap and hands back a
+# ~ CSRGraph whose arrays are ctypes arrays over the mapped pages, so
+# ~ nothing is copied or parsed per edge, and every process that loads
+# ~ the same file shares the same pages through the OS page cache. The
+# ~ algorithms in graph_algs.py run on the mapped arrays directly.
+# ~ The label table is pickled, so only load snapshots you trust.
+#
+# FILE LAYOUT:
+# ~ header: magic, format version, byte order, metadata length
+# ~ metadata: pickled labels, attrs, vertex data and an array table of
+# ~           (name, typecode, itemsize, offset, length) entries
+# ~ arrays: raw array contents, each aligned to 8 bytes
+#
+# ~ The file is mapped copy-on-write, so the arrays can be written to
+# ~ without touching the file (CSRGraph itself never writes them).
+# ~ Snapshots only load on a machine of the same byte order and
+# ~ C type sizes as the one that wrote them (ValueError otherwise).
+#
+# RUNNING TIME:
+# ~ Save: O(V+E)
+# ~ Load: O(V)
+############################
+SNAPSHOT_MAGIC = b'CSRSNAP\0'
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = '<8sIIQ'
+SNAPSHOT_TYPES = {'b' : ctypes.c_byte, 'B' : ctypes.c_ubyte,
+				  'h' : ctypes.c_short, 'H' : ctypes.c_ushort,
+				  'i' : ctypes.c_int, 'I' : ctypes.c_uint,
+				  'l' : ctypes.c_long, 'L' : ctypes.c_ulong,
+				  'q' : ctypes.c_longlong, 'Q' : ctypes.c_ulonglong,
+				  'f' : ctypes.c_float, 'd' : ctypes.c_double}
+
+def snapshot_align(offset):
+	return (offset + 7) & ~7
+
+# a ctypes array of 'count' values over buf[offset:], tagged with the
+# array.array typecode it was written from.
+def mapped_array(buf, typecode, offset, count):
+	mapped = type('MappedArray', (ctypes.Array,),
+				  {'_type_' : SNAPSHOT_TYPES[typecode], '_length_' : count, 'typecode' : typecode})
+	return mapped.from_buffer(buf, offset)
+
+def load_snapshot(path):
+	with open(path, 'rb') as f:
+		buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+	size = struct.calcsize(SNAPSHOT_HEADER)
+	magic, version, little, length = struct.unpack_from(SNAPSHOT_HEADER, buf, 0)
+	if(magic != SNAPSHOT_MAGIC):
+		raise ValueError(path+" is not a graph snapshot")
+	if(version != SNAPSHOT_VERSION):
+		raise ValueError("unsupported snapshot version: "+str(version))
+	if(bool(little) != (sys.byteorder == 'little')):
+		raise ValueError("snapshot was written with a different byte order")
+
+	meta = pickle.loads(buf[size:size + length])
+	base = snapshot_align(size + length)
+	arrays = {}
+	for name, typecode, itemsize, offset, count in meta['arrays']:
+		if(ctypes.sizeof(SNAPSHOT_TYPES[typecode]) != itemsize):
+			raise ValueError("snapshot was written with a different size of '"+typecode+"'")
+		arrays[name] = mapped_array(buf, typecode, base + offset, count)
+
+	g = CSRGraph(meta['labels'], arrays['offsets'], arrays['targets'], arrays['slot_edge'],
+				 arrays['src'], arrays['dst'], arrays.get('wts'), arrays.get('caps'),
+				 meta['attrs'], meta['data'])
+	g.snapshot = path
+	return g
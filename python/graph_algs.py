@@ -1,6 +1,22 @@
-from other_algs import UnionFind
-from heap import MinHeap
-from graph import Graph
+import ctypes
+from array import array
+from collections import deque
+from multiprocessing import Pool, cpu_count
+from multiprocessing.sharedctypes import RawArray
+from other_algs import UnionFind, IntUnionFind
+from heap import IndexedPriorityQueue, MinHeap, PairingHeap, RadixHeap
+from graph import Graph, CSRGraph, load_snapshot
+from graph import adjacency_arrays, edge_arrays, slot_weights, transpose_arrays
+
+try:
+	import numpy
+except ImportError:
+	numpy = None
+
+try:
+	from concurrent.futures import ProcessPoolExecutor
+except ImportError:
+	ProcessPoolExecutor = None
 
 ############################
 # ALGORITHM: Bipartite
@@ -10,9 +26,10 @@ from graph import Graph
 # ~ empty, and is_bipartite will return False.
 #
 # IMPLEMENTATION:
-# ~ Performs a Breadth-First Traversal, 2-coloring nodes
-# ~ along the way. If any 2 adjacent nodes ever share the 
-# ~ same color, the graph cannot be bipartite.
+# ~ Performs a Breadth-First Traversal with the BFSEngine,
+# ~ 2-coloring nodes by the parity of their depth. If any 2
+# ~ adjacent nodes share the same color, the graph cannot
+# ~ be bipartite.
 ############################
 class Bipartite:
 	def __init__(self, graph):
@@ -20,35 +37,19 @@ class Bipartite:
 		self.algorithm(graph)
 
 	def algorithm(self, g):
-		marked, visited = {}, set()
-		for vtx in g.V():
-			if(vtx in visited): continue
-			marked[vtx] = True
-			visited.add(vtx)
-			queue = [vtx]
-			while(queue):
-				v = queue.pop(0)
-				for neigh in g.neighbors(v):
-					# premature vertex marking sameness detection
-					if(neigh in marked and marked[neigh] == marked[v]):
-						return
-					if(neigh in visited): continue
-					marked[neigh] = not marked[v]
-					visited.add(neigh)
-					queue.append(neigh)
+		engine = BFSEngine(g)
+		for v in engine.order(): pass
+		dist = engine.dist
 
 		# check that the endpoints of each
 		# edge are not the same marking.
 		for edge in g.E:
-			edge = list(edge)
-			m0 = marked[edge.v1]
-			m1 = marked[edge.v2]
-			if( m0 == m1): return
+			if(dist[edge.v1] % 2 == dist[edge.v2] % 2): return
 
 		# it is bipartite if the function reaches this point.
 		# divide into A and B bipartitions
 		for vertex in g.V():
-			if(marked[vertex]):
+			if(dist[vertex] % 2 == 0):
 				self.A.append(vertex)
 			else:
 				self.B.append(vertex)
@@ -65,28 +66,214 @@ class Bipartite:
 # ~ A graph is connected if there is a path from any node to
 # ~ any other node in the graph.
 #
+# ~ With dynamic=True, the result subscribes to the Graph and stays
+# ~ current as vertices and edges are added, so it can be asked again
+# ~ after every batch of insertions without rebuilding. Removals can't
+# ~ be undone in a union-find, so a removal only marks the result as
+# ~ stale, and the next query rebuilds it once from the graph, however
+# ~ many removals came before it. Call detach() to stop listening.
+# ~ Only a Graph can be subscribed to, so dynamic=True on a CSRGraph
+# ~ or a view raises ValueError.
+#
 # IMPLEMENTATION:
 # ~ Use a union-find to union all nodes in the graph based
 # ~ on the edges in the graph. Then look at the number of
 # ~ unions to determine the connected components of the graph.
+#
+# RUNNING TIME:
+# ~ Build: O(V+E)
+# ~ Add Vertex / Add Edge: O(a(V))
+# ~ Is Connected / Num Components: O(1)
+# ~ Component Of / Connected: O(a(V))
+# ~ Components: O(V)
 ############################
 class ConnectedComponents:
 
-	def __init__(self, graph):
-		self.comps = []
-		self.union_find = UnionFind(graph.V())
+	def __init__(self, graph, dynamic=False):
+		if(dynamic and not hasattr(graph, 'subscribe')):
+			raise ValueError("dynamic components need a Graph, not a "+graph.__class__.__name__)
+		self.g = graph
+		self.dynamic = dynamic
+		self.stale = False
 		self.algorithm(graph)
+		if(dynamic): graph.subscribe(self.update)
 
 	def algorithm(self, graph):
+		self.union_find = UnionFind(graph.V())
 		for e in graph.E:
 			self.union_find.union(e.v1, e.v2)
-		self.comps = self.union_find.unions()
+		self.stale = False
+
+	def update(self, event, item):
+		if(self.stale): return
+		if(event == 'add_vertex'):
+			self.union_find.makeset(item)
+		elif(event == 'add_edge'):
+			self.union_find.union(item.v1, item.v2)
+		else:
+			self.stale = True
+
+	def detach(self):
+		self.g.unsubscribe(self.update)
+		self.dynamic = False
+
+	def __current__(self):
+		if(self.stale): self.algorithm(self.g)
+		return self.union_find
 
 	def is_connected(self):
-		return len(self.comps) == 1
+		return self.__current__().num_sets() == 1
+
+	def num_components(self):
+		return self.__current__().num_sets()
+
+	def component_of(self, v):
+		return self.__current__().find(v)
+
+	def connected(self, v1, v2):
+		return self.__current__().connected(v1, v2)
 
 	def components(self):
-		return self.comps
+		return self.__current__().unions()
+
+############################
+# ALGORITHM: Breadth-First Search Engine
+# ~ The traversal shared by the breadth-first algorithms below.
+# ~ Takes a Graph (or CSRGraph / view) and walks it breadth first
+# ~ in one of two modes:
+#
+# ~ order()  yields vertices in BFS order, filling the 'dist' and
+# ~          'parent' dicts (a root's parent is None) as it goes.
+# ~ levels() expands one whole frontier at a time over the integer
+# ~          adjacency arrays, and returns (dist, parent) arrays
+# ~          indexed like 'labels'. Unreached vertices have dist -1
+# ~          and roots have parent -1.
+#
+# ~ Both take an optional list of roots, which all start at depth 0
+# ~ (a multi-source search). Without one, every vertex not yet reached
+# ~ starts a new search, so the whole graph is covered.
+#
+# IMPLEMENTATION:
+# ~ order() pops from a collections.deque, so each dequeue is O(1).
+# ~ levels() keeps the frontier as an array of vertex ids. When NumPy
+# ~ is installed, a frontier is expanded with array operations: the
+# ~ adjacency slots of all frontier vertices are gathered at once,
+# ~ unvisited targets are masked, and numpy.unique keeps the first
+# ~ sighting of each, so both paths pick the same parents.
+#
+# RUNNING TIME:
+# ~ O(V+E) for either mode.
+############################
+class BFSEngine:
+	def __init__(self, graph, vectorize=True):
+		self.g = graph
+		self.vectorize = vectorize and numpy != None
+		self.dist = {}
+		self.parent = {}
+		self.labels = None
+
+	def order(self, roots=None):
+		dist = self.dist
+		if(roots == None):
+			for root in self.g.V():
+				if(root in dist): continue
+				for v in self.__search__([root]): yield v
+		else:
+			for v in self.__search__([r for r in roots if r not in dist]):
+				yield v
+
+	def __search__(self, roots):
+		g, dist, parent = self.g, self.dist, self.parent
+		for r in roots:
+			dist[r] = 0
+			parent[r] = None
+		queue = deque(roots)
+		while(queue):
+			v = queue.popleft()
+			yield v
+			d = dist[v] + 1
+			for w in g.neighbors(v):
+				if(w in dist): continue
+				dist[w] = d
+				parent[w] = v
+				queue.append(w)
+
+	def levels(self, roots=None):
+		labels, offsets, targets = adjacency_arrays(self.g)
+		self.labels = labels
+		n = len(labels)
+		if(self.vectorize):
+			dist = numpy.full(n, -1, dtype=numpy.int64)
+			parent = numpy.full(n, -1, dtype=numpy.int64)
+			offsets = numpy_view(offsets).astype(numpy.int64)
+			targets = numpy_view(targets).astype(numpy.int64)
+			expand = self.__numpy_level__
+		else:
+			dist = array('l', [-1]) * n
+			parent = array('l', [-1]) * n
+			expand = self.__level__
+
+		if(roots != None):
+			index = dict((v, i) for i, v in enumerate(labels))
+			self.__frontiers__([index[r] for r in roots], expand, offsets, targets, dist, parent)
+		else:
+			for i in range(n):
+				if(dist[i] == -1):
+					self.__frontiers__([i], expand, offsets, targets, dist, parent)
+		return dist, parent
+
+	def __frontiers__(self, roots, expand, offsets, targets, dist, parent):
+		frontier = []
+		for r in roots:
+			if(dist[r] != -1): continue
+			dist[r] = 0
+			frontier.append(r)
+		if(self.vectorize): frontier = numpy.array(frontier, dtype=numpy.int64)
+
+		level = 0
+		while(len(frontier)):
+			level += 1
+			frontier = expand(frontier, level, offsets, targets, dist, parent)
+
+	def __level__(self, frontier, level, offsets, targets, dist, parent):
+		nxt = array('l')
+		for v in frontier:
+			for s in range(offsets[v], offsets[v + 1]):
+				w = targets[s]
+				if(dist[w] != -1): continue
+				dist[w] = level
+				parent[w] = v
+				nxt.append(w)
+		return nxt
+
+	def __numpy_level__(self, frontier, level, offsets, targets, dist, parent):
+		starts = offsets[frontier]
+		counts = offsets[frontier + 1] - starts
+		total = counts.sum()
+		if(total == 0): return frontier[:0]
+
+		# slot j of frontier vertex k lives at starts[k]+j, and is
+		# entry (number of slots before k)+j of the gathered block.
+		shift = numpy.repeat(starts - numpy.cumsum(counts) + counts, counts)
+		nbrs = targets[numpy.arange(total) + shift]
+		srcs = numpy.repeat(frontier, counts)
+
+		# keep the first sighting of each unvisited target, in the
+		# order the plain loop would have appended them.
+		fresh = dist[nbrs] == -1
+		nbrs, srcs = nbrs[fresh], srcs[fresh]
+		first = numpy.unique(nbrs, return_index=True)[1]
+		first.sort()
+		nbrs = nbrs[first]
+		dist[nbrs] = level
+		parent[nbrs] = srcs[first]
+		return nbrs
+
+# the set of vertices with data[key] == value, when g is a Graph that
+# has an index on key, or None when the lookup needs a traversal.
+def indexed_matches(g, key, value):
+	if(not isinstance(g, Graph) or not g.has_index(key)): return None
+	return g.indexes[key].get(value, set())
 
 ############################
 # ALGORITHM: Breadth-First Search (BFS)
@@ -94,78 +281,172 @@ class ConnectedComponents:
 # ~ item is found in the graph through the BFS, then
 # ~ it updates its result to that vertex. Otherwise,
 # ~ result becomes 'None' to indicate the query item
-# ~ was not found.
+# ~ was not found. If a start vertex is given, only
+# ~ vertices reachable from it are searched.
 #
 # IMPLEMENTATION:
-# ~ A BFS iteratively adds vertices to a queue by
-# ~ adding all neighbors first, then popping the queue
-# ~ until it is empty and all vertices have been visited.
+# ~ If the graph has an attribute index on the key (see
+# ~ Graph.index_attribute), a whole-graph query is answered
+# ~ from the index in O(1), returning any matching vertex.
+# ~ Otherwise, walks the vertices in the order the BFSEngine's
+# ~ queue hands them out, and stops at the first match.
 ############################
 class BFS:
-	def __init__(self, graph, key, value):
+	def __init__(self, graph, key, value, start=None):
 		self.key = key
 		self.value = value
+		self.start = start
 		self.result = self.algorithm(graph)
 
 	def algorithm(self, g):
-		visited = set()
-		for vtx in g.V():
-			if(vtx in visited): continue
-			visited.add(vtx)
-			queue = [vtx]
-			while(queue):
-				v = queue.pop(0)
-				if(g.data[v][self.key] == self.value): return v
-				for neigh in g.neighbors(v):
-					if(neigh in visited): continue
-					visited.add(neigh)
-					queue.append(neigh)
+		matches = indexed_matches(g, self.key, self.value)
+		if(matches != None):
+			if(not matches): return None
+			if(self.start == None): return next(iter(matches))
+
+		roots = None if self.start == None else [self.start]
+		for v in BFSEngine(g).order(roots):
+			if(matches != None):
+				if(v in matches): return v
+			elif(g.data[v][self.key] == self.value): return v
 		return None
 
+############################
+# ALGORITHM: Depth-First Search Engine
+# ~ The traversal shared by the depth-first algorithms below. Takes a
+# ~ Graph (or CSRGraph / view) and walks it depth first, reporting what
+# ~ happens as a stream of (event, v, w) tuples:
+#
+# ~ PRE     v discovered (w is its parent, or None for a root)
+# ~ TREE    edge v-w discovers w
+# ~ BACK    edge v-w leads to an ancestor of v still being explored
+# ~ FORWARD edge v-w leads to an already finished descendant of v
+# ~ CROSS   edge v-w leads to an already finished non-descendant
+# ~ POST    v finished (w is its parent, or None for a root)
+#
+# ~ Use events() as a generator, or run() with callbacks. On undirected
+# ~ graphs the edge back to a vertex's parent is not reported again, and
+# ~ each back edge is also seen from its lower end as a FORWARD edge.
+# ~ Vertices deeper than max_depth (if not -1) are not visited, and
+# ~ vertices in 'excluded' are treated as if they had been removed.
+# ~ Preorder numbers, parents and finished vertices stay available in
+# ~ 'order', 'parent' and 'done' afterwards.
+#
+# IMPLEMENTATION:
+# ~ An explicit stack of frames, each holding a vertex, an iterator
+# ~ over its neighbors and its depth, replaces the recursion, so the
+# ~ depth of the search is only bounded by memory.
+############################
+class DFSEngine:
+	PRE, TREE, BACK, FORWARD, CROSS, POST = \
+		'pre', 'tree', 'back', 'forward', 'cross', 'post'
+
+	def __init__(self, graph, max_depth=-1, excluded=()):
+		self.g = graph
+		self.max_d = max_depth
+		self.excluded = excluded
+		self.order = {}
+		self.parent = {}
+		self.done = set()
+
+	def events(self, roots=None):
+		if(roots == None): roots = self.g.V()
+		for root in roots:
+			if(root in self.order or root in self.excluded): continue
+			for event in self.__search__(root):
+				yield event
+
+	def run(self, roots=None, pre=None, post=None, edge=None):
+		for kind, v, w in self.events(roots):
+			if(kind == DFSEngine.PRE):
+				if(pre): pre(v, w)
+			elif(kind == DFSEngine.POST):
+				if(post): post(v, w)
+			elif(edge):
+				edge(kind, v, w)
+		return self
+
+	def __search__(self, root):
+		g, order, parent, done = self.g, self.order, self.parent, self.done
+		excluded, max_d = self.excluded, self.max_d
+		undirected = not g.is_directed()
+
+		order[root] = len(order)
+		parent[root] = None
+		yield (DFSEngine.PRE, root, None)
+
+		# frame: [vertex, neighbor iterator, depth, parent edge skipped]
+		stack = [[root, iter(g.neighbors(root)), 0, False]]
+		while(stack):
+			frame = stack[-1]
+			v, depth = frame[0], frame[2]
+			for w in frame[1]:
+				if(w in excluded): continue
+				if(w not in order):
+					if(max_d != -1 and depth >= max_d): continue
+					order[w] = len(order)
+					parent[w] = v
+					yield (DFSEngine.TREE, v, w)
+					yield (DFSEngine.PRE, w, v)
+					stack.append([w, iter(g.neighbors(w)), depth + 1, False])
+					break
+
+				if(undirected and not frame[3] and w == parent[v]):
+					frame[3] = True
+				elif(w not in done):
+					yield (DFSEngine.BACK, v, w)
+				elif(order[w] > order[v]):
+					yield (DFSEngine.FORWARD, v, w)
+				else:
+					yield (DFSEngine.CROSS, v, w)
+			else:
+				stack.pop()
+				done.add(v)
+				yield (DFSEngine.POST, v, parent[v])
+
 ############################
 # ALGORITHM: Depth-First Search (DFS)
 # ~ Takes a Graph and a query item as input. If the
 # ~ item is found in the graph through the DFS, then
 # ~ it updates its result to that vertex. Otherwise,
 # ~ result becomes 'None' to indicate the query item
-# ~ was not found.
+# ~ was not found. If a start vertex is given, only
+# ~ vertices reachable from it are searched.
 #
 # IMPLEMENTATION:
-# ~ A DFS recursively visits the children of each node
-# ~ before checking the node itself for the search query.
-# ~ In large unbounded graphs, it would be wise to limit
-# ~ the DFS with a maximum depth to make it a Depth
-# ~ Limited Search. This functionality is available here.
+# ~ A DFS visits the children of each node before checking
+# ~ the node itself for the search query, using the iterative
+# ~ DFSEngine above. In large unbounded graphs, it would be
+# ~ wise to limit the DFS with a maximum depth to make it a
+# ~ Depth Limited Search. This functionality is available here.
+# ~ As with BFS, a whole-graph query on an indexed key is
+# ~ answered from the graph's attribute index instead.
 ############################
 class DFS:
-	def __init__(self, graph, key, value, max_depth = -1):
+	def __init__(self, graph, key, value, max_depth = -1, start=None):
 		self.key = key
 		self.value = value
 		self.max_d = max_depth
+		self.start = start
 		self.visited = set()
 		self.result = self.algorithm(graph)
 
 	def algorithm(self, g):
-		for vtx in g.V():
-			if(vtx in self.visited): continue
-			self.visited.add(vtx)
-			res = self.__dfs_subroutine__(g, vtx, 0)
-			if(res != None): return res
+		matches = indexed_matches(g, self.key, self.value)
+		if(matches != None):
+			if(not matches): return None
+			if(self.start == None): return next(iter(matches))
+
+		engine = DFSEngine(g, self.max_d)
+		self.visited = engine.order
+		roots = None if self.start == None else [self.start]
+		for kind, v, w in engine.events(roots):
+			if(kind != DFSEngine.POST): continue
+			if(matches != None):
+				if(v in matches): return v
+			elif(g.data[v][self.key] == self.value): return v
 		return None
 
-	def __dfs_subroutine__(self, g, v, depth):
-		if(depth > self.max_d and self.max_d != -1): return None
-
-		for neigh in g.neighbors(v):
-			if(neigh in self.visited): continue
-			self.visited.add(neigh)
-			self.__dfs_subroutine__(g, neigh, depth+1)
-
-		if(g.data[v][self.key] == self.value): 
-			return v
-		else:
-			return None
-
 ############################
 # ALGORITHM: Depth-First Traversal (DFT)
 # ~ Takes a Graph and a start vertex as input. A depth
@@ -174,41 +455,33 @@ class DFS:
 # ~ traversed.
 #
 # IMPLEMENTATION:
-# ~ A DFT recursively visits the children of each node
-# ~ before visiting the node itself. In large unbounded 
-# ~ graphs, it would be wise to limit the DFT with a 
-# ~ maximum depth to make it a Limited Depth First Traversal.
-# ~ This functionality is available here.
+# ~ A DFT visits the children of each node before visiting
+# ~ the node itself, using the iterative DFSEngine above. In
+# ~ large unbounded graphs, it would be wise to limit the DFT
+# ~ with a maximum depth to make it a Limited Depth First
+# ~ Traversal. This functionality is available here. Vertices
+# ~ in 'excluded' are treated as if they had been removed from
+# ~ the graph.
 ############################
 class DFT:
-	def __init__(self, graph, start=None, max_depth=-1):
+	def __init__(self, graph, start=None, max_depth=-1, excluded=()):
 		self.max_d = max_depth
+		self.excluded = excluded
 		self.visited = set()
 		self.post = []
 		self.tree = Graph(graph.attrs)
 		self.algorithm(graph, start)
 
 	def algorithm(self, g, s):
-		if(s == None):
-			for v in g.V():
-				if(v in self.visited): continue
-				self.visited.add(v)
-				self.__dfs_subroutine__(g, v, 0)
-		else:
-			self.visited.add(s)
-			self.__dfs_subroutine__(g, s, 0)
-
-	def __dfs_subroutine__(self, g, v, depth):
-		if(depth > self.max_d and self.max_d != -1): return
-		self.tree.add_vertex(v)
-
-		for neigh in g.neighbors(v):
-			self.tree.add_edge(g.adj[v][neigh])
-			if(neigh in self.visited): continue
-			self.visited.add(neigh)
-			self.__dfs_subroutine__(g, neigh, depth+1)
-
-		self.post.append(v)
+		engine = DFSEngine(g, self.max_d, self.excluded)
+		self.visited = engine.order
+		for kind, v, w in engine.events(None if s == None else [s]):
+			if(kind == DFSEngine.PRE):
+				self.tree.add_vertex(v)
+			elif(kind == DFSEngine.POST):
+				self.post.append(v)
+			else:
+				self.tree.add_edge(g.edge(v, w))
 
 	def postorder(self):
 		return self.post
@@ -221,59 +494,184 @@ class DFT:
 # ~ is an endpoint of at least one edge in the set.
 # 
 # IMPLEMENTATION:
-# ~ Perform a Breadth-First Traversal. Along the way, if a
-# ~ Non-tree edge is encountered, remove it from the graph.
+# ~ Perform a Breadth-First Traversal with the BFSEngine and
+# ~ build the tree from the edge that discovered each vertex,
+# ~ instead of copying the graph and removing non-tree edges.
 ############################
 class SpanningTree:
 
 	def __init__(self, graph):
-		self.tree = graph.dup()
-		if(not graph.is_directed()):
-			self.algorithm()
+		self.tree = Graph(graph.attrs)
+		for v in graph.V():
+			self.tree.add_vertex(v, graph.data[v])
+		if(graph.is_directed()):
+			self.tree.add_edges(graph.E)
+		else:
+			self.algorithm(graph)
 
-	def algorithm(self):
-		visited = set()
-		for vtx in self.tree.V():
-			if(vtx in visited): continue
-			visited.add(vtx)
-			queue = [vtx]
-			while(queue):
-				v = queue.pop(0)
-				visited.add(v)
-				for neigh in self.tree.neighbors(v):
-					if(neigh in visited): continue
-					if(neigh in queue):
-						self.tree.disconnect(v, neigh)
-						continue
-					queue.append(neigh)
+	def algorithm(self, g):
+		engine = BFSEngine(g)
+		parent = engine.parent
+		for v in engine.order():
+			if(parent[v] != None):
+				self.tree.add_edge(g.edge(parent[v], v))
 
 	def spanning_tree(self):
 		return self.tree
 
 ############################
 # ALGORITHM: Cycle Count
-# ~ Takes a Graph as input, and returns the number of simple
-# ~ cycles in the graph.
+# ~ Takes a Graph as input, and counts its independent cycles: the
+# ~ cyclomatic number E - V + C, where C is the number of connected
+# ~ components. This is the number of edges left over once a spanning
+# ~ forest is taken out, and the size of a cycle basis. A directed
+# ~ graph is counted as if its edges were undirected.
+#
+# ~ basis() lazily yields a fundamental cycle basis, one cycle (a list
+# ~ of vertices, the last one joined back to the first) per non-tree
+# ~ edge. cycle() returns a single cycle or None. For directed graphs,
+# ~ cycle() and is_acyclic() look for a directed cycle instead.
 #
 # IMPLEMENTATION:
-# ~ Find a Spanning Tree of the graph. The number of edges
-# ~ in the graph that aren't in the spanning tree (Non-tree
-# ~ edges) is the number of cycles.
+# ~ One union-find pass over the edge arrays picks out the spanning
+# ~ forest, so the graph is never copied. The basis walks each
+# ~ non-tree edge's endpoints up the BFS forest of tree edges until
+# ~ they meet. Directed cycles are found with an iterative DFS that
+# ~ colors vertices in progress, and a cycle is an edge back to one.
+#
+# RUNNING TIME:
+# ~ Count: O(V+E a(V))
+# ~ Basis: O(V+E) plus the total length of the cycles
+# ~ Directed cycle: O(V+E)
 ############################
 class CycleCount:
 
 	def __init__(self, graph):
+		self.graph = graph
+		self.directed = graph.attrs['directed']
+		self.labels, self.edges, self.src, self.dst, wts = edge_arrays(graph)
 		self.cycles = 0
-		self.algorithm(graph)
+		self.components = 0
+		self.tree = bytearray(len(self.src))
+		self.dcycle = None
+		self.searched = False
+		self.algorithm()
 
-	def algorithm(self, g):
-		g_edges = len(g.E)
-		st = SpanningTree(g)
-		self.cycles = g_edges- len(st.tree.E)
+	def algorithm(self):
+		src, dst, tree = self.src, self.dst, self.tree
+		uf = IntUnionFind(len(self.labels))
+		union = uf.union
+		for e in range(len(src)):
+			if(union(src[e], dst[e])): tree[e] = 1
+		self.components = uf.num_sets()
+		self.cycles = len(src) - len(self.labels) + self.components
+
+	def num_cycles(self):
+		return self.cycles
+
+	def num_components(self):
+		return self.components
 
 	def is_acyclic(self):
+		if(self.directed): return self.directed_cycle() == None
 		return self.cycles == 0
 
+	def cycle(self):
+		if(self.directed): return self.directed_cycle()
+		for c in self.basis(): return c
+		return None
+
+	def basis(self):
+		if(not self.cycles): return
+		labels, src, dst, tree = self.labels, self.src, self.dst, self.tree
+		parent, depth = self.__forest__()
+		for e in range(len(src)):
+			if(tree[e]): continue
+			u, v = src[e], dst[e]
+			left, right = [u], [v]
+			while(u != v):
+				if(depth[u] >= depth[v]):
+					u = parent[u]
+					left.append(u)
+				else:
+					v = parent[v]
+					right.append(v)
+			right.pop()
+			right.reverse()
+			yield [labels[x] for x in left + right]
+
+	# parent and depth of every vertex in a BFS forest of the tree edges
+	def __forest__(self):
+		n, src, dst, tree = len(self.labels), self.src, self.dst, self.tree
+		offsets = array('l', [0]) * (n + 1)
+		for e in range(len(src)):
+			if(tree[e]):
+				offsets[src[e] + 1] += 1
+				offsets[dst[e] + 1] += 1
+		for i in range(n): offsets[i + 1] += offsets[i]
+		fill = array('l', offsets)
+		targets = array('l', [0]) * offsets[n]
+		for e in range(len(src)):
+			if(tree[e]):
+				u, v = src[e], dst[e]
+				targets[fill[u]] = v
+				fill[u] += 1
+				targets[fill[v]] = u
+				fill[v] += 1
+
+		parent = array('l', [-1]) * n
+		depth = array('l', [-1]) * n
+		for root in range(n):
+			if(depth[root] >= 0): continue
+			depth[root] = 0
+			queue = deque([root])
+			while(queue):
+				v = queue.popleft()
+				for s in range(offsets[v], offsets[v + 1]):
+					u = targets[s]
+					if(depth[u] < 0):
+						depth[u], parent[u] = depth[v] + 1, v
+						queue.append(u)
+		return parent, depth
+
+	# a directed cycle as a list of vertices, or None. Found once and
+	# remembered.
+	def directed_cycle(self):
+		if(self.searched): return self.dcycle
+		self.searched = True
+		labels, offsets, targets = adjacency_arrays(self.graph)
+		n = len(labels)
+		color = bytearray(n)
+		for root in range(n):
+			if(color[root]): continue
+			color[root] = 1
+			stack, slots = [root], [offsets[root]]
+			while(stack):
+				v = stack[-1]
+				s = slots[-1]
+				if(s == offsets[v + 1]):
+					color[v] = 2
+					stack.pop()
+					slots.pop()
+					continue
+				slots[-1] = s + 1
+				u = targets[s]
+				if(color[u] == 1):
+					self.dcycle = [labels[x] for x in stack[stack.index(u):]]
+					return self.dcycle
+				if(color[u] == 0):
+					color[u] = 1
+					stack.append(u)
+					slots.append(offsets[u])
+		return self.dcycle
+
+# a NumPy array over the same memory as a non-empty array.array or
+# snapshot-mapped array, or a NumPy copy of any other sequence.
+def numpy_view(values):
+	if(isinstance(values, (array, ctypes.Array)) and len(values)):
+		return numpy.frombuffer(values, dtype=values.typecode)
+	return numpy.asarray(values)
+
 ############################
 # ALGORITHM: Kruskal's Minimum Spanning Tree
 # ~ Takes a Graph as input, and returns an MST
@@ -289,33 +687,137 @@ class CycleCount:
 # ~ as long as they don't create cycles. Cycle detection in this
 # ~ case is done via a Union-Find to determine whether endpoints
 # ~ have the same component membership.
+#
+# ~ Vertices and edges are numbered (see edge_arrays) so that an
+# ~ array-backed IntUnionFind can be used. With NumPy, the weights are
+# ~ argsorted, and the sorted edges are handled in batches of
+# ~ batch_size (default max(V, 1024)): at the start of each batch,
+# ~ every vertex's root is found at once by pointer jumping, and edges
+# ~ already inside one component are dropped before the union-find
+# ~ sees them. The search stops once everything is one component.
+#
+# RUNNING TIME:
+# ~ O(E lg(E))
 ############################
 class KruskalMST:
 
-	def __init__(self, graph):
+	def __init__(self, graph, batch_size=None):
 		self.tree = Graph({"weighted" : True})
 		self.min_weight = 0
+		self.batch = batch_size
 		if(not graph.is_directed()):
 			self.algorithm(graph)
 
-	def edge_wt_sort(self, edge):
-		return edge.wt
-
 	def algorithm(self, graph):
-		edges = sorted(graph.E, key=self.edge_wt_sort)
+		labels, edges, src, dst, wts = edge_arrays(graph)
+		if(not len(src)): return
 
-		uf = UnionFind()
-		for vtx in graph.V():
-			uf.makeset(vtx)
+		uf = IntUnionFind(len(labels))
+		if(numpy != None):
+			order = numpy.argsort(numpy_view(wts), kind='mergesort')
+			batches = self.__batches__(order, uf, src, dst)
+		else:
+			batches = [sorted(range(len(src)), key=wts.__getitem__)]
+
+		for batch in batches:
+			for e in batch:
+				if(not uf.union(src[e], dst[e])): continue
+				self.tree.add_edge(edges[e])
+				self.min_weight += wts[e]
+
+	def __batches__(self, order, uf, src, dst):
+		src, dst = numpy_view(src), numpy_view(dst)
+		size = self.batch or max(len(uf.parent), 1024)
+		for start in range(0, len(order), size):
+			if(uf.count == 1): return
+			ids = order[start:start + size]
+			roots = uf.roots()
+			yield ids[roots[src[ids]] != roots[dst[ids]]].tolist()
 
-		for edge in edges:
-			par_v1 = uf.find(edge.v1)
-			par_v2 = uf.find(edge.v2)
-			if(par_v1 == par_v2): continue
+	def mst(self):
+		return self.tree
 
-			self.tree.add_edge(edge)
-			self.min_weight += edge.wt
-			uf.union(edge.v1, edge.v2)
+	def weight(self):
+		return self.min_weight
+
+############################
+# ALGORITHM: Boruvka's Minimum Spanning Tree
+# ~ Takes a Graph as input, and returns an MST of the graph
+# ~ (a minimum spanning forest if it is not connected), like
+# ~ KruskalMST and PrimMST. Suited to very large graphs, since
+# ~ each round handles all components at once.
+#
+# IMPLEMENTATION:
+# ~ Start with every vertex as its own component. Each round, every
+# ~ component picks its cheapest edge to another component (ties
+# ~ broken by edge number, so no cycle can form), all picked edges
+# ~ are added to the tree at once, and the components they join are
+# ~ merged. Edges left inside a component are dropped. With NumPy, a
+# ~ round is done with array operations: roots by pointer jumping,
+# ~ and the cheapest edge per component by sorting (component,
+# ~ weight, edge) keys. The number of components at least halves
+# ~ every round.
+#
+# RUNNING TIME:
+# ~ O(E lg(V))
+############################
+class BoruvkaMST:
+
+	def __init__(self, graph):
+		self.tree = Graph({"weighted" : True})
+		self.min_weight = 0
+		self.rounds = 0
+		if(not graph.is_directed()):
+			self.algorithm(graph)
+
+	def algorithm(self, graph):
+		labels, edges, src, dst, wts = edge_arrays(graph)
+		if(not len(src)): return
+
+		uf = IntUnionFind(len(labels))
+		pick = self.__numpy_round__ if numpy != None else self.__round__
+		live = [e for e in range(len(src)) if src[e] != dst[e]]
+		if(numpy != None):
+			live = numpy.array(live, dtype=numpy.int64)
+			src, dst = numpy_view(src), numpy_view(dst)
+			weights = numpy_view(wts)
+		else:
+			weights = wts
+
+		while(len(live)):
+			chosen, live = pick(uf, live, src, dst, weights)
+			if(not chosen): break
+			self.rounds += 1
+			for e in chosen:
+				if(not uf.union(src[e], dst[e])): continue
+				self.tree.add_edge(edges[e])
+				self.min_weight += wts[e]
+
+	def __round__(self, uf, live, src, dst, wts):
+		best, still = {}, []
+		for e in live:
+			a, b = uf.find(src[e]), uf.find(dst[e])
+			if(a == b): continue
+			still.append(e)
+			for c in (a, b):
+				if(c not in best or (wts[e], e) < (wts[best[c]], best[c])):
+					best[c] = e
+		return sorted(set(best.values())), still
+
+	def __numpy_round__(self, uf, live, src, dst, wts):
+		roots = uf.roots()
+		a, b = roots[src[live]], roots[dst[live]]
+		cross = a != b
+		live, a, b = live[cross], a[cross], b[cross]
+		if(not len(live)): return [], live
+
+		comp = numpy.concatenate((a, b))
+		cand = numpy.concatenate((live, live))
+		order = numpy.lexsort((cand, wts[cand], comp))
+		comp, cand = comp[order], cand[order]
+		first = numpy.ones(len(comp), dtype=bool)
+		first[1:] = comp[1:] != comp[:-1]
+		return numpy.unique(cand[first]).tolist(), live
 
 	def mst(self):
 		return self.tree
@@ -323,48 +825,68 @@ class KruskalMST:
 	def weight(self):
 		return self.min_weight
 
+	def num_rounds(self):
+		return self.rounds
+
 ############################
 # ALGORITHM: Prim's Minimum Spanning Tree
 # ~ Takes a Graph as input, and returns an MST
 # ~ of the graph. An MST is a maximal acyclic set of
 # ~ connected edges with minimum total weight such that
 # ~ every vertex in the graph is an endpoint of at 
-# ~ least one edge in the set.
+# ~ least one edge in the set. If the graph is not
+# ~ connected, the result is a minimum spanning forest
+# ~ with one tree per component. The input graph is
+# ~ never modified.
 # 
 # IMPLEMENTATION:
 # ~ Create a new graph with no edges and the same vertices
-# ~ as the old graph. Sort the edges of the old graph by weight.
-# ~ Add the cheapest edge to the new graph, then insert all of its
-# ~ adjoining edges onto a MinHeap. Continue this until inserting
-# ~ another edge into the new graph would create a cycle.
+# ~ as the old graph. Grow a tree from each vertex that no
+# ~ earlier tree has reached. Keep an IndexedPriorityQueue holding,
+# ~ for every vertex next to the tree, the weight of the cheapest edge
+# ~ connecting it to the tree (eager Prim). Pop the closest vertex,
+# ~ add its edge to the tree, and decrease the keys of its neighbors.
+# ~ The queue never holds more than one entry per vertex, so its size
+# ~ stays O(V).
+#
+# RUNNING TIME:
+# ~ O(E lg(V))
 ############################
 class PrimMST:
 
 	def __init__(self, graph):
 		self.tree = Graph({"weighted" : True})
 		self.min_weight = 0
+		self.trees = 0
 		if(not graph.is_directed()):
 			self.algorithm(graph)
 
-	def edge_wt_sort(self, edge):
-		return edge.wt
-
 	def algorithm(self, graph):
-		edges = sorted(graph.E, key=self.edge_wt_sort)
-
-		hp = MinHeap()
-		hp.insert(edges[0])
-
-		while(not hp.empty()):
-			edge = hp.pop()
-			graph.remove_edge(edge)
-			if(edge.v1 in self.tree.V() \
-				and edge.v2 in self.tree.V()): continue
-			
-			self.tree.add_edge(edge)
-			self.min_weight += edge.wt
-			neighborhood = graph.edges(edge.v1) + graph.edges(edge.v2)
-			hp.insert_all(neighborhood)
+		visited, best = set(), {}
+		pq = IndexedPriorityQueue()
+
+		for root in graph.V():
+			if(root in visited): continue
+			self.trees += 1
+			pq.insert(root, 0)
+
+			while(not pq.empty()):
+				v, wt = pq.pop()
+				visited.add(v)
+				self.tree.add_vertex(v)
+				if(v in best):
+					self.tree.add_edge(best.pop(v))
+					self.min_weight += wt
+
+				for edge in graph.edges(v):
+					neigh = edge.other(v)
+					if(neigh in visited): continue
+					if(not pq.contains(neigh)):
+						best[neigh] = edge
+						pq.insert(neigh, edge.wt)
+					elif(edge.wt < pq.priority(neigh)):
+						best[neigh] = edge
+						pq.decrease_key(neigh, edge.wt)
 
 	def mst(self):
 		return self.tree
@@ -372,64 +894,801 @@ class PrimMST:
 	def weight(self):
 		return self.min_weight
 
+	def num_trees(self):
+		return self.trees
+
 ############################
-# ALGORITHM: Kosaraju's Strongly Connected Component Detection
-# ~ Takes a Graph as input, and returns a list of SCC's of the graph 
-# ~ (as directed Graphs). A SCC is a set of vertices such that
-# ~ any vertex v in the set can be reached by any other vertex c
-# ~ via a directed path from v to c.
-# 
+# ALGORITHM: Shortest Paths
+# ~ Base class for the single-pair and single-source searches below.
+# ~ Vertices are numbered like adjacency_arrays(graph), and results are
+# ~ kept in flat arrays indexed by those numbers:
+#
+# ~ dist     distance from the source (-1 if never reached)
+# ~ pred     the vertex before this one on its shortest path (-1 for
+# ~          the source and unreached vertices)
+# ~ settled  1 once a vertex's distance is final
+#
+# ~ distance(v) and path(v) read them by label. A path is only built
+# ~ when path() is called, by walking 'pred' back to the source. When
+# ~ a search stops early at its target, vertices that were reached but
+# ~ not settled have tentative entries in 'dist', and distance() and
+# ~ path() return None for them.
+#
+# ~ Each search takes the name of its heap backend: 'binary' (MinHeap),
+# ~ 'pairing' (PairingHeap) or 'radix' (RadixHeap, int weights only),
+# ~ or a heap class with the same interface. Unweighted edges count as
+# ~ weight 1, and negative weights raise a ValueError.
+############################
+class ShortestPaths:
+	HEAPS = {'binary' : MinHeap, 'pairing' : PairingHeap, 'radix' : RadixHeap}
+
+	def __init__(self, graph, heap='binary'):
+		self.labels, self.offsets, self.targets = adjacency_arrays(graph)
+		self.wts = slot_weights(graph, self.labels, self.offsets, self.targets)
+		for w in self.wts:
+			if(w < 0): raise ValueError("negative edge weight: "+str(w))
+		self.index = dict((v, i) for i, v in enumerate(self.labels))
+		self.heap = ShortestPaths.HEAPS.get(heap, heap)
+
+		n = len(self.labels)
+		self.dist = array(self.wts.typecode, [-1]) * n
+		self.pred = array('l', [-1]) * n
+		self.settled = bytearray(n)
+
+	def has_path(self, v):
+		return self.settled[self.index[v]] == 1
+
+	def distance(self, v):
+		i = self.index[v]
+		return self.dist[i] if self.settled[i] else None
+
+	def path(self, v):
+		i = self.index[v]
+		if(not self.settled[i]): return None
+		path = []
+		while(i != -1):
+			path.append(self.labels[i])
+			i = self.pred[i]
+		path.reverse()
+		return path
+
+# Dijkstra's algorithm over raw adjacency arrays, from vertex s and
+# stopping early at t (or -1 for no target). Fills the dist, pred and
+# settled arrays in place. pred may be None when it is not needed.
+def dijkstra_arrays(offsets, targets, wts, s, t, heap, dist, pred, settled):
+	dist[s] = 0
+	pq = heap()
+	pq.insert((dist[s], s))
+	while(not pq.empty()):
+		d, v = pq.pop()
+		if(settled[v]): continue
+		settled[v] = 1
+		if(v == t): return
+
+		for slot in range(offsets[v], offsets[v + 1]):
+			w, nd = targets[slot], d + wts[slot]
+			if(dist[w] == -1 or nd < dist[w]):
+				dist[w] = nd
+				if(pred != None): pred[w] = v
+				pq.insert((nd, w))
+
+############################
+# ALGORITHM: Dijkstra's Shortest Paths
+# ~ Takes a Graph with non-negative edge weights and a source vertex,
+# ~ and finds the shortest path from the source to every reachable
+# ~ vertex. If a target is given, the search stops as soon as the
+# ~ target's distance is final.
+#
+# IMPLEMENTATION:
+# ~ A heap of (distance, vertex) entries. A vertex is pushed again
+# ~ each time its distance improves, and stale entries are skipped
+# ~ when popped, so the heap needs no decrease-key.
+#
+# RUNNING TIME:
+# ~ O((V+E)lg(V)) with a binary heap
+############################
+class Dijkstra(ShortestPaths):
+	def __init__(self, graph, source, target=None, heap='binary'):
+		ShortestPaths.__init__(self, graph, heap)
+		self.source = source
+		self.target = target
+		self.algorithm()
+
+	def algorithm(self):
+		s = self.index[self.source]
+		t = -1 if self.target == None else self.index[self.target]
+		dijkstra_arrays(self.offsets, self.targets, self.wts, s, t, self.heap,
+						self.dist, self.pred, self.settled)
+
+############################
+# ALGORITHM: Bidirectional Dijkstra
+# ~ Takes a Graph with non-negative edge weights, a source and a
+# ~ target, and finds the shortest path between them by searching
+# ~ forward from the source and backward from the target at once.
+# ~ distance() and path() with no argument (or the target) give the
+# ~ source-target result. Vertices settled by the forward search can
+# ~ be queried as in Dijkstra.
+#
+# IMPLEMENTATION:
+# ~ The backward search runs on the transposed adjacency arrays. Each
+# ~ step advances the side whose heap top is smaller, and every edge
+# ~ relaxed into a vertex the other side has reached offers a candidate
+# ~ path through it. The search stops once the two heap tops add up to
+# ~ at least the best candidate.
+############################
+class BidirectionalDijkstra(ShortestPaths):
+	def __init__(self, graph, source, target, heap='binary'):
+		ShortestPaths.__init__(self, graph, heap)
+		self.source = source
+		self.target = target
+		if(graph.is_directed()):
+			self.roffsets, self.rtargets, self.rwts = \
+				transpose_arrays(self.offsets, self.targets, self.wts)
+		else:
+			self.roffsets, self.rtargets, self.rwts = self.offsets, self.targets, self.wts
+
+		n = len(self.labels)
+		self.rdist = array(self.wts.typecode, [-1]) * n
+		self.succ = array('l', [-1]) * n
+		self.rsettled = bytearray(n)
+		self.best = None
+		self.meet = -1
+		self.algorithm()
+
+	def algorithm(self):
+		s, t = self.index[self.source], self.index[self.target]
+		self.dist[s], self.rdist[t] = 0, 0
+		if(s == t):
+			self.settled[s] = 1
+			self.best, self.meet = 0, s
+			return
+
+		forward = (self.offsets, self.targets, self.wts,
+				   self.dist, self.pred, self.settled, self.rdist)
+		backward = (self.roffsets, self.rtargets, self.rwts,
+					self.rdist, self.succ, self.rsettled, self.dist)
+		fpq, bpq = self.heap(), self.heap()
+		fpq.insert((0, s))
+		bpq.insert((0, t))
+		while(not fpq.empty() and not bpq.empty()):
+			ftop, btop = fpq.peek()[0], bpq.peek()[0]
+			if(self.best != None and ftop + btop >= self.best): break
+			if(ftop <= btop):
+				self.__step__(fpq, forward)
+			else:
+				self.__step__(bpq, backward)
+
+	def __step__(self, pq, side):
+		offsets, targets, wts, dist, pred, settled, other = side
+		d, v = pq.pop()
+		if(settled[v]): return
+		settled[v] = 1
+
+		for slot in range(offsets[v], offsets[v + 1]):
+			w, nd = targets[slot], d + wts[slot]
+			if(dist[w] == -1 or nd < dist[w]):
+				dist[w] = nd
+				pred[w] = v
+				pq.insert((nd, w))
+			if(other[w] != -1 and (self.best == None or dist[w] + other[w] < self.best)):
+				self.best = dist[w] + other[w]
+				self.meet = w
+
+	def has_path(self, v=None):
+		if(v == None or v == self.target): return self.best != None
+		return ShortestPaths.has_path(self, v)
+
+	def distance(self, v=None):
+		if(v == None or v == self.target): return self.best
+		return ShortestPaths.distance(self, v)
+
+	def path(self, v=None):
+		if(v != None and v != self.target): return ShortestPaths.path(self, v)
+		if(self.best == None): return None
+
+		path, i = [], self.meet
+		while(i != -1):
+			path.append(self.labels[i])
+			i = self.pred[i]
+		path.reverse()
+		i = self.succ[self.meet]
+		while(i != -1):
+			path.append(self.labels[i])
+			i = self.succ[i]
+		return path
+
+############################
+# ALGORITHM: A* Search
+# ~ Takes a Graph with non-negative edge weights, a source, a target
+# ~ and a heuristic(v, target) callback estimating the remaining
+# ~ distance from v. The search is steered toward the target, and
+# ~ stops as soon as the target is reached. The result is a shortest
+# ~ path if the heuristic never overestimates. With the 'radix' heap
+# ~ backend, the heuristic must return ints and be consistent
+# ~ (h(v) <= wt(v, w) + h(w)), so that priorities never decrease.
+#
+# IMPLEMENTATION:
+# ~ Dijkstra's algorithm with each vertex prioritized by its distance
+# ~ plus its (cached) heuristic estimate. A vertex whose distance
+# ~ improves after it was expanded is pushed and expanded again, which
+# ~ only happens when the heuristic is not consistent.
+############################
+class AStar(ShortestPaths):
+	def __init__(self, graph, source, target, heuristic, heap='binary'):
+		ShortestPaths.__init__(self, graph, heap)
+		self.source = source
+		self.target = target
+		self.h = heuristic
+		self.algorithm()
+
+	def algorithm(self):
+		offsets, targets, wts = self.offsets, self.targets, self.wts
+		dist, pred, settled = self.dist, self.pred, self.settled
+		labels, target, h = self.labels, self.target, self.h
+		s, t = self.index[self.source], self.index[self.target]
+
+		est = {s : h(self.source, target)}
+		dist[s] = 0
+		pq = self.heap()
+		pq.insert((est[s], s))
+		while(not pq.empty()):
+			f, v = pq.pop()
+			if(f > dist[v] + est[v]): continue
+			settled[v] = 1
+			if(v == t): return
+
+			for slot in range(offsets[v], offsets[v + 1]):
+				w, nd = targets[slot], dist[v] + wts[slot]
+				if(dist[w] == -1 or nd < dist[w]):
+					if(w not in est): est[w] = h(labels[w], target)
+					dist[w] = nd
+					pred[w] = v
+					settled[w] = 0
+					pq.insert((nd + est[w], w))
+
+# adjacency arrays handed to each pool worker by init_worker
+worker_csr = {}
+
+def init_worker(offsets, targets, wts, typecode, heap):
+	worker_csr['arrays'] = (offsets, targets, wts)
+	worker_csr['typecode'] = typecode
+	worker_csr['heap'] = heap
+
+# like init_worker, but each worker maps the graph's snapshot file
+# itself, so the adjacency arrays are shared through the page cache.
+def init_snapshot_worker(path, wts, typecode, heap):
+	g = load_snapshot(path)
+	init_worker(g.offsets, g.targets, wts, typecode, heap)
+
+# one block of distance rows, computed by a pool worker on the arrays
+# given to init_worker.
+def distance_rows(sources):
+	offsets, targets, wts = worker_csr['arrays']
+	typecode, heap = worker_csr['typecode'], worker_csr['heap']
+	return block_rows(offsets, targets, wts, typecode, heap, sources)
+
+# one block of distance rows on the given arrays. Runs inline when
+# rows() does not use a pool, so no state is shared between graphs.
+def block_rows(offsets, targets, wts, typecode, heap, sources):
+	n = len(offsets) - 1
+	rows = []
+	for s in sources:
+		dist = array(typecode, [-1]) * n
+		dijkstra_arrays(offsets, targets, wts, s, -1, heap, dist, None, bytearray(n))
+		rows.append(dist)
+	return sources, rows
+
+# a copy of an array in shared memory, which pool workers can read
+# without it being pickled for every task.
+def shared_array(values):
+	shared = RawArray(values.typecode, len(values))
+	if(len(values)):
+		ctypes.memmove(shared, values.buffer_info()[0], len(values) * values.itemsize)
+	return shared
+
+############################
+# ALGORITHM: All-Pairs Shortest Paths
+# ~ Takes a Graph with non-negative edge weights and computes the
+# ~ distance from every source vertex to every vertex. rows(sources)
+# ~ does the same for a chosen list of sources (multi-source), so
+# ~ all-pairs is just rows() with no argument. Results stream back as
+# ~ blocks of (source labels, distance rows), one row per source,
+# ~ each indexed like 'labels', with -1 for unreachable vertices, so
+# ~ the whole V x V matrix never has to be held at once.
+#
+# ~ method='dijkstra' runs one Dijkstra search per source, sharded in
+# ~ blocks of block_size sources over a process pool (processes=1
+# ~ runs them in this process). method='floyd' runs Floyd-Warshall
+# ~ over the whole matrix instead, which suits small dense graphs and
+# ~ also allows negative weights (a negative cycle raises ValueError).
+# ~ Since -1 could then be a real distance, rows of a graph with
+# ~ negative weights are float arrays with inf for unreachable vertices.
+#
 # IMPLEMENTATION:
-# ~ Build a Breadth first search tree (BFST) from the original
-# ~ graph. Then, reverse the graph and start the search in the
-# ~ same order. Any nodes that are reached in both searches from
-# ~ the same starting point are part of the same strongly 
-# ~ connected component.
+# ~ The adjacency arrays are copied once into shared memory (RawArray)
+# ~ and handed to each worker when the pool starts, so tasks only carry
+# ~ a block of source ids. For a graph loaded with load_snapshot, each
+# ~ worker maps the snapshot file instead of getting a copy.
+# ~ concurrent.futures.ProcessPoolExecutor is used where it supports
+# ~ worker initializers, and multiprocessing.Pool otherwise. At most
+# ~ two blocks per worker are in flight, so results do not pile up
+# ~ faster than they are consumed. Floyd-Warshall relaxes a whole
+# ~ matrix (with NumPy) or row (without it) per pivot vertex.
+#
+# RUNNING TIME:
+# ~ Dijkstra: O(V(V+E)lg(V)) total, split across the workers
+# ~ Floyd-Warshall: O(V^3)
 ############################
-class KosarajuSCC:
+class AllPairsShortestPaths:
+	def __init__(self, graph, method='dijkstra', processes=None, block_size=64, heap='binary'):
+		self.labels, self.offsets, self.targets = adjacency_arrays(graph)
+		self.wts = slot_weights(graph, self.labels, self.offsets, self.targets)
+		self.index = dict((v, i) for i, v in enumerate(self.labels))
+		self.method = method
+		self.processes = processes or cpu_count()
+		self.block_size = block_size
+		self.heap = ShortestPaths.HEAPS.get(heap, heap)
+		self.snapshot = graph.snapshot if isinstance(graph, CSRGraph) else None
+		self.fw = None
+
+	def rows(self, sources=None):
+		ids = list(range(len(self.labels))) if sources == None else \
+			  [self.index[v] for v in sources]
+		blocks = [ids[i:i + self.block_size] for i in range(0, len(ids), self.block_size)]
+		if(self.method == 'floyd'):
+			results = self.__floyd_rows__(blocks)
+		else:
+			for w in self.wts:
+				if(w < 0): raise ValueError("negative edge weight: "+str(w))
+			results = self.__dijkstra_rows__(blocks)
+
+		labels = self.labels
+		for block, rows in results:
+			yield [labels[i] for i in block], rows
+
+	def matrix(self):
+		matrix = []
+		for sources, rows in self.rows(): matrix.extend(rows)
+		return matrix
+
+	def __dijkstra_rows__(self, blocks):
+		arrays = (self.offsets, self.targets, self.wts)
+		if(self.processes == 1 or len(blocks) < 2):
+			offsets, targets, wts = arrays
+			for block in blocks:
+				yield block_rows(offsets, targets, wts, wts.typecode, self.heap, block)
+			return
+
+		if(self.snapshot != None):
+			init = init_snapshot_worker
+			args = (self.snapshot, shared_array(self.wts), self.wts.typecode, self.heap)
+		else:
+			shared = [shared_array(a) for a in arrays]
+			init = init_worker
+			args = (shared[0], shared[1], shared[2], self.wts.typecode, self.heap)
+		pool = None
+		if(ProcessPoolExecutor != None):
+			try:
+				pool = ProcessPoolExecutor(self.processes, initializer=init, initargs=args)
+				submit = lambda block: pool.submit(distance_rows, block)
+				result = lambda job: job.result()
+				stop = lambda: pool.shutdown(wait=False)
+			except TypeError:
+				pool = None
+		if(pool == None):
+			pool = Pool(self.processes, init, args)
+			submit = lambda block: pool.apply_async(distance_rows, (block,))
+			result = lambda job: job.get()
+			stop = lambda: pool.terminate()
+
+		try:
+			jobs = deque()
+			for block in blocks:
+				jobs.append(submit(block))
+				if(len(jobs) > 2 * self.processes): yield result(jobs.popleft())
+			while(jobs): yield result(jobs.popleft())
+		finally:
+			stop()
+
+	def __floyd_rows__(self, blocks):
+		if(self.fw == None): self.fw = self.__floyd_warshall__()
+		for block in blocks:
+			yield block, [self.fw[i] for i in block]
+
+	def __floyd_warshall__(self):
+		offsets, targets, wts = self.offsets, self.targets, self.wts
+		n, inf, typecode = len(self.labels), float('inf'), self.wts.typecode
+		missing = -1
+		if(any(w < 0 for w in wts)): typecode, missing = 'd', inf
+
+		if(numpy != None):
+			dist = numpy.full((n, n), inf)
+			numpy.fill_diagonal(dist, 0)
+			degrees = numpy.diff(numpy.asarray(offsets, dtype=numpy.intp))
+			heads = numpy.repeat(numpy.arange(n, dtype=numpy.intp), degrees)
+			tails = numpy.asarray(targets, dtype=numpy.intp)
+			numpy.minimum.at(dist, (heads, tails), numpy.asarray(wts, dtype=float))
+			for k in range(n):
+				numpy.minimum(dist, dist[:, k, None] + dist[None, k, :], out=dist)
+			if(n and dist.diagonal().min() < 0): raise ValueError("negative cycle")
+			dist[numpy.isinf(dist)] = missing
+			return [array(typecode, row.astype(int if typecode == 'l' else float).tolist()) \
+					for row in dist]
+
+		dist = [[inf] * n for i in range(n)]
+		for v in range(n):
+			dist[v][v] = 0
+			for s in range(offsets[v], offsets[v + 1]):
+				dist[v][targets[s]] = min(dist[v][targets[s]], wts[s])
+		for k in range(n):
+			through = dist[k]
+			for i in range(n):
+				dik = dist[i][k]
+				if(dik == inf): continue
+				dist[i] = [a if a <= dik + b else dik + b for a, b in zip(dist[i], through)]
+		if(any(dist[i][i] < 0 for i in range(n))): raise ValueError("negative cycle")
+		return [array(typecode, [missing if d == inf else d for d in row]) for row in dist]
+
+############################
+# ALGORITHM: Strongly Connected Components (shared results)
+# ~ Base class for the SCC algorithms below. Both label every vertex
+# ~ with a component id, kept in a flat array ('comp') parallel to the
+# ~ vertex list ('labels'). Everything else is derived from those two
+# ~ arrays when asked for: the member lists, a subgraph view per
+# ~ component, and the condensation DAG.
+############################
+class StronglyConnectedComponents:
 
 	def __init__(self, graph):
-		self.sccs = []
-		self.scc_map = {}
+		self.graph = graph
+		self.labels, self.offsets, self.targets = [], array('l', [0]), array('i')
+		self.comp = array('i')
+		self.count = 0
+		self.index = None
+		self.groups = None
 		if(graph.is_directed()):
-			self.algorithm(graph)
+			self.labels, self.offsets, self.targets = adjacency_arrays(graph)
+			self.comp = array('i', [-1]) * len(self.labels)
+			self.algorithm()
 
-	def algorithm(self, g):
-		dft = DFT(g)
-		gr = g.reverse()
+	def component_ids(self):
+		return self.comp
 
-		for v in reversed(dft.postorder()):
-			if(v in self.scc_map): continue
-			dftR = DFT(gr, v)
-			post = dftR.postorder()
-			rev = dftR.tree.reverse()
-			for v in post:
-				self.scc_map[v] = rev
-				gr.remove_vertex(v)
+	def component_id(self, vertex):
+		if(self.index == None):
+			self.index = dict((v, i) for i, v in enumerate(self.labels))
+		return self.comp[self.index[vertex]]
 
-			self.sccs.append(rev)
+	def members(self, c):
+		if(self.groups == None):
+			self.groups = [[] for i in range(self.count)]
+			for i, c2 in enumerate(self.comp):
+				self.groups[c2].append(self.labels[i])
+		return self.groups[c]
+
+	def component(self, c):
+		return self.graph.subgraph(self.members(c))
 
 	def components(self):
-		return self.sccs
+		return [self.component(c) for c in range(self.count)]
 
 	def strongly_connected(self):
-		return len(self.sccs) == 1
+		return self.count == 1
 
 	def num_components(self):
-		return len(self.sccs)
+		return self.count
 
 	def strong_component_of(self, vertex):
-		return self.scc_map[vertex]
+		return self.component(self.component_id(vertex))
+
+	# one vertex per component, and an edge c1->c2 whenever
+	# some edge leads from component c1 into component c2.
+	def condensation(self):
+		dag = Graph({'directed' : True})
+		dag.add_vertices(range(self.count))
+		comp, targets = self.comp, self.targets
+		for v in range(len(self.labels)):
+			for s in range(self.offsets[v], self.offsets[v + 1]):
+				if(comp[v] != comp[targets[s]]):
+					dag.connect(comp[v], comp[targets[s]])
+		return dag
+
+############################
+# ALGORITHM: Tarjan's Strongly Connected Component Detection
+# ~ Takes a directed Graph (or CSRGraph / view) as input, and labels
+# ~ each vertex with the id of its strongly connected component in a
+# ~ single depth-first pass. Ids come out in reverse topological order
+# ~ of the condensation: component 0 has no edges leaving it.
+#
+# IMPLEMENTATION:
+# ~ Vertices get a preorder number as they are discovered and are pushed
+# ~ onto a stack. low[v] is the smallest preorder number reachable from
+# ~ v's subtree through vertices still on the stack. When low[v] equals
+# ~ v's own number, v roots a component, which is popped off the stack.
+# ~ The recursion is replaced by an explicit call stack plus a per-vertex
+# ~ cursor into its adjacency slice, so chains of any length are fine.
+#
+# RUNNING TIME:
+# ~ O(V+E) time, O(V) extra space in flat int arrays.
+############################
+class TarjanSCC(StronglyConnectedComponents):
+
+	def algorithm(self):
+		offsets, targets, comp = self.offsets, self.targets, self.comp
+		n = len(self.labels)
+		pre = array('i', [-1]) * n
+		low = array('i', [0]) * n
+		cursor = array('l', [0]) * n
+		stack, call = array('i'), array('i')
+		counter = 0
+
+		for root in range(n):
+			if(pre[root] != -1): continue
+			pre[root] = low[root] = counter
+			counter += 1
+			cursor[root] = offsets[root]
+			stack.append(root)
+			call.append(root)
+
+			while(call):
+				v = call[-1]
+				s, end = cursor[v], offsets[v + 1]
+				descended = False
+				while(s < end):
+					w = targets[s]
+					s += 1
+					if(pre[w] == -1):
+						cursor[v] = s
+						pre[w] = low[w] = counter
+						counter += 1
+						cursor[w] = offsets[w]
+						stack.append(w)
+						call.append(w)
+						descended = True
+						break
+					# visited but unassigned means w is still on the stack
+					if(comp[w] == -1 and pre[w] < low[v]):
+						low[v] = pre[w]
+				if(descended): continue
+
+				call.pop()
+				if(call and low[v] < low[call[-1]]):
+					low[call[-1]] = low[v]
+				if(low[v] == pre[v]):
+					while(True):
+						w = stack.pop()
+						comp[w] = self.count
+						if(w == v): break
+					self.count += 1
+
+############################
+# ALGORITHM: Kosaraju's Strongly Connected Component Detection
+# ~ Takes a Graph as input, and returns a list of SCC's of the graph 
+# ~ (as directed Graphs). A SCC is a set of vertices such that
+# ~ any vertex v in the set can be reached by any other vertex c
+# ~ via a directed path from v to c. Ids come out in topological
+# ~ order of the condensation: component 0 has no edges entering it.
+# 
+# IMPLEMENTATION:
+# ~ Run a depth first traversal over the graph, recording the
+# ~ postorder. Then search the reversed graph, starting new searches in
+# ~ reverse postorder: every vertex reached from the same starting point
+# ~ is part of the same strongly connected component. Both passes use
+# ~ explicit stacks over flat adjacency arrays, and the reversed graph is
+# ~ just the transposed arrays; the input graph is never modified.
+#
+# RUNNING TIME:
+# ~ O(V+E) time, O(V+E) extra space in flat int arrays.
+############################
+class KosarajuSCC(StronglyConnectedComponents):
 
-		
+	def algorithm(self):
+		offsets, targets, comp = self.offsets, self.targets, self.comp
+		n = len(self.labels)
+
+		# pass 1: postorder of the whole graph
+		post = array('i')
+		cursor = array('l', [-1]) * n
+		call = array('i')
+		for root in range(n):
+			if(cursor[root] != -1): continue
+			cursor[root] = offsets[root]
+			call.append(root)
+			while(call):
+				v = call[-1]
+				s = cursor[v]
+				if(s == offsets[v + 1]):
+					call.pop()
+					post.append(v)
+					continue
+				cursor[v] = s + 1
+				w = targets[s]
+				if(cursor[w] == -1):
+					cursor[w] = offsets[w]
+					call.append(w)
+
+		# pass 2: search the transpose in reverse postorder
+		roffsets, rtargets = transpose_arrays(offsets, targets)
+		for i in range(n - 1, -1, -1):
+			root = post[i]
+			if(comp[root] != -1): continue
+			comp[root] = self.count
+			call.append(root)
+			while(call):
+				v = call.pop()
+				for s in range(roffsets[v], roffsets[v + 1]):
+					w = rtargets[s]
+					if(comp[w] == -1):
+						comp[w] = self.count
+						call.append(w)
+			self.count += 1
+
+############################
+# ALGORITHM: Biconnected Components
+# ~ Takes a Graph as input, and splits its edges into biconnected
+# ~ components (blocks): maximal sets of edges in which every two edges
+# ~ lie on a common simple cycle. Along the way it finds the bridges
+# ~ (edges whose removal disconnects their endpoints; each is a block
+# ~ of its own) and the articulation points (vertices whose removal
+# ~ disconnects the graph; exactly the vertices in more than one
+# ~ block). Every component of the graph is covered, and a directed
+# ~ graph is treated as if its edges were undirected. Self-loops
+# ~ belong to no block.
+#
+# ~ Results are kept in flat arrays indexed like edge_arrays(graph):
+# ~ block[e] is the block of edge e, bridge[e] and cut[v] flag bridges
+# ~ and articulation points. block_cut_tree() builds the block-cut
+# ~ tree, with a ('block', i) vertex per block, a ('cut', v) vertex
+# ~ per articulation point, and an edge between each block and each
+# ~ articulation point in it.
+#
+# IMPLEMENTATION:
+# ~ Hopcroft and Tarjan's lowlink DFS, iterative, over an undirected
+# ~ CSR built from the edge arrays. low[v] is the lowest preorder
+# ~ number reachable from v's subtree through one back edge. The edge
+# ~ to a parent is skipped by edge id rather than by vertex, so
+# ~ parallel edges count as cycles. Edges go on a stack as they are
+# ~ explored, and when a child v of u finishes with low[v] >= pre[u],
+# ~ the edges above u-v form a block and u is an articulation point
+# ~ (a root only if it has two or more children). If low[v] > pre[u],
+# ~ u-v is a bridge.
+#
+# RUNNING TIME:
+# ~ O(V+E)
+############################
+class BiconnectedComponents:
+
+	def __init__(self, graph):
+		self.labels, self.edges, self.src, self.dst, wts = edge_arrays(graph)
+		n, m = len(self.labels), len(self.src)
+		self.pre = array('l', [-1]) * n
+		self.low = array('l', [-1]) * n
+		self.block = array('l', [-1]) * m
+		self.bridge = bytearray(m)
+		self.cut = bytearray(n)
+		self.count = 0
+		self.algorithm()
+
+	def algorithm(self):
+		src, dst, pre, low = self.src, self.dst, self.pre, self.low
+		block, bridge, cut = self.block, self.bridge, self.cut
+		n, m = len(self.labels), len(src)
+
+		# undirected CSR without self-loops; slot_edge maps a slot
+		# back to its edge.
+		offsets = array('l', [0]) * (n + 1)
+		for e in range(m):
+			if(src[e] != dst[e]):
+				offsets[src[e] + 1] += 1
+				offsets[dst[e] + 1] += 1
+		for i in range(n): offsets[i + 1] += offsets[i]
+		fill = array('l', offsets)
+		targets = array('l', [0]) * offsets[n]
+		slot_edge = array('l', [0]) * offsets[n]
+		for e in range(m):
+			u, v = src[e], dst[e]
+			if(u == v): continue
+			targets[fill[u]], slot_edge[fill[u]] = v, e
+			fill[u] += 1
+			targets[fill[v]], slot_edge[fill[v]] = u, e
+			fill[v] += 1
+
+		it = array('l', offsets)
+		pedge = array('l', [-1]) * n
+		clock = 0
+		for root in range(n):
+			if(pre[root] != -1): continue
+			pre[root] = low[root] = clock
+			clock += 1
+			children = 0
+			stack, edges = [root], []
+			while(stack):
+				v = stack[-1]
+				s = it[v]
+				if(s < offsets[v + 1]):
+					it[v] = s + 1
+					w, e = targets[s], slot_edge[s]
+					if(e == pedge[v]): continue
+					if(pre[w] == -1):
+						edges.append(e)
+						pre[w] = low[w] = clock
+						clock += 1
+						pedge[w] = e
+						stack.append(w)
+						if(v == root): children += 1
+					elif(pre[w] < pre[v]):
+						edges.append(e)
+						if(pre[w] < low[v]): low[v] = pre[w]
+					continue
+
+				stack.pop()
+				if(v == root): break
+				u = stack[-1]
+				if(low[v] < low[u]): low[u] = low[v]
+				if(low[v] >= pre[u]):
+					if(u != root): cut[u] = 1
+					if(low[v] > pre[u]): bridge[pedge[v]] = 1
+					while(True):
+						e = edges.pop()
+						block[e] = self.count
+						if(e == pedge[v]): break
+					self.count += 1
+			if(children > 1): cut[root] = 1
+
+	def bridges(self):
+		edges, bridge = self.edges, self.bridge
+		return [edges[e] for e in range(len(bridge)) if bridge[e]]
+
+	def articulation_points(self):
+		labels, cut = self.labels, self.cut
+		return [labels[v] for v in range(len(cut)) if cut[v]]
+
+	def num_blocks(self):
+		return self.count
+
+	# the vertices of every block
+	def blocks(self):
+		labels = self.labels
+		return [[labels[v] for v in ids] for ids in self.__members__()]
+
+	# the edges of every block
+	def block_edges(self):
+		edges, block = self.edges, self.block
+		members = [[] for b in range(self.count)]
+		for e in range(len(block)):
+			if(block[e] != -1): members[block[e]].append(edges[e])
+		return members
+
+	def block_cut_tree(self):
+		labels, cut = self.labels, self.cut
+		tree = Graph()
+		for b, ids in enumerate(self.__members__()):
+			tree.add_vertex(('block', b))
+			for v in ids:
+				if(cut[v]): tree.connect(('block', b), ('cut', labels[v]))
+		return tree
+
+	# the vertex ids of every block, in one pass over the edges
+	def __members__(self):
+		src, dst, block = self.src, self.dst, self.block
+		members = [[] for b in range(self.count)]
+		stamp = array('l', [-1]) * len(self.labels)
+		for e in range(len(block)):
+			b = block[e]
+			if(b == -1): continue
+			for v in (src[e], dst[e]):
+				if(stamp[v] != b):
+					stamp[v] = b
+					members[b].append(v)
+		return members
 
 ############################
 # ALGORITHM: Tarjan's Bridge Detection
-# ~ Takes a Graph as input, and returns a list of Bridges of the graph 
+# ~ Takes a Graph as input, and returns a list of Bridges of the graph
 # ~ (as Edges). A bridge is an edge such that its removal from the
 # ~ graph would increment the number of components. This version is
 # ~ based off of the implementation by Robert Sedgewick and Kevin Wayne.
-# 
+#
 # IMPLEMENTATION:
 # ~ The algorithm is based on the following principle: an edge is only
 # ~ a bridge iff it is not part of any cycle. Therefore, performing simple
@@ -438,33 +1697,13 @@ class KosarajuSCC:
 # ~ a preorder traversal, and an auxiliary array named 'low'. Low[v] stores
 # ~ the lowest preorder number on any path reachable through v. Therefore,
 # ~ if low[v] is ever equal to pre[v], its preorder number, then the edge
-# ~ (u,v) with pre[u] = pre[v] - 1 is a bridge.
+# ~ (u,v) with pre[u] = pre[v] - 1 is a bridge. The lowlink pass is the
+# ~ one in BiconnectedComponents above, and covers every component.
 ############################
 class Bridges:
 
 	def __init__ (self, graph):
-		self.edges = []
-		self.pre = {}
-		self.low = {}
-		self.count = 1
-		par = child = graph.random_vertex()
-		self.algorithm(graph, par, child)
-
-	def algorithm (self, g, par, child):
-		self.pre[child] = self.count
-		self.low[child] = self.pre[child]
-		self.count+= 1
-
-		for neigh in g.neighbors(child):
-
-			if (neigh not in self.pre):
-				self.algorithm(g, child, neigh)
-				self.low[child] = min([self.low[child], self.low[neigh]])
-				if (self.low[neigh] == self.pre[neigh]):
-					self.edges.append(g.adj[child][neigh])
-
-			elif (neigh != par): # takes care of parallel edges
-				self.low[child] = min([self.low[child], self.pre[neigh]])
+		self.edges = BiconnectedComponents(graph).bridges()
 
 	def bridges(self):
 		return self.edges
@@ -474,33 +1713,19 @@ class Bridges:
 
 ############################
 # ALGORITHM: Articulation Point Detection
-# ~ This algorithm follows from bridge detection: the endpoints of
-# ~ any bridge are articulation points as long as their degree is
-# ~ greater than 1. Therefore, the problem of
-# ~ finding all articulation points in a graph is reduced to finding 
-# ~ all bridges in a graph.
-# 
+# ~ Takes a Graph as input, and returns its articulation points: the
+# ~ vertices whose removal would increment the number of components.
+# ~ An articulation point need not touch a bridge (two triangles
+# ~ sharing a vertex have none), so they are read off the same lowlink
+# ~ pass as the bridges.
+#
 # IMPLEMENTATION:
-# ~ Find all bridges using Tarjan's algorithm. Their endpoints
-# ~ comprise the set of articulation points.
+# ~ Run BiconnectedComponents above and keep its articulation points.
 ############################
 class ArticulationPoints:
 
 	def __init__(self, graph):
-		self.points = set()
-		self.algorithm(graph)
-
-	def algorithm(self, g):
-		b = Bridges(g)
-		if(b.num_bridges() == 0):
-			return
-
-		for e in b.bridges():
-			for v in e.endpoints():
-				if(v in self.points): continue
-				if(g.degree(v) <= 1): continue
-
-				self.points.add(v)
+		self.points = set(BiconnectedComponents(graph).articulation_points())
 
 	def articulation_points(self):
 		return self.points
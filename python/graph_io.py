@@ -0,0 +1,399 @@
+import numbers
+from array import array
+from graph import CSRGraph, value_array
+
+try:
+	import numpy
+except ImportError:
+	numpy = None
+
+############################
+# UTILITY: Graph File Formats
+# ~ Streaming loaders and writers for common graph file formats:
+#
+# ~ Edge list     'u v [weight [capacity]]' per line, whitespace or
+# ~               any other delimiter (e.g. ',' for CSV). '#' and
+# ~               '%' start comment lines.
+# ~ DIMACS        'p sp' (weighted arcs), 'p max' (arcs with
+# ~               capacities, 'n' lines marking the source and sink)
+# ~               and 'p edge' (undirected edges).
+# ~ METIS         an adjacency list per vertex, with optional vertex
+# ~               sizes, vertex weights and edge weights.
+# ~ Matrix Market coordinate format, 'general' (directed) or
+# ~               'symmetric' (undirected), with integer, real or
+# ~               pattern entries.
+#
+# ~ Loaders return a CSRGraph built straight from columns of numbers,
+# ~ so no Edge object is made per line. Call thaw() on it for a mutable
+# ~ Graph. Vertices of the numbered formats (DIMACS, METIS, Matrix
+# ~ Market) are labeled 1..n as in the file. Writers take any graph
+# ~ (Graph, CSRGraph or view) and number its vertices 1..n in V() order
+# ~ where the format needs it.
+#
+# IMPLEMENTATION:
+# ~ Files are read CHUNK_BYTES at a time. Each chunk's numeric rows are
+# ~ parsed in one numpy.fromstring call when NumPy is installed, or
+# ~ token by token otherwise, and only the parsed columns are kept.
+# ~ Either way a row with the wrong number of columns, or a token that
+# ~ is not a number, raises ValueError.
+# ~ Writers likewise join and write their lines a chunk at a time.
+############################
+CHUNK_BYTES = 1 << 20
+WRITE_LINES = 8192
+
+def read_chunks(f, size=CHUNK_BYTES):
+	while(True):
+		lines = f.readlines(size)
+		if(not lines): return
+		yield lines
+
+def number(token):
+	try:
+		return int(token)
+	except ValueError:
+		return float(token)
+
+def format_number(x):
+	if(isinstance(x, numbers.Integral)): return str(x)
+	return repr(float(x))
+
+# rows of numbers parsed from lines of text, as a 2-D NumPy array
+# or a list of lists.
+def parse_rows(lines, ncols, delimiter=None):
+	if(numpy != None):
+		text = ''.join(lines)
+		if(delimiter != None): text = text.replace(delimiter, ' ')
+		widths = row_widths(text, len(lines))
+		if(widths.size and (widths.min() != ncols or widths.max() != ncols)):
+			raise ValueError("rows do not all have "+str(ncols)+" columns")
+		# fromstring stops at the first token that is not a number
+		values = numpy.fromstring(text, sep=' ')
+		if(values.size != len(lines) * ncols):
+			raise ValueError("rows hold tokens that are not numbers")
+		return values.reshape(-1, ncols)
+	return [[number(t) for t in line.split(delimiter)] for line in lines]
+
+# the number of whitespace-separated tokens on each of the nrows lines
+# of text, counted over its bytes at once: a token starts wherever a
+# non-space byte (above ' ') follows a space, and each line's count is
+# the number of token starts between its newline and the one before.
+def row_widths(text, nrows):
+	if(not isinstance(text, bytes)): text = text.encode('utf-8')
+	chars = numpy.frombuffer(text, dtype=numpy.uint8)
+	space = chars <= ord(' ')
+	starts = ~space
+	starts[1:] &= space[:-1]
+	starts = numpy.flatnonzero(starts)
+	ends = numpy.searchsorted(starts, numpy.flatnonzero(chars == ord('\n')))
+	return numpy.diff(numpy.concatenate(([0], ends, [starts.size])))[:nrows]
+
+# the columns of a list of row blocks, as NumPy arrays if the blocks
+# came from parse_rows with NumPy, or lists otherwise.
+def stack_columns(blocks, ncols, parsed=True):
+	if(numpy != None and parsed):
+		rows = numpy.vstack(blocks) if blocks else numpy.zeros((0, ncols))
+		return [rows[:, c] for c in range(ncols)]
+	columns = [[] for c in range(ncols)]
+	for block in blocks:
+		for row in block:
+			if(len(row) != ncols):
+				raise ValueError("rows do not all have "+str(ncols)+" columns")
+			for c in range(ncols): columns[c].append(row[c])
+	return columns
+
+def value_column(column):
+	if(not isinstance(column, list)):
+		if(len(column) and numpy.all(column == numpy.floor(column))):
+			return array('l', column.astype(numpy.int64).tolist())
+		return array('d', column.tolist())
+	return value_array(column) or array('l')
+
+def id_column(column, offset=0):
+	if(not isinstance(column, list)): column = column.astype(numpy.int64).tolist()
+	return [int(v) - offset for v in column]
+
+def graph_attrs(directed, weights, capacities):
+	return {'directed' : directed,
+			'weighted' : weights != None,
+			'capacious' : capacities != None,
+			'incoming' : False}
+
+def vertex_data(labels):
+	return dict((v, {'id' : v, 'name' : v}) for v in labels)
+
+def write_lines(f, lines):
+	buf = []
+	for line in lines:
+		buf.append(line)
+		if(len(buf) >= WRITE_LINES):
+			f.write('\n'.join(buf) + '\n')
+			buf = []
+	if(buf): f.write('\n'.join(buf) + '\n')
+
+# (labels, 1-based number of each label) for the numbered formats
+def numbering(g):
+	labels = list(g.V())
+	return labels, dict((v, i + 1) for i, v in enumerate(labels))
+
+############################
+# FORMAT: Edge List
+# ~ label_type converts the endpoint tokens (int by default; use str
+# ~ for arbitrary names). Weight and capacity columns are used when the
+# ~ first row has them. Int labels are sorted; other labels are kept in
+# ~ the order they first appear.
+############################
+def load_edge_list(path, directed=False, delimiter=None, label_type=int):
+	fast = numpy != None and label_type == int
+	ncols, blocks = None, []
+	with open(path) as f:
+		for lines in read_chunks(f):
+			lines = [l for l in lines if l.strip() and l.lstrip()[0] not in '#%']
+			if(not lines): continue
+			if(ncols == None): ncols = len(lines[0].split(delimiter))
+			if(fast):
+				blocks.append(parse_rows(lines, ncols, delimiter))
+			else:
+				blocks.append([[t.strip() for t in l.split(delimiter)] for l in lines])
+	if(ncols == None): ncols = 2
+	if(ncols < 2 or ncols > 4):
+		raise ValueError("edge lists have 2 to 4 columns, not "+str(ncols))
+
+	columns = stack_columns(blocks, ncols, fast)
+	if(fast):
+		ends = numpy.concatenate((columns[0], columns[1])).astype(numpy.int64)
+		labels, ids = numpy.unique(ends, return_inverse=True)
+		labels, ids, m = labels.tolist(), ids.tolist(), len(columns[0])
+		src, dst = ids[:m], ids[m:]
+	else:
+		index, labels = {}, []
+		for v in columns[0] + columns[1]:
+			v = label_type(v)
+			if(v not in index):
+				index[v] = len(labels)
+				labels.append(v)
+		if(label_type == int):
+			labels.sort()
+			index = dict((v, i) for i, v in enumerate(labels))
+		src = [index[label_type(v)] for v in columns[0]]
+		dst = [index[label_type(v)] for v in columns[1]]
+		columns[2:] = [[number(t) for t in c] for c in columns[2:]]
+
+	wts = value_column(columns[2]) if ncols > 2 else None
+	caps = value_column(columns[3]) if ncols > 3 else None
+	return CSRGraph.from_arrays(labels, src, dst, wts, caps,
+								graph_attrs(directed, wts, caps), vertex_data(labels))
+
+def write_edge_list(g, path, delimiter=' '):
+	capacious = g.is_flowgraph()
+	weighted = g.is_weighted() or capacious
+	def line(e):
+		cols = [str(e.v1), str(e.v2)]
+		if(weighted): cols.append(format_number(1 if e.wt == None else e.wt))
+		if(capacious): cols.append(format_number(0 if e.cap == None else e.cap))
+		return delimiter.join(cols)
+	with open(path, 'w') as f:
+		write_lines(f, (line(e) for e in g.E))
+
+############################
+# FORMAT: DIMACS
+# ~ 'p sp n m' files give weighted arcs, 'p max n m' files give arcs
+# ~ with capacities (the 'n v s' / 'n v t' lines set data[v]['dimacs']
+# ~ to 's' or 't'), and 'p edge n m' files give undirected edges.
+# ~ Writing picks 'max' for flow graphs, 'sp' for directed or weighted
+# ~ graphs and 'edge' otherwise. 'max' and 'sp' only have arcs, so an
+# ~ undirected edge is written as two arcs, and such a file loads back
+# ~ as a directed graph with twice as many edges. Edges of a flow
+# ~ graph with no capacity are written with capacity 0, as in edge
+# ~ lists.
+############################
+def load_dimacs(path):
+	n, kind, roles = 0, None, {}
+	ncols, blocks = None, []
+	with open(path) as f:
+		for lines in read_chunks(f):
+			rows = []
+			for line in lines:
+				c = line[:1]
+				if(c == 'a' or c == 'e'):
+					rows.append(line[1:])
+				elif(c == 'p'):
+					tokens = line.split()
+					kind, n = tokens[1], int(tokens[2])
+				elif(c == 'n'):
+					tokens = line.split()
+					roles[int(tokens[1])] = tokens[2]
+			if(not rows): continue
+			if(ncols == None): ncols = len(rows[0].split())
+			blocks.append(parse_rows(rows, ncols))
+	if(kind == None): raise ValueError("DIMACS file has no 'p' line")
+
+	columns = stack_columns(blocks, ncols or (2 if kind == 'edge' else 3))
+	src, dst = id_column(columns[0], 1), id_column(columns[1], 1)
+	wts = caps = None
+	if(kind == 'max'): caps = value_column(columns[2])
+	elif(kind != 'edge'): wts = value_column(columns[2])
+
+	labels = list(range(1, n + 1))
+	data = vertex_data(labels)
+	for v in roles: data[v]['dimacs'] = roles[v]
+	return CSRGraph.from_arrays(labels, src, dst, wts, caps,
+								graph_attrs(kind != 'edge', wts, caps), data)
+
+def write_dimacs(g, path):
+	labels, num = numbering(g)
+	edges = list(g.E)
+	directed = g.is_directed()
+	if(g.is_flowgraph()):
+		kind, value = 'max', lambda e: 0 if e.cap == None else e.cap
+	elif(directed or g.is_weighted()):
+		kind, value = 'sp', lambda e: 1 if e.wt == None else e.wt
+	else:
+		kind, value = 'edge', None
+
+	def lines():
+		arcs = len(edges) if directed or kind == 'edge' else \
+			   sum(1 if e.v1 == e.v2 else 2 for e in edges)
+		yield 'p '+kind+' '+str(len(labels))+' '+str(arcs)
+		for v in labels:
+			role = g.data.get(v, {}).get('dimacs')
+			if(kind == 'max' and role != None): yield 'n '+str(num[v])+' '+role
+		for e in edges:
+			a, b = str(num[e.v1]), str(num[e.v2])
+			if(kind == 'edge'):
+				yield 'e '+a+' '+b
+				continue
+			w = format_number(value(e))
+			yield 'a '+a+' '+b+' '+w
+			if(not directed and a != b): yield 'a '+b+' '+a+' '+w
+	with open(path, 'w') as f:
+		write_lines(f, lines())
+
+############################
+# FORMAT: METIS
+# ~ Undirected graphs only. Each edge is listed under both endpoints;
+# ~ it is kept once. Vertex sizes and (first) vertex weights go into
+# ~ data[v]['size'] and data[v]['weight'].
+############################
+def load_metis(path):
+	header, v = None, 0
+	src, dst, wts, data = [], [], [], {}
+	with open(path) as f:
+		for lines in read_chunks(f):
+			for line in lines:
+				if(line.startswith('%')): continue
+				tokens = line.split()
+				if(header == None):
+					if(not tokens): continue
+					header = tokens
+					n = int(header[0])
+					fmt = header[2].rjust(3, '0') if len(header) > 2 else '000'
+					ncon = int(header[3]) if len(header) > 3 else 1
+					vsize, vwgt, ewgt = fmt[-3] == '1', fmt[-2] == '1', fmt[-1] == '1'
+					step = 2 if ewgt else 1
+					continue
+
+				if(v >= n and not tokens): continue
+				v += 1
+				values = [number(t) for t in tokens]
+				data[v] = {'id' : v, 'name' : v}
+				if(vsize): data[v]['size'] = values.pop(0)
+				if(vwgt):
+					data[v]['weight'] = values[0]
+					values = values[ncon:]
+				for i in range(0, len(values), step):
+					u = values[i]
+					if(u < v): continue
+					src.append(v - 1)
+					dst.append(u - 1)
+					if(ewgt): wts.append(values[i + 1])
+	if(header == None): raise ValueError("METIS file has no header")
+
+	labels = list(range(1, n + 1))
+	for u in labels:
+		if(u not in data): data[u] = {'id' : u, 'name' : u}
+	weights = (value_array(wts) or array('l')) if ewgt else None
+	return CSRGraph.from_arrays(labels, src, dst, weights, None,
+								graph_attrs(False, weights, None), data)
+
+def write_metis(g, path):
+	if(g.is_directed()): raise ValueError("METIS only holds undirected graphs")
+	labels, num = numbering(g)
+	weighted = g.is_weighted()
+	edges = 0
+	for e in g.E:
+		if(e.v1 == e.v2): raise ValueError("METIS graphs cannot have self-loops")
+		edges += 1
+
+	def lines():
+		yield str(len(labels))+' '+str(edges)+(' 001' if weighted else '')
+		for v in labels:
+			cols = []
+			for e in g.edges(v):
+				cols.append(str(num[e.other(v)]))
+				if(weighted): cols.append(format_number(1 if e.wt == None else e.wt))
+			yield ' '.join(cols)
+	with open(path, 'w') as f:
+		write_lines(f, lines())
+
+############################
+# FORMAT: Matrix Market
+# ~ Coordinate matrices only. Entry (i, j) is an edge i->j; a
+# ~ 'symmetric' matrix becomes an undirected graph, and 'general' a
+# ~ directed one. Integer and real values become weights.
+############################
+def load_matrix_market(path):
+	header, size, ncols, blocks = None, None, None, []
+	with open(path) as f:
+		for lines in read_chunks(f):
+			rows = []
+			for line in lines:
+				if(line.startswith('%%MatrixMarket')):
+					header = line.lower().split()
+					continue
+				if(line.startswith('%') or not line.strip()): continue
+				if(size == None):
+					size = [int(t) for t in line.split()]
+					continue
+				rows.append(line)
+			if(not rows): continue
+			if(ncols == None): ncols = len(rows[0].split())
+			blocks.append(parse_rows(rows, ncols))
+
+	if(header == None or size == None): raise ValueError("not a Matrix Market file")
+	if(header[2] != 'coordinate'): raise ValueError("only coordinate matrices are supported")
+	field, symmetry = header[3], header[4]
+	if(field not in ('real', 'integer', 'pattern')):
+		raise ValueError("unsupported Matrix Market field: "+field)
+	if(symmetry not in ('general', 'symmetric')):
+		raise ValueError("unsupported Matrix Market symmetry: "+symmetry)
+
+	ncols = ncols or (2 if field == 'pattern' else 3)
+	columns = stack_columns(blocks, ncols)
+	src, dst = id_column(columns[0], 1), id_column(columns[1], 1)
+	wts = value_column(columns[2]) if field != 'pattern' else None
+	labels = list(range(1, max(size[0], size[1]) + 1))
+	return CSRGraph.from_arrays(labels, src, dst, wts, None,
+								graph_attrs(symmetry == 'general', wts, None),
+								vertex_data(labels))
+
+def write_matrix_market(g, path):
+	labels, num = numbering(g)
+	edges = list(g.E)
+	weighted = g.is_weighted()
+	field = 'pattern'
+	if(weighted):
+		ints = all(e.wt == None or isinstance(e.wt, numbers.Integral) for e in edges)
+		field = 'integer' if ints else 'real'
+	symmetry = 'general' if g.is_directed() else 'symmetric'
+
+	def lines():
+		yield '%%MatrixMarket matrix coordinate '+field+' '+symmetry
+		yield str(len(labels))+' '+str(len(labels))+' '+str(len(edges))
+		for e in edges:
+			i, j = num[e.v1], num[e.v2]
+			if(symmetry == 'symmetric' and i < j): i, j = j, i
+			cols = [str(i), str(j)]
+			if(weighted): cols.append(format_number(1 if e.wt == None else e.wt))
+			yield ' '.join(cols)
+	with open(path, 'w') as f:
+		write_lines(f, lines())
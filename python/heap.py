@@ -1,149 +1,148 @@
-from common import Node
+import numbers
+import operator
 
 ############################
 # DATA STRUCTURE: Heap
-# ~ Constructor initializes an empty heap, to which nodes
-# ~ can be inserted or deleted. Heaps can be set to be min 
-# ~ or max at the time of initialization. THis data structure
-# ~ Is commonly used for MinHeaps, MaxHeaps, and Priority Queues.
+# ~ Constructor initializes an empty heap, to which values
+# ~ can be inserted or deleted. Heaps can be set to be min
+# ~ or max at the time of initialization. This data structure
+# ~ is commonly used for MinHeaps, MaxHeaps, and Priority Queues.
 #
-#~ NOTE: This data strucute uses the __cmp__ method to allow the
-# ~ comparison of any object. To 'heapify' any object or type,
-# ~ simply override this method to define your own comparison with
-# ~ another object of the same type.
+# ~ NOTE: This data structure compares values with the < and >
+# ~ operators. To 'heapify' any object or type, define __lt__ and
+# ~ __gt__ on it. Python 2 falls back to the __cmp__ method when
+# ~ they are missing, but Python 3 does not.
+#
+# IMPLEMENTATION:
+# ~ An implicit d-ary tree stored in a flat list (binary by default).
+# ~ The children of index i live at d*i+1 .. d*i+d, and its parent at
+# ~ (i-1)/d, so no node objects or subtree counts are needed. Sifting
+# ~ is done iteratively by moving a 'hole' instead of swapping.
 #
 # RUNNING TIME:
 # ~ Insert: O(lg(n))
-# ~ Pop: O(lg(n))
-# ~ Merge: O(mlg(n+m))
+# ~ Insert All: O(n+m) (heapify)
+# ~ Pop: O(d*lg(n)/lg(d))
+# ~ Merge: O(n+m)
 # ~ Peek: O(1)
 ############################
 class Heap:
 
-	def __init__(self, minheap=True):
-		self.root = None
+	def __init__(self, minheap=True, arity=2):
+		if(arity < 2): raise ValueError("heap arity must be at least 2")
+		self.items = []
+		self.d = arity
 		self.heap_type = -1 if minheap else 1
+		self.above = operator.lt if minheap else operator.gt
 
-		# dictionary to keep track of subtree sizes.
-		# this keeps the tree balanced when inserting.
-		self.cts = {}
-
-	def __swap__(self, node1, node2):
-		temp = node1.value
-		node1.value = node2.value
-		node2.value = temp
-
-	def __sink__(self, node, left_child=True):
-		if(node.is_leaf()):
-			temp = node.value
-			if(not node.is_root()):
-				if(left_child):
-					node.parent.left(None)
-				else:
-					node.parent.right(None)
-			else:
-				self.root = None
-			del self.cts[node]
-			del node
-			return temp
-		else:
-			self.cts[node] -= 1
-			if(node.rchild == None):
-				self.__swap__(node, node.lchild)
-				return self.__sink__(node.lchild)
-			elif(node.lchild == None):
-				self.__swap__(node, node.rchild)
-				return self.__sink__(node.rchild, False)
-			else:
-				if(node.lchild.value.__cmp__(node.rchild.value) == self.heap_type):
-					self.__swap__(node, node.lchild)
-					return self.__sink__(node.lchild)
-				else:
-					self.__swap__(node, node.rchild)
-					return self.__sink__(node.rchild, False)
-
-	def __bubble__(self, node):
-		if(node.parent == None): return
-		if(node.value.__cmp__(node.parent.value) == self.heap_type):
-			self.__swap__(node, node.parent)
-			self.__bubble__(node.parent)
-
-	def __findleaf__(self, value, node):
-		self.cts[node] += 1
-		if(node.lchild and node.rchild):
-			if(self.cts[node.lchild]< self.cts[node.rchild]):
-				self.__findleaf__(value, node.lchild)
-			else:
-				self.__findleaf__(value, node.rchild)
-		else:
-			newnode = Node(value)
-			self.cts[newnode] = 1
-			if(not node.lchild):
-				node.left(newnode)
-			else:
-				node.right(newnode)
-			newnode.parent = node
-			self.__bubble__(newnode)
+	def __bubble__(self, i):
+		items, above, d = self.items, self.above, self.d
+		value = items[i]
+		while(i > 0):
+			par = (i - 1) // d
+			if(not above(value, items[par])): break
+			items[i] = items[par]
+			i = par
+		items[i] = value
+
+	def __sink__(self, i):
+		items, above, d = self.items, self.above, self.d
+		n = len(items)
+		value = items[i]
+		while(True):
+			first = d * i + 1
+			if(first >= n): break
+			best, c, last = first, first + 1, min(first + d, n)
+			while(c < last):
+				if(above(items[c], items[best])): best = c
+				c += 1
+			if(not above(items[best], value)): break
+			items[i] = items[best]
+			i = best
+		items[i] = value
+
+	def __heapify__(self):
+		if(len(self.items) < 2): return
+		for i in range((len(self.items) - 2) // self.d, -1, -1):
+			self.__sink__(i)
 
 	def insert_all(self, values):
-		for value in values:
-			self.insert(value)
+		n = len(self.items)
+		self.items.extend(values)
+		added = len(self.items) - n
 
-	def insert(self, value):
-		if(self.root == None):
-			self.root = Node(value)
-			self.cts[self.root] = 1
+		# a small batch into a large heap is cheaper to
+		# bubble up one value at a time than to re-heapify.
+		if(added * 2 < n):
+			for i in range(n, n + added):
+				self.__bubble__(i)
 		else:
-			self.__findleaf__(value, self.root)
+			self.__heapify__()
+
+	def insert(self, value):
+		self.items.append(value)
+		self.__bubble__(len(self.items) - 1)
 
 	def peek(self):
 		if(self.empty()): return
-		return self.root.value
+		return self.items[0]
 
 	def pop(self):
 		if(self.empty()): return
-		return self.__sink__(self.root)
+		items = self.items
+		last = items.pop()
+		if(not items): return last
+		top = items[0]
+		items[0] = last
+		self.__sink__(0)
+		return top
 
 	def empty(self):
-		return self.root == None
-
-	def __mergeheap__(self, root):
-		self.insert(root.value)
-		if(root.lchild != None):
-			self.__mergeheap__(root.lchild)
-		if(root.rchild != None):
-			self.__mergeheap__(root.rchild)
+		return not self.items
 
 	def merge(self, heap2):
 		if(heap2.empty()): return
-		self.__mergeheap__(heap2.root)
+		self.items.extend(heap2.items)
+		self.__heapify__()
 
-	def __pp__(self, node, depth=0):
-		if(node == None): return
+	def __subtree_size__(self, i):
+		n, d = len(self.items), self.d
+		lo = hi = i
+		count = 0
+		while(lo < n):
+			count += min(hi, n - 1) - lo + 1
+			lo, hi = d * lo + 1, d * hi + d
+		return count
 
-		print(" "*depth + str(node.value)+" ("+str(self.cts[node])+")")
-		self.__pp__(node.lchild, depth+1)
-		self.__pp__(node.rchild, depth+1)
+	def __pp__(self, i, depth=0):
+		if(i >= len(self.items)): return
+
+		print(" "*depth + str(self.items[i])+" ("+str(self.__subtree_size__(i))+")")
+		for c in range(self.d * i + 1, self.d * i + self.d + 1):
+			self.__pp__(c, depth+1)
 
 	def size(self):
-		return self.cts[self.root]
+		return len(self.items)
+
+	def __len__(self):
+		return len(self.items)
 
 	def pretty_print(self):
-		self.__pp__(self.root, 0)
+		self.__pp__(0, 0)
 
 ############################
 # DATA STRUCTURE: PriorityQueue
 # ~ A wrapper for a heap.
 #
-# ~ NOTE: Priority is based on equality operators. If objects are being
-# ~ inserted into the priority queue, make sure to define the __cmp__()
-# ~ method so that <, <=, > >=, and == methods are defined for the object.
+# ~ NOTE: Priority is based on the < and > operators. If objects are
+# ~ being inserted into the priority queue, make sure to define __lt__
+# ~ and __gt__ for them (see the note on Heap above).
 ############################
 class PriorityQueue(Heap):
 
-	def __init__(self, increasing=True):
-		Heap.__init__(increasing)
-		
+	def __init__(self, increasing=True, arity=2):
+		Heap.__init__(self, increasing, arity)
+
 	def enqueue(self, value):
 		self.insert(value)
 
@@ -156,8 +155,8 @@ class PriorityQueue(Heap):
 ############################
 class MinHeap(Heap):
 
-	def __init__(self):
-		Heap.__init__(self, True)
+	def __init__(self, arity=2):
+		Heap.__init__(self, True, arity)
 
 
 ############################
@@ -166,5 +165,281 @@ class MinHeap(Heap):
 ############################
 class MaxHeap(Heap):
 
+	def __init__(self, arity=2):
+		Heap.__init__(self, False, arity)
+
+
+############################
+# DATA STRUCTURE: IndexedPriorityQueue
+# ~ A heap of keys (such as graph vertices), each of which holds a
+# ~ priority. A key appears at most once, and its priority can be
+# ~ changed in place, so algorithms like Prim's or Dijkstra's can keep
+# ~ one entry per vertex instead of pushing stale duplicates.
+#
+# IMPLEMENTATION:
+# ~ The list-backed heap above holds keys, while two dictionaries map
+# ~ each key to its priority and to its current index in the heap.
+# ~ Every move during a sift updates the index map.
+#
+# RUNNING TIME:
+# ~ Insert: O(lg(n))
+# ~ Pop: O(lg(n))
+# ~ Decrease Key / Update / Remove: O(lg(n))
+# ~ Contains / Priority / Peek: O(1)
+############################
+class IndexedPriorityQueue(Heap):
+
+	def __init__(self, minheap=True, arity=2):
+		Heap.__init__(self, minheap, arity)
+		self.prio = {}
+		self.pos = {}
+
+	def __bubble__(self, i):
+		items, prio, pos = self.items, self.prio, self.pos
+		above, d = self.above, self.d
+		key = items[i]
+		p = prio[key]
+		while(i > 0):
+			par = (i - 1) // d
+			if(not above(p, prio[items[par]])): break
+			items[i] = items[par]
+			pos[items[i]] = i
+			i = par
+		items[i] = key
+		pos[key] = i
+
+	def __sink__(self, i):
+		items, prio, pos = self.items, self.prio, self.pos
+		above, d = self.above, self.d
+		n = len(items)
+		key = items[i]
+		p = prio[key]
+		while(True):
+			first = d * i + 1
+			if(first >= n): break
+			best, c, last = first, first + 1, min(first + d, n)
+			while(c < last):
+				if(above(prio[items[c]], prio[items[best]])): best = c
+				c += 1
+			if(not above(prio[items[best]], p)): break
+			items[i] = items[best]
+			pos[items[i]] = i
+			i = best
+		items[i] = key
+		pos[key] = i
+
+	def insert(self, key, priority):
+		if(key in self.pos): raise KeyError("key already in queue: "+str(key))
+		self.prio[key] = priority
+		self.items.append(key)
+		self.__bubble__(len(self.items) - 1)
+
+	def insert_all(self, pairs):
+		for key, priority in pairs:
+			self.insert(key, priority)
+
+	def contains(self, key):
+		return key in self.pos
+
+	def __contains__(self, key):
+		return key in self.pos
+
+	def priority(self, key):
+		return self.prio[key]
+
+	def decrease_key(self, key, priority):
+		if(self.above(self.prio[key], priority)):
+			raise ValueError("new priority would move key away from the top")
+		self.prio[key] = priority
+		self.__bubble__(self.pos[key])
+
+	def update(self, key, priority):
+		if(key not in self.pos):
+			self.insert(key, priority)
+			return
+		self.prio[key] = priority
+		i = self.pos[key]
+		self.__bubble__(i)
+		self.__sink__(self.pos[key])
+
+	def remove(self, key):
+		i = self.pos.pop(key)
+		del self.prio[key]
+		last = self.items.pop()
+		if(i == len(self.items)): return
+		self.items[i] = last
+		self.pos[last] = i
+		self.__bubble__(i)
+		self.__sink__(self.pos[last])
+
+	def peek(self):
+		if(self.empty()): return
+		key = self.items[0]
+		return (key, self.prio[key])
+
+	# returns the top (key, priority) pair
+	def pop(self):
+		if(self.empty()): return
+		key = self.items[0]
+		priority = self.prio[key]
+		self.remove(key)
+		return (key, priority)
+
+	def merge(self, heap2):
+		for key in heap2.items:
+			self.update(key, heap2.prio[key])
+
+	def __pp__(self, i, depth=0):
+		if(i >= len(self.items)): return
+
+		key = self.items[i]
+		print(" "*depth + str(key)+": "+str(self.prio[key])+" ("+str(self.__subtree_size__(i))+")")
+		for c in range(self.d * i + 1, self.d * i + self.d + 1):
+			self.__pp__(c, depth+1)
+
+############################
+# DATA STRUCTURE: PairingHeap
+# ~ A heap with the same insert / peek / pop / merge interface as
+# ~ Heap above, but with O(1) insert and merge. Useful when a search
+# ~ pushes many more entries than it pops. Merging empties heap2,
+# ~ since its nodes become part of this heap.
+#
+# IMPLEMENTATION:
+# ~ A heap-ordered multiway tree. Each node is a [value, children]
+# ~ list. Insert and merge link two roots by making the lesser root
+# ~ a child of the other. Pop removes the root and combines its
+# ~ children in two passes: pairwise left to right, then folded
+# ~ right to left.
+#
+# RUNNING TIME:
+# ~ Insert: O(1)
+# ~ Merge: O(1)
+# ~ Peek: O(1)
+# ~ Pop: O(lg(n)) amortized
+############################
+class PairingHeap:
+
+	def __init__(self, minheap=True):
+		self.root = None
+		self.n = 0
+		self.heap_type = -1 if minheap else 1
+		self.above = operator.lt if minheap else operator.gt
+
+	def __link__(self, a, b):
+		if(a == None): return b
+		if(b == None): return a
+		if(self.above(b[0], a[0])): a, b = b, a
+		a[1].append(b)
+		return a
+
+	def insert(self, value):
+		self.root = self.__link__(self.root, [value, []])
+		self.n += 1
+
+	def insert_all(self, values):
+		for v in values:
+			self.insert(v)
+
+	def peek(self):
+		if(self.empty()): return
+		return self.root[0]
+
+	def pop(self):
+		if(self.empty()): return
+		top, kids = self.root[0], self.root[1]
+		paired = [self.__link__(kids[i], kids[i + 1] if i + 1 < len(kids) else None) \
+				  for i in range(0, len(kids), 2)]
+		root = None
+		for node in reversed(paired):
+			root = self.__link__(node, root)
+		self.root = root
+		self.n -= 1
+		return top
+
+	def empty(self):
+		return self.root == None
+
+	def merge(self, heap2):
+		if(heap2.empty()): return
+		self.root = self.__link__(self.root, heap2.root)
+		self.n += heap2.n
+		heap2.root, heap2.n = None, 0
+
+	def size(self):
+		return self.n
+
+	def __len__(self):
+		return self.n
+
+############################
+# DATA STRUCTURE: RadixHeap
+# ~ A monotone min heap of (key, item) tuples with non-negative int
+# ~ keys, where no key inserted may be smaller than the last key
+# ~ popped. Dijkstra's algorithm with integer weights satisfies this,
+# ~ and gains cheap inserts and pops that only touch a few buckets.
+# ~ Inserting a key that breaks the rule raises a ValueError.
+#
+# IMPLEMENTATION:
+# ~ Bucket b holds the tuples whose key differs from the last
+# ~ popped key in bit b-1 at the highest, so bucket 0 holds keys
+# ~ equal to it. When bucket 0 runs dry, the lowest non-empty
+# ~ bucket is emptied, its minimum becomes the new last key, and
+# ~ its tuples are spread over the buckets below it.
+#
+# RUNNING TIME:
+# ~ Insert: O(1)
+# ~ Pop: O(lg(C)) amortized, for keys up to C
+# ~ Peek: O(1), or O(size of a bucket) after the bucket empties
+############################
+class RadixHeap:
+
 	def __init__(self):
-		Heap.__init__(self, False)
+		self.buckets = [[]]
+		self.last = 0
+		self.n = 0
+
+	def __bucket__(self, key):
+		return (key ^ self.last).bit_length()
+
+	def insert(self, value):
+		key = value[0]
+		if(not isinstance(key, numbers.Integral) or key < self.last):
+			raise ValueError("radix heap keys must be ints no smaller than "+str(self.last))
+		b = self.__bucket__(key)
+		while(len(self.buckets) <= b): self.buckets.append([])
+		self.buckets[b].append(value)
+		self.n += 1
+
+	def insert_all(self, values):
+		for v in values:
+			self.insert(v)
+
+	def __refill__(self):
+		buckets = self.buckets
+		if(buckets[0]): return
+		b = 1
+		while(not buckets[b]): b += 1
+		moved, buckets[b] = buckets[b], []
+		self.last = min(v[0] for v in moved)
+		for v in moved:
+			buckets[self.__bucket__(v[0])].append(v)
+
+	def peek(self):
+		if(self.empty()): return
+		self.__refill__()
+		return self.buckets[0][-1]
+
+	def pop(self):
+		if(self.empty()): return
+		self.__refill__()
+		self.n -= 1
+		return self.buckets[0].pop()
+
+	def empty(self):
+		return self.n == 0
+
+	def size(self):
+		return self.n
+
+	def __len__(self):
+		return self.n
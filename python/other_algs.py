@@ -1,50 +1,157 @@
+from array import array
+
+try:
+	import numpy
+except ImportError:
+	numpy = None
+
 ############################
 # DATA STRUCTURE: Union Find
 # ~ Constructor initializes an empty union-find, which supports
 # ~ two basic operations (unsurprisingly): Union, and find. This
 # ~ data structure is renowned for its O(log*n) query time due to
 # ~ path compression up to the root with every find operation. It is a
-# ~ type of 'disjoint set' data structure, meaning it has a set of 
+# ~ type of 'disjoint set' data structure, meaning it has a set of
 # ~ elements, each of which belong to a different set.
+#
+# IMPLEMENTATION:
+# ~ A label-mapping wrapper around IntUnionFind below: each element
+# ~ is numbered in the order makeset sees it, and every operation is
+# ~ forwarded with those numbers. Any hashable object can be an element.
 ############################
 class UnionFind:
 
 	def __init__(self, nodes = []):
-		self.parent = {}
-		self.rank = {}
+		self.ids = {}
+		self.labels = []
+		self.uf = IntUnionFind(0)
 		for node in nodes:
 			self.makeset(node)
 
 	def find(self, x):
-		if(self.parent[x] != x):
-			self.parent[x] = self.find(self.parent[x])
-		return self.parent[x] 
+		return self.labels[self.uf.find(self.ids[x])]
 
 	def union(self, x, y):
-		xpar, ypar = self.find(x), self.find(y)
-		rx, ry = self.rank[xpar], self.rank[ypar]
-		
-		if(rx > ry):
-			self.parent[ypar] = xpar
-		elif(rx < ry):
-			self.parent[xpar] = ypar
-		else:
-			self.parent[ypar] = xpar
-			self.rank[xpar] += 1
+		return self.uf.union(self.ids[x], self.ids[y])
+
+	def connected(self, x, y):
+		return self.uf.connected(self.ids[x], self.ids[y])
 
 	def makeset(self, x):
-		self.parent[x] = x
-		self.rank[x] = 0
+		if(x in self.ids): return
+		self.ids[x] = self.uf.makeset()
+		self.labels.append(x)
+
+	def find_many(self, xs):
+		labels = self.labels
+		return [labels[r] for r in self.uf.find_many([self.ids[x] for x in xs])]
+
+	def union_many(self, pairs):
+		ids = self.ids
+		return self.uf.union_many((ids[x], ids[y]) for x, y in pairs)
+
+	def num_sets(self):
+		return self.uf.num_sets()
+
+	def set_size(self, x):
+		return self.uf.set_size(self.ids[x])
 
 	def unions(self):
-		sets = {}
-		for key in self.parent:
-			k = self.parent[key]
-			if(k not in sets):
-				sets[k] = []
-			sets[k].append(key)
-		ret = []
-		for s in sets:
-			ret.append(sets[s])
+		labels = self.labels
+		return [[labels[i] for i in s] for s in self.uf.unions()]
+
+############################
+# DATA STRUCTURE: Int Union Find
+# ~ A union-find over the dense ints 0..n-1, for algorithms that
+# ~ already number their vertices (CSR graphs, adjacency arrays).
+# ~ union() returns True if it joined two different sets, and
+# ~ makeset() appends a new singleton and returns its number.
+#
+# IMPLEMENTATION:
+# ~ Flat parent and size arrays (array('i')). find() is iterative and
+# ~ halves the path as it climbs (every node skips to its grandparent),
+# ~ and union() hangs the smaller set under the larger one. The number
+# ~ of sets is kept as a running count. roots() finds every root at
+# ~ once, with NumPy pointer jumping when NumPy is installed.
+#
+# RUNNING TIME:
+# ~ Find / Union: O(a(n)) amortized
+# ~ Num Sets: O(1)
+# ~ Roots / Unions: O(n)
+############################
+class IntUnionFind:
+
+	def __init__(self, n):
+		self.parent = array('i', range(n))
+		self.size = array('i', [1]) * n
+		self.count = n
+
+	def makeset(self):
+		x = len(self.parent)
+		self.parent.append(x)
+		self.size.append(1)
+		self.count += 1
+		return x
 
+	def find(self, x):
+		parent = self.parent
+		while(parent[x] != x):
+			parent[x] = parent[parent[x]]
+			x = parent[x]
+		return x
+
+	def union(self, x, y):
+		x, y = self.find(x), self.find(y)
+		if(x == y): return False
+		if(self.size[x] < self.size[y]): x, y = y, x
+		self.parent[y] = x
+		self.size[x] += self.size[y]
+		self.count -= 1
+		return True
+
+	def connected(self, x, y):
+		return self.find(x) == self.find(y)
+
+	def find_many(self, xs):
+		find = self.find
+		return array('i', [find(x) for x in xs])
+
+	# returns the number of pairs that joined two different sets
+	def union_many(self, pairs):
+		union = self.union
+		joined = 0
+		for x, y in pairs:
+			if(union(x, y)): joined += 1
+		return joined
+
+	def num_sets(self):
+		return self.count
+
+	def set_size(self, x):
+		return self.size[self.find(x)]
+
+	# the root of every element (a NumPy array if NumPy is installed).
+	# Every path is fully compressed along the way.
+	def roots(self):
+		parent = self.parent
+		if(numpy == None or not len(parent)):
+			for x in range(len(parent)): parent[x] = self.find(x)
+			return array('i', parent)
+
+		view = numpy.frombuffer(parent, dtype=numpy.intc)
+		roots = view.copy()
+		while(True):
+			up = roots[roots]
+			if(numpy.array_equal(up, roots)): break
+			roots = up
+		view[:] = roots
+		return roots
+
+	def unions(self):
+		sets, ret = {}, []
+		for x, r in enumerate(self.roots().tolist()):
+			if(r not in sets):
+				sets[r] = []
+				ret.append(sets[r])
+			sets[r].append(x)
 		return ret
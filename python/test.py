@@ -1,7 +1,12 @@
+import os
 import common as com
+import dag_algs as da
+import flow_algs as fa
 import graph as g
 import graph_algs as ga
+import graph_io as gio
 import heap as h
+import other_algs as oa
 
 # basic graph functionality test
 def graph_test_1():
@@ -24,6 +29,15 @@ def graph_test_1():
 	print("Connected Components: "+str(cc.components()))
 	print("It is "+("not" if not bp.is_bipartite() else "") + " bipartite.")
 	print("It "+("is acyclic" if cd.cycles == 0 else "has "+str(cd.cycles)+" cycles."))
+	print("Cycle basis: "+str(list(cd.basis())))
+
+	graph2 = g.Graph({'directed' : True})
+	graph2.connect(1,2)
+	graph2.connect(2,3)
+	graph2.connect(1,3)
+	print("Directed cycle: "+str(ga.CycleCount(graph2).directed_cycle()))
+	graph2.connect(3,1)
+	print("Directed cycle: "+str(ga.CycleCount(graph2).directed_cycle()))
 
 # MST test
 def graph_test_2():
@@ -49,6 +63,20 @@ def graph_test_2():
 	print(mst.mst().E)
 	print(mst.weight())
 
+	print("Boruvka's MST Algorithm:")
+	mst = ga.BoruvkaMST(g1)
+	print(mst.mst().E)
+	print(mst.weight())
+
+	# a second component turns the tree into a forest
+	g1.connect(9,10,1)
+	g1.connect(10,11,2)
+	g1.connect(9,11,3)
+	mst = ga.PrimMST(g1)
+	print("Prim's spanning forest: "+str(mst.num_trees())+" trees")
+	print(mst.mst().E)
+	print(mst.weight())
+
 def heap_test():
 	heap = h.Heap()
 	heap.insert(100)
@@ -87,6 +115,28 @@ def heap_test():
 	while(not maxheap.empty()):
 		print(maxheap.pop())
 
+	print("------ edge heap ------")
+	edges = h.MinHeap()
+	edges.insert_all([com.Edge(1,2,False,5), com.Edge(2,3,False,1), com.Edge(3,1,False,3)])
+	# should print in increasing weight
+	while(not edges.empty()):
+		print(edges.pop())
+
+# indexed priority queue test
+def heap_test_2():
+	pq = h.IndexedPriorityQueue()
+	pq.insert_all([('a', 9), ('b', 4), ('c', 7), ('d', 1), ('e', 5)])
+	pq.decrease_key('a', 2)
+	pq.update('d', 8)
+	pq.remove('c')
+
+	print("------ indexed priority queue ------")
+	print("Contains c: "+str(pq.contains('c')))
+	pq.pretty_print()
+	# should print a, b, e, d
+	while(not pq.empty()):
+		print(pq.pop())
+
  #strongly connected components
 def graph_test_3():
 	graph1 = g.Graph({'directed' : True})
@@ -103,18 +153,402 @@ def graph_test_3():
 	kscc = ga.KosarajuSCC(graph1)
 	print(kscc.components())
 
+	tscc = ga.TarjanSCC(graph1)
+	print(tscc.components())
+	print(tscc.condensation())
+
 	b = ga.Bridges(graph1)
 	print(b.bridges())
 
 	a = ga.ArticulationPoints(graph1)
 	print(a.articulation_points())
 
+	bc = ga.BiconnectedComponents(graph1)
+	print(bc.blocks())
+	print(bc.block_cut_tree())
+
+	print("Random vertex and edge present: "+str(graph1.has_vertex(graph1.random_vertex()) \
+		and graph1.random_edge() in graph1.E))
+
+# frozen (CSR) graph test
+def graph_test_4():
+	g1 = g.Graph({'weighted' : True})
+	g1.connect(1,2,2)
+	g1.connect(2,3,4)
+	g1.connect(3,1,3)
+	g1.connect(3,4,8)
+	g1.connect(5,6,1)
+
+	csr = g1.freeze()
+	print("Frozen: "+str(csr))
+	print("Neighbors of 3: "+str(csr.neighbors(3)))
+	print("Edge 4-3: "+str(csr.edge(4,3)))
+	print("Components: "+str(ga.ConnectedComponents(csr).components()))
+	print("Kruskal weight: "+str(ga.KruskalMST(csr).weight()))
+	print("Thawed equals original: "+str(csr.thaw().equals(g1)))
+
+	g2 = g.Graph({'directed' : True})
+	g2.connect(1,2)
+	g2.connect(2,3)
+	g2.connect(3,1)
+	g2.connect(3,4)
+	print("SCCs: "+str(ga.KosarajuSCC(g2.freeze()).components()))
+
+	csr = g.CSRGraph.from_arrays([1,2,3], [0,1], [1,2])
+	print("From arrays: "+str(csr)+", directed: "+str(csr.is_directed()))
+
+# slotted edge and EdgeStore test
+def graph_test_5():
+	store = com.EdgeStore()
+	e1 = store.add(1, 2, False, 2)
+	e2 = store.add(2, 3, False, 4.5)
+	e3 = store.add(3, 1, False, 3)
+	store.remove(e1)
+	print("Store: "+str(list(store))+", size: "+str(len(store)))
+	print("Int weight after promotion: "+str(store.view(e3))+" "+type(store.weight(e3)).__name__)
+
+	g1 = g.Graph({'weighted' : True})
+	for e in store: g1.add_edge(e)
+	g1.add_edge(com.SlottedEdge(3,4,False,8))
+	print("Kruskal weight: "+str(ga.KruskalMST(g1).weight()))
+
+	e = com.SlottedEdge(1, 2, True, 5)
+	print("Slotted: "+str(e)+", has __dict__: "+str(hasattr(e, '__dict__')))
+
+# edge and vertex removal test
+def graph_test_6():
+	g1 = g.Graph()
+	g1.connect(1,2)
+	g1.connect(2,3)
+	g1.connect(3,1)
+	g1.connect(3,4)
+	g1.remove_vertex(3)
+	print("Undirected after removing 3: "+str(g1.E)+" "+str(g1.V()))
+
+	g2 = g.Graph({'directed' : True})
+	g2.connect(1,2)
+	g2.connect(2,3)
+	g2.connect(3,1)
+	g2.connect(4,3)
+	g2.remove_edge(com.Edge(1,2,True))
+	g2.cut([3])
+	print("Directed after cutting 3: "+str(g2.E)+" "+str(g2.V()))
+	print("Edge 4->3 present: "+str(com.Edge(4,3,True) in g2.E))
+
+# incoming adjacency test
+def graph_test_7():
+	g1 = g.Graph({'directed' : True, 'incoming' : True})
+	g1.connect(1,2)
+	g1.connect(3,2)
+	g1.connect(2,4)
+
+	rev = g1.reverse()
+	print("Edges into 2: "+str(g1.edges_into(2)))
+	print("In degree of 2: "+str(g1.in_degree(2)))
+	print("Reversed: "+str(rev))
+	g1.connect(4,1)
+	print("Reversed after connecting 4->1: "+str(rev))
+
+# graph views test
+def graph_test_8():
+	g1 = g.Graph()
+	g1.connect(1,2)
+	g1.connect(2,3)
+	g1.connect(3,4)
+	g1.connect(4,1)
+
+	sub = g1.subgraph([1,2,3])
+	comp = g1.compliment()
+	print("Subgraph on 1,2,3: "+str(sub))
+	print("Complement: "+str(comp))
+	print("Subgraph components: "+str(ga.ConnectedComponents(sub).components()))
+	g1.disconnect(1,2)
+	print("Subgraph after disconnecting 1-2: "+str(sub))
+	print("Materialized complement is a Graph: "+str(isinstance(comp.materialize(), g.Graph)))
+
+# depth-first event stream test
+def graph_test_9():
+	g1 = g.Graph({'directed' : True})
+	g1.connect(1,2)
+	g1.connect(2,3)
+	g1.connect(3,1)
+	g1.connect(1,4)
+	g1.connect(4,3)
+
+	for event in ga.DFSEngine(g1).events([1]):
+		print(event)
+
+	# a long path would overflow a recursive traversal
+	g2 = g.Graph()
+	for i in range(5000):
+		g2.connect(i, i+1)
+	print("Path postorder length: "+str(len(ga.DFT(g2, 0).postorder())))
+
+def graph_test_10():
+	g1 = g.Graph()
+	g1.connect(1,2)
+	g1.connect(1,3)
+	g1.connect(2,4)
+	g1.connect(3,4)
+	g1.connect(4,5)
+	g1.add_vertex(6)
+
+	engine = ga.BFSEngine(g1)
+	print("BFS order: "+str(list(engine.order([1]))))
+	print("Distances: "+str(engine.dist))
+
+	for vectorize in [False, True]:
+		engine = ga.BFSEngine(g1.freeze(), vectorize)
+		dist, parent = engine.levels()
+		print("Levels (vectorize="+str(engine.vectorize)+"): "+str(list(dist))+" "+str(list(parent)))
+
+	print("Spanning tree: "+str(ga.SpanningTree(g1).spanning_tree()))
+	print("Bipartite: "+str(ga.Bipartite(g1).partitions()))
+
+	g2 = g.Graph({'directed' : True})
+	g2.connect(1,2)
+	g2.connect(2,3)
+	g2.connect(3,1)
+	print("Directed spanning tree: "+str(ga.SpanningTree(g2).spanning_tree()))
+
+def graph_test_11():
+	g1 = g.Graph()
+	g1.index_attribute('color')
+	g1.add_vertex(1, {'color' : 'red'})
+	g1.add_vertex(2, {'color' : 'blue'})
+	g1.add_vertex(3, {'color' : 'red'})
+	g1.add_vertex(4, {'color' : 'green'})
+	g1.connect(1,2)
+	g1.connect(2,3)
+
+	print("Red vertices: "+str(sorted(g1.lookup('color', 'red'))))
+	print("BFS for green: "+str(ga.BFS(g1, 'color', 'green').result))
+	print("BFS for green from 1: "+str(ga.BFS(g1, 'color', 'green', 1).result))
+	print("DFS for red from 2: "+str(ga.DFS(g1, 'color', 'red', -1, 2).result))
+
+	g1.set_data(4, 'color', 'red')
+	g1.remove_vertex(1)
+	print("Red vertices: "+str(sorted(g1.lookup('color', 'red'))))
+
+def graph_test_12():
+	g1 = g.Graph({'directed' : True, 'weighted' : True})
+	g1.connect('a','b',4)
+	g1.connect('a','c',1)
+	g1.connect('c','b',2)
+	g1.connect('b','d',1)
+	g1.connect('c','d',5)
+	g1.connect('d','e',3)
+
+	for heap in ['binary', 'pairing', 'radix']:
+		sp = ga.Dijkstra(g1, 'a', None, heap)
+		print(heap+": a->e = "+str(sp.distance('e'))+" via "+str(sp.path('e')))
+
+	sp = ga.BidirectionalDijkstra(g1, 'a', 'e')
+	print("Bidirectional: "+str(sp.distance())+" via "+str(sp.path()))
+
+	sp = ga.AStar(g1, 'a', 'e', lambda v, t: 0)
+	print("A*: "+str(sp.distance('e'))+" via "+str(sp.path('e')))
+
+def graph_test_13():
+	g1 = g.Graph({'directed' : True, 'weighted' : True})
+	g1.connect('a','b',4)
+	g1.connect('a','c',1)
+	g1.connect('c','b',2)
+	g1.connect('b','d',1)
+	g1.connect('d','a',3)
+
+	ap = ga.AllPairsShortestPaths(g1, processes=2, block_size=2)
+	print("Labels: "+str(ap.labels))
+	for sources, rows in ap.rows():
+		print("Block: "+str(sources)+" "+str([list(r) for r in rows]))
+
+	fw = ga.AllPairsShortestPaths(g1, method='floyd')
+	print("Floyd-Warshall agrees: "+str(fw.matrix() == ap.matrix()))
+	print("From b, d: "+str([list(r) for s, rows in ap.rows(['b','d']) for r in rows]))
+
+	g2 = g.Graph({'directed' : True, 'weighted' : True})
+	g2.add_vertex('x')
+	g2.add_vertex('y')
+	print("No edges: "+str(ga.AllPairsShortestPaths(g2, method='floyd').matrix()))
+
+	g3 = g.Graph({'weighted' : True})
+	g3.connect(1,2,5)
+	g3.connect(2,3,5)
+	g4 = g.Graph()
+	g4.connect(1,2)
+	g4.connect(2,3)
+	rows1 = ga.AllPairsShortestPaths(g3, processes=1, block_size=1).rows()
+	rows2 = ga.AllPairsShortestPaths(g4, processes=1, block_size=1).rows()
+	interleaved = []
+	for block1, block2 in zip(rows1, rows2):
+		interleaved.append((list(block1[1][0]), list(block2[1][0])))
+	print("Interleaved rows: "+str(interleaved))
+
+def graph_test_14():
+	g1 = g.Graph()
+	g1.connect(1,2)
+	g1.connect(3,4)
+	g1.add_vertex(5)
+
+	cc = ga.ConnectedComponents(g1, True)
+	print("Components: "+str(cc.num_components())+" "+str(cc.components()))
+	g1.connect(2,3)
+	g1.connect(4,5)
+	print("After inserts: "+str(cc.num_components())+", connected: "+str(cc.is_connected()))
+	g1.disconnect(2,3)
+	print("After removal: "+str(cc.num_components())+", 1 and 4: "+str(cc.connected(1,4)))
+	cc.detach()
+
+	try:
+		ga.ConnectedComponents(g1.freeze(), True)
+	except ValueError as e:
+		print("Frozen graph: "+str(e))
+
+
+def graph_test_15():
+	g1 = g.Graph({'weighted': True})
+	g1.connect(1,2,3)
+	g1.connect(2,3,1)
+	g1.connect(1,3,5)
+
+	for write, load, path in [(gio.write_edge_list, gio.load_edge_list, 'graph.txt'),
+			(gio.write_dimacs, gio.load_dimacs, 'graph.gr'),
+			(gio.write_metis, gio.load_metis, 'graph.metis'),
+			(gio.write_matrix_market, gio.load_matrix_market, 'graph.mtx')]:
+		write(g1, path)
+		g2 = load(path)
+		print(path+": "+str(len(g2.V()))+" vertices, edges "+str(list(g2.E)))
+		os.remove(path)
+
+	with open('graph.txt', 'w') as f: f.write("3 1\n2 3\n")
+	print("Sorted labels: "+str(gio.load_edge_list('graph.txt').labels))
+	for text in ["1 2 5\n2 3\n3 1 4 7\n", "1 2 5\n2 x 3\n"]:
+		with open('graph.txt', 'w') as f: f.write(text)
+		try:
+			gio.load_edge_list('graph.txt')
+			print("Malformed file loaded")
+		except ValueError:
+			print("Malformed file rejected")
+	os.remove('graph.txt')
+
+	g2 = g.Graph({'capacious' : True})
+	g2.connect(1,2,None,4)
+	g2.connect(2,3)
+	gio.write_dimacs(g2, 'graph.max')
+	print("Max-flow DIMACS: "+str(list(gio.load_dimacs('graph.max').E)))
+	os.remove('graph.max')
+
+
+def graph_test_16():
+	g1 = g.Graph({'weighted': True})
+	g1.connect(1,2,3)
+	g1.connect(2,3,1)
+	g1.connect(1,3,5)
+	g1.connect(3,4,2)
+
+	g1.save_snapshot('graph.snap')
+	g2 = g.load_snapshot('graph.snap')
+	print("Snapshot: "+str(g2))
+	print("Neighbors of 3: "+str(g2.neighbors(3)))
+	sp = ga.Dijkstra(g2, 1)
+	print("Distance 1 -> 4: "+str(sp.distance(4))+" via "+str(sp.path(4)))
+	print("MST weight: "+str(ga.KruskalMST(g2).weight()))
+	del g2, sp
+	os.remove('graph.snap')
+
+
+def graph_test_17():
+	g1 = g.Graph.from_edges([(1,2), (2,3,4), (3,1,2,5), (2,1)], {'weighted': True})
+	print("From edges: "+str(g1))
+	stats = g1.add_edges_bulk([(3,4,1), (4,3,1), (1,3)])
+	print("Bulk stats: "+str(sorted(stats.items())))
+	print("Graph: "+str(g1))
+
+
+def graph_test_18():
+	g1 = g.Graph({'directed': True, 'capacious': True})
+	g1.connect('s','a',None,10)
+	g1.connect('s','b',None,5)
+	g1.connect('a','b',None,15)
+	g1.connect('a','t',None,10)
+	g1.connect('b','t',None,10)
+
+	for flow in [fa.Dinic(g1, 's', 't'), fa.PushRelabel(g1, 's', 't')]:
+		print(flow.__class__.__name__+": "+str(flow.value()))
+		print("Flows: "+str(flow.flows()))
+		print("Min cut: "+str(flow.min_cut())+" across "+str(flow.cut_edges()))
+
+
+def graph_test_19():
+	g1 = g.Graph({'weighted': True})
+	g1.connect(1,2,3)
+	g1.connect(2,3,1)
+	g1.connect(3,4,2)
+
+	for i in range(3):
+		print("Components: "+str(g1.cached(ga.ConnectedComponents).num_components())+
+			  ", MST weight: "+str(g1.cached(ga.KruskalMST).weight()))
+	g1.connect(4,1,1)
+	print("After connect, MST weight: "+str(g1.cached(ga.KruskalMST).weight()))
+	print("Cache stats: "+str(sorted(g1.cache.stats().items())))
+
+
+def graph_test_20():
+	g1 = g.Graph({'directed': True})
+	for job, duration in [('fetch',2), ('configure',1), ('compile',5), ('docs',3), ('test',4), ('package',1)]:
+		g1.add_vertex(job, {'duration': duration})
+	g1.connect('fetch','configure')
+	g1.connect('configure','compile')
+	g1.connect('fetch','docs')
+	g1.connect('compile','test')
+	g1.connect('test','package')
+	g1.connect('docs','package')
+	g1.connect('configure','test')
+
+	print("Kahn: "+str(da.TopologicalSort(g1).order()))
+	print("DFS: "+str(da.TopologicalSort(g1, 'dfs').order()))
+	print("Longest path: "+str(da.LongestPath(g1).path()))
+	cp = da.CriticalPath(g1)
+	print("Critical path: "+str(cp.path())+", makespan "+str(cp.makespan())+", docs slack "+str(cp.slack('docs')))
+	print("Redundant edges: "+str(da.TransitiveReduction(g1).redundant()))
+	ls = da.LevelScheduler(g1)
+	print("Levels: "+str(list(ls.levels())))
+	print("Run: "+str(ls.run(len, 'thread', 2)))
+
+
+def union_find_test():
+	uf = oa.UnionFind(['a','b','c','d','e'])
+	uf.union('a','b')
+	print("Joined: "+str(uf.union_many([('c','d'), ('b','c'), ('a','d')])))
+	print("Sets: "+str(uf.num_sets())+" "+str(uf.unions()))
+	print("Size of d's set: "+str(uf.set_size('d')))
+	print("Roots: "+str(uf.find_many(['a','c','e'])))
+
 
 def main():
 	#heap_test()
+	#heap_test_2() # indexed priority queue
+	#union_find_test()
 	#graph_test_1() # cycle detection, components, bipartite
 	#graph_test_2() # minimum spanning trees
 	graph_test_3() # strongly connected components, bridges, A.P.s
+	#graph_test_4() # frozen CSR graphs
+	#graph_test_5() # slotted edges and EdgeStore
+	#graph_test_6() # edge and vertex removal
+	#graph_test_7() # incoming adjacency and reversed views
+	#graph_test_8() # subgraph and complement views
+	#graph_test_9() # iterative depth-first traversal
+	#graph_test_10() # breadth-first engine and level-synchronous BFS
+	#graph_test_11() # vertex attribute indexes
+	#graph_test_12() # shortest paths
+	#graph_test_13() # all-pairs and multi-source shortest paths
+	#graph_test_14() # dynamic connected components
+	#graph_test_15() # graph file formats
+	#graph_test_16() # memory-mapped snapshots
+	#graph_test_17() # bulk graph construction
+	#graph_test_18() # maximum flow and minimum cut
+	#graph_test_19() # cached algorithm results
+	#graph_test_20() # topological sort and DAG scheduling
 
 
 main()
\ No newline at end of file